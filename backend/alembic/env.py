@@ -0,0 +1,54 @@
+"""Alembic environment: async engine from app settings, batch mode for SQLite."""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import models  # noqa: F401  # register all tables on Base.metadata
+from app.core.config import settings
+from app.core.db_core import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+# When the app runs migrations it passes its own connection and keeps its logging setup.
+shared_connection: Connection | None = config.attributes.get("connection")
+if shared_connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(settings.database_url)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif shared_connection is not None:
+    do_run_migrations(shared_connection)
+else:
+    asyncio.run(run_async_migrations())
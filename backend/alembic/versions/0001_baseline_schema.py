@@ -0,0 +1,310 @@
+"""Baseline schema.
+
+The tables as `init_db` created them before migrations were introduced. Existing
+databases are stamped at this revision instead of running it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 20:11:49.951378
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('achievements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('achievement_type', sa.String(length=64), nullable=False),
+    sa.Column('requirement_value', sa.Integer(), nullable=False),
+    sa.Column('xp_reward', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_achievements_achievement_type'), ['achievement_type'], unique=False)
+        batch_op.create_index(batch_op.f('ix_achievements_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_achievements_name'), ['name'], unique=True)
+
+    op.create_table('app_meta',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_table('daily_active_sketches',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('registers', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('industry_id', sa.Integer(), nullable=False),
+    sa.Column('new_users', sa.Integer(), nullable=False),
+    sa.Column('new_points', sa.Integer(), nullable=False),
+    sa.Column('marks', sa.Integer(), nullable=False),
+    sa.Column('photos', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'industry_id')
+    )
+    op.create_table('geo_cell_rollups',
+    sa.Column('precision', sa.Integer(), nullable=False),
+    sa.Column('geohash', sa.String(length=12), nullable=False),
+    sa.Column('industry_id', sa.Integer(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('marks', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('precision', 'geohash', 'industry_id')
+    )
+    with op.batch_alter_table('geo_cell_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_geo_cell_rollups_center', ['precision', 'latitude', 'longitude'], unique=False)
+
+    op.create_table('industries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    with op.batch_alter_table('industries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_industries_id'), ['id'], unique=False)
+
+    op.create_table('period_rollups',
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('start', sa.DateTime(), nullable=False),
+    sa.Column('industry_id', sa.Integer(), nullable=False),
+    sa.Column('new_users', sa.Integer(), nullable=False),
+    sa.Column('new_points', sa.Integer(), nullable=False),
+    sa.Column('marks', sa.Integer(), nullable=False),
+    sa.Column('photos', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('period', 'start', 'industry_id')
+    )
+    op.create_table('score_sketch_buckets',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('industry_id', sa.Integer(), nullable=False),
+    sa.Column('sub_industry_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'industry_id', 'sub_industry_id', 'bucket')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('xp', sa.Integer(), nullable=False),
+    sa.Column('avatar_url', sa.String(length=255), nullable=True),
+    sa.Column('avatar_history', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+
+    op.create_table('activity_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('xp_gained', sa.Integer(), nullable=True),
+    sa.Column('point_id', sa.Integer(), nullable=True),
+    sa.Column('achievement_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('activity_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_activity_events_id'), ['id'], unique=False)
+        batch_op.create_index('ix_activity_events_user_occurred', ['user_id', 'occurred_at', 'id'], unique=False)
+
+    op.create_table('criteria',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('industry_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['industry_id'], ['industries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('text', 'industry_id', name='uq_criteria_text_per_industry')
+    )
+    with op.batch_alter_table('criteria', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_criteria_id'), ['id'], unique=False)
+
+    op.create_table('leaderboard_entries',
+    sa.Column('board', sa.String(length=64), nullable=False),
+    sa.Column('scope', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('board', 'scope', 'user_id')
+    )
+    with op.batch_alter_table('leaderboard_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_leaderboard_entries_board_scope_score', ['board', 'scope', 'score'], unique=False)
+        batch_op.create_index(batch_op.f('ix_leaderboard_entries_user_id'), ['user_id'], unique=False)
+
+    op.create_table('sub_industries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('base_score', sa.Float(), nullable=False),
+    sa.Column('industry_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['industry_id'], ['industries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name', 'industry_id', name='uq_sub_industry_name_per_industry')
+    )
+    with op.batch_alter_table('sub_industries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sub_industries_id'), ['id'], unique=False)
+
+    op.create_table('user_achievements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('achievement_id', sa.Integer(), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('is_completed', sa.Boolean(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['achievement_id'], ['achievements.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'achievement_id', name='uq_user_achievement')
+    )
+    with op.batch_alter_table('user_achievements', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_achievements_achievement_id'), ['achievement_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_achievements_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_achievements_user_id'), ['user_id'], unique=False)
+
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('marks_count', sa.Integer(), nullable=False),
+    sa.Column('points_count', sa.Integer(), nullable=False),
+    sa.Column('photos_count', sa.Integer(), nullable=False),
+    sa.Column('last_active_date', sa.Date(), nullable=True),
+    sa.Column('current_streak', sa.Integer(), nullable=False),
+    sa.Column('best_streak', sa.Integer(), nullable=False),
+    sa.Column('last_active_week', sa.Date(), nullable=True),
+    sa.Column('current_week_streak', sa.Integer(), nullable=False),
+    sa.Column('best_week_streak', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('points',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('mark', sa.Float(), nullable=False),
+    sa.Column('industry_id', sa.Integer(), nullable=False),
+    sa.Column('sub_industry_id', sa.Integer(), nullable=False),
+    sa.Column('creator_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['industry_id'], ['industries.id'], ),
+    sa.ForeignKeyConstraint(['sub_industry_id'], ['sub_industries.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('points', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_points_id'), ['id'], unique=False)
+
+    op.create_table('marks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('point_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('question_ids', sa.JSON(), nullable=False),
+    sa.Column('answers', sa.JSON(), nullable=False),
+    sa.Column('weights', sa.JSON(), nullable=False),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('photos', sa.JSON(), nullable=False),
+    sa.Column('total_score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['point_id'], ['points.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('marks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_marks_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_marks_point_id'), ['point_id'], unique=False)
+
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('marks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_marks_point_id'))
+        batch_op.drop_index(batch_op.f('ix_marks_id'))
+
+    op.drop_table('marks')
+    with op.batch_alter_table('points', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_points_id'))
+
+    op.drop_table('points')
+    op.drop_table('user_stats')
+    with op.batch_alter_table('user_achievements', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_achievements_user_id'))
+        batch_op.drop_index(batch_op.f('ix_user_achievements_id'))
+        batch_op.drop_index(batch_op.f('ix_user_achievements_achievement_id'))
+
+    op.drop_table('user_achievements')
+    with op.batch_alter_table('sub_industries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sub_industries_id'))
+
+    op.drop_table('sub_industries')
+    with op.batch_alter_table('leaderboard_entries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_leaderboard_entries_user_id'))
+        batch_op.drop_index('ix_leaderboard_entries_board_scope_score')
+
+    op.drop_table('leaderboard_entries')
+    with op.batch_alter_table('criteria', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_criteria_id'))
+
+    op.drop_table('criteria')
+    with op.batch_alter_table('activity_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_activity_events_user_occurred')
+        batch_op.drop_index(batch_op.f('ix_activity_events_id'))
+
+    op.drop_table('activity_events')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    op.drop_table('score_sketch_buckets')
+    op.drop_table('period_rollups')
+    with op.batch_alter_table('industries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_industries_id'))
+
+    op.drop_table('industries')
+    with op.batch_alter_table('geo_cell_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_geo_cell_rollups_center')
+
+    op.drop_table('geo_cell_rollups')
+    op.drop_table('daily_rollups')
+    op.drop_table('daily_active_sketches')
+    op.drop_table('app_meta')
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_achievements_name'))
+        batch_op.drop_index(batch_op.f('ix_achievements_id'))
+        batch_op.drop_index(batch_op.f('ix_achievements_achievement_type'))
+
+    op.drop_table('achievements')
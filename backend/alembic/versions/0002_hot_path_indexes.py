@@ -0,0 +1,51 @@
+"""Indexes for hot filters on points, marks and criteria, and model indexes missing from old databases.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 20:12:10.114429
+
+Each index is built in its own autocommit step, so a writer is blocked for one build at
+a time rather than for the whole migration (and PostgreSQL builds it CONCURRENTLY).
+`if_not_exists` makes the steps safe to re-run after an interruption.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HOT_PATH_INDEXES = [
+    ("ix_points_creator_created", "points", ["creator_id", "created_at"], False),
+    ("ix_points_industry_created", "points", ["industry_id", "created_at"], False),
+    ("ix_points_created_at", "points", ["created_at"], False),
+    ("ix_points_mark", "points", ["mark"], False),
+    ("ix_marks_user_created", "marks", ["user_id", "created_at"], False),
+    ("ix_marks_created_at", "marks", ["created_at"], False),
+    ("ix_criteria_industry_id", "criteria", ["industry_id"], False),
+]
+
+# Part of the baseline, but missing from databases whose tables predate `index=True`.
+# Downgrading keeps them, as the baseline has them.
+BACKFILLED_INDEXES = [
+    ("ix_user_achievements_user_id", "user_achievements", ["user_id"], False),
+    ("ix_user_achievements_achievement_id", "user_achievements", ["achievement_id"], False),
+    ("ix_achievements_achievement_type", "achievements", ["achievement_type"], False),
+    # The column already has a UNIQUE constraint, so existing rows cannot violate it.
+    ("ix_achievements_name", "achievements", ["name"], True),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in HOT_PATH_INDEXES + BACKFILLED_INDEXES:
+            op.create_index(name, table, columns, unique=unique, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, *_ in reversed(HOT_PATH_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
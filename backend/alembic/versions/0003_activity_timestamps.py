@@ -0,0 +1,29 @@
+"""Store activity timestamps in the format the DateTime type writes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 22:40:03.518204
+
+Rebuilt events copied legacy second-precision timestamps ('YYYY-MM-DD HH:MM:SS') as-is;
+they sort below the cursor bound of their own second, so paging repeated them forever.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":  # other databases store native timestamps
+        return
+    op.execute("UPDATE activity_events SET occurred_at = occurred_at || '.000000' WHERE length(occurred_at) = 19")
+
+
+def downgrade() -> None:
+    # The padded values are what the ORM writes anyway.
+    pass
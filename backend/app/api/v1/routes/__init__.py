@@ -4,7 +4,9 @@ from app.api.v1.routes import (
     analytics_routes,
     auth_routes,
     criteria_routes,
+    events_routes,
     industries_routes,
+    leaderboard_routes,
     marks_routes,
     points_routes,
     sub_industries_routes,
@@ -24,3 +26,5 @@ api_router.include_router(marks_routes.router)
 api_router.include_router(gamification_routes.router)
 api_router.include_router(achievement_routes.router)
 api_router.include_router(analytics_routes.router)
+api_router.include_router(leaderboard_routes.router)
+api_router.include_router(events_routes.router)
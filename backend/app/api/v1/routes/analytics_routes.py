@@ -1,40 +1,62 @@
 from datetime import date
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db_core import get_db
+from app.core.db_core import get_read_db
+from app.core.geo import parse_bbox
+from app.schemas.analytics_schemas import AnalyticsBucket
 from app.services.analytics_service import (
     get_activity_metrics,
+    get_analytics_cache_stats,
     get_analytics_summary,
     get_criteria_metrics,
     get_users_engagement,
     get_marks_metrics,
     get_points_metrics,
     get_users_metrics,
+    resolve_bucket,
 )
+from app.services.geo_service import get_geo_cells
+from app.services.sketch_service import estimate_active_users, get_active_users_summary, get_score_percentiles
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
+BUCKET_QUERY = Query(
+    default=AnalyticsBucket.DAY,
+    description="Width of the series buckets; `auto` picks one from the range and reports it in X-Analytics-Bucket",
+)
+
+
 @router.get("/summary")
 async def analytics_summary(
+    response: Response,
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
     top_limit: int = Query(default=10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db),
+    bucket: AnalyticsBucket = BUCKET_QUERY,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await get_analytics_summary(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
+    bucket = await resolve_bucket(db, bucket, start_date, end_date)
+    response.headers["X-Analytics-Bucket"] = bucket.value
+    return await get_analytics_summary(
+        db, start_date=start_date, end_date=end_date, top_limit=top_limit, bucket=bucket
+    )
 
 
 @router.get("/user-activity")
 async def analytics_activity(
+    response: Response,
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
-    db: AsyncSession = Depends(get_db),
+    bucket: AnalyticsBucket = BUCKET_QUERY,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await get_activity_metrics(db, start_date=start_date, end_date=end_date)
+    bucket = await resolve_bucket(db, bucket, start_date, end_date)
+    response.headers["X-Analytics-Bucket"] = bucket.value
+    return await get_activity_metrics(db, start_date=start_date, end_date=end_date, bucket=bucket)
 
 
 @router.get("/points-overview")
@@ -42,7 +64,7 @@ async def analytics_points(
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
     top_limit: int = Query(default=10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await get_points_metrics(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
 
@@ -52,7 +74,7 @@ async def analytics_marks(
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
     top_limit: int = Query(default=10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await get_marks_metrics(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
 
@@ -62,7 +84,7 @@ async def analytics_users(
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
     top_limit: int = Query(default=10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await get_users_metrics(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
 
@@ -71,7 +93,7 @@ async def analytics_users(
 async def analytics_criteria(
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await get_criteria_metrics(db, start_date=start_date, end_date=end_date)
 
@@ -81,6 +103,66 @@ async def analytics_users_engagement(
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
     top_limit: int = Query(default=20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await get_users_engagement(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
+
+
+@router.get("/cache-stats")
+async def analytics_cache_stats():
+    """Hit/miss counters and size of this worker's analytics cache."""
+    return get_analytics_cache_stats()
+
+
+@router.get("/active-users")
+async def analytics_active_users(
+    at: Optional[date] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Approximate DAU/WAU/MAU ending at `at` (default: today), from HyperLogLog sketches."""
+    return await get_active_users_summary(db, at=at)
+
+
+@router.get("/active-users/range")
+async def analytics_active_users_range(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Approximate distinct active users over an inclusive date range."""
+    try:
+        return await estimate_active_users(db, start_date=start_date, end_date=end_date)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.get("/score-percentiles")
+async def analytics_score_percentiles(
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
+    group_by: Literal["industry", "sub_industry"] = Query(default="industry"),
+    industry_id: Optional[int] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """p10/p50/p90 of mark scores per industry or sub-industry, from quantile sketches."""
+    return await get_score_percentiles(
+        db, start_date=start_date, end_date=end_date, group_by=group_by, industry_id=industry_id
+    )
+
+
+@router.get("/geo-cells")
+async def analytics_geo_cells(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    precision: int = Query(default=5, description="Geohash length: 4 (~39 km), 5 (~4.9 km) or 6 (~1.2 km)"),
+    industry_id: Optional[int] = Query(default=None),
+    limit: int = Query(default=2000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Point/mark counts and mean rating per geohash cell (and industry) inside a bounding box."""
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="bbox must be min_lon,min_lat,max_lon,max_lat."
+        ) from exc
+    return await get_geo_cells(db, box, precision=precision, industry_id=industry_id, limit=limit)
@@ -3,7 +3,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db_core import get_db
+from app.core.db_core import get_db, get_read_db
 from app.schemas import CriteriaCreate, CriteriaRead
 from app.services import create_criteria, delete_criteria, get_criteria, list_criteria
 
@@ -18,7 +18,7 @@ async def create_criteria_endpoint(payload: CriteriaCreate, db: AsyncSession = D
 @router.get("", response_model=List[CriteriaRead])
 async def list_criteria_endpoint(
     industry_id: Optional[int] = Query(default=None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[CriteriaRead]:
     return await list_criteria(db, industry_id=industry_id)
 
@@ -0,0 +1,85 @@
+"""Routes for the live update stream (Server-Sent Events)."""
+
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.geo import BBox, parse_bbox
+from app.core.pubsub import Event, Subscription, get_broker
+from app.schemas.event_schemas import LiveEventType
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def _parse_types(types: Optional[str]) -> set[str] | None:
+    if not types:
+        return None
+    requested = {t.strip() for t in types.split(",") if t.strip()}
+    unknown = requested - {t.value for t in LiveEventType}
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown event types: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+def _parse_bbox(bbox: Optional[str]) -> BBox | None:
+    if not bbox:
+        return None
+    try:
+        return parse_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="bbox must be min_lon,min_lat,max_lon,max_lat."
+        ) from exc
+
+
+def _sse(event_type: str, data: dict, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    broker = get_broker()
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event: Event = await asyncio.wait_for(subscription.queue.get(), settings.pubsub_keepalive_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            dropped = subscription.take_dropped()
+            if dropped:
+                # The client fell behind and missed events; it should refetch what it shows.
+                yield _sse("resync", {"dropped": dropped})
+            yield _sse(event.type, {**event.data, "created_at": event.created_at.isoformat()}, event.id)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def live_events_stream(
+    request: Request,
+    types: Optional[str] = Query(default=None, description="Comma-separated event types, e.g. point.created,point.rating_changed"),
+    bbox: Optional[str] = Query(default=None, description="min_lon,min_lat,max_lon,max_lat; limits point events to this area"),
+    user_id: Optional[int] = Query(default=None, description="Only this user's achievement events"),
+) -> StreamingResponse:
+    """
+    Stream live map and activity changes as Server-Sent Events.
+
+    Each event's `event:` field is a LiveEventType value. A `resync` event means the
+    client was too slow and some events were dropped.
+    """
+    subscription = get_broker().subscribe(_parse_types(types), _parse_bbox(bbox), user_id)
+    return StreamingResponse(
+        _stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
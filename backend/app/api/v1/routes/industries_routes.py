@@ -3,7 +3,7 @@ from typing import List
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db_core import get_db
+from app.core.db_core import get_db, get_read_db
 from app.schemas import IndustryCreate, IndustryRead
 from app.services import create_industry, delete_industry, get_industry, list_industries
 
@@ -16,7 +16,7 @@ async def create_industry_endpoint(payload: IndustryCreate, db: AsyncSession = D
 
 
 @router.get("", response_model=List[IndustryRead])
-async def list_industries_endpoint(db: AsyncSession = Depends(get_db)) -> List[IndustryRead]:
+async def list_industries_endpoint(db: AsyncSession = Depends(get_read_db)) -> List[IndustryRead]:
     return await list_industries(db)
 
 
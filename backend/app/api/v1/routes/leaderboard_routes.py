@@ -0,0 +1,50 @@
+"""Routes for leaderboards by XP, engagement and marks."""
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db_core import get_read_db
+from app.schemas.leaderboard_schemas import LeaderboardBoard, LeaderboardPeriod, LeaderboardRead
+from app.services.leaderboard_service import get_leaderboard_top, get_leaderboard_window, resolve_scope
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"])
+
+
+@router.get("/{board}", response_model=LeaderboardRead)
+async def leaderboard_top(
+    board: LeaderboardBoard,
+    period: LeaderboardPeriod = Query(default=LeaderboardPeriod.ALL),
+    industry_id: Optional[int] = Query(default=None),
+    at: Optional[date] = Query(default=None, description="Day inside the week/month to show"),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+) -> LeaderboardRead:
+    return await get_leaderboard_top(db, board, resolve_scope(period, industry_id, at), limit)
+
+
+@router.get("/{board}/users/{user_id}/rank", response_model=LeaderboardRead)
+async def leaderboard_user_rank(
+    board: LeaderboardBoard,
+    user_id: int,
+    period: LeaderboardPeriod = Query(default=LeaderboardPeriod.ALL),
+    industry_id: Optional[int] = Query(default=None),
+    at: Optional[date] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+) -> LeaderboardRead:
+    return await get_leaderboard_window(db, board, resolve_scope(period, industry_id, at), user_id)
+
+
+@router.get("/{board}/users/{user_id}/window", response_model=LeaderboardRead)
+async def leaderboard_user_window(
+    board: LeaderboardBoard,
+    user_id: int,
+    radius: int = Query(default=5, ge=0, le=50),
+    period: LeaderboardPeriod = Query(default=LeaderboardPeriod.ALL),
+    industry_id: Optional[int] = Query(default=None),
+    at: Optional[date] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+) -> LeaderboardRead:
+    return await get_leaderboard_window(db, board, resolve_scope(period, industry_id, at), user_id, radius)
@@ -3,7 +3,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, File, UploadFile, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db_core import get_db
+from app.core.db_core import get_db, get_read_db
 from app.schemas import MarkCreate, MarkRead
 from app.services import create_mark, get_mark, list_marks, save_mark_photos, delete_mark
 from app.services.mark_service import append_photos_to_mark
@@ -19,7 +19,7 @@ async def create_mark_endpoint(payload: MarkCreate, db: AsyncSession = Depends(g
 @router.get("", response_model=List[MarkRead])
 async def list_marks_endpoint(
     point_id: Optional[int] = Query(default=None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[MarkRead]:
     return await list_marks(db, point_id=point_id)
 
@@ -3,7 +3,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db_core import get_db
+from app.core.db_core import get_db, get_read_db
 from app.schemas import CriteriaRead, PointCreate, PointRead, PointUpdate
 from app.services import create_point, delete_point, get_point, get_point_criteria, list_points, update_point
 
@@ -16,7 +16,7 @@ async def create_point_endpoint(payload: PointCreate, db: AsyncSession = Depends
 
 
 @router.get("", response_model=List[PointRead])
-async def list_points_endpoint(db: AsyncSession = Depends(get_db)) -> List[PointRead]:
+async def list_points_endpoint(db: AsyncSession = Depends(get_read_db)) -> List[PointRead]:
     return await list_points(db)
 
 
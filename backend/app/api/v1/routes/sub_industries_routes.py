@@ -3,7 +3,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db_core import get_db
+from app.core.db_core import get_db, get_read_db
 from app.schemas import SubIndustryCreate, SubIndustryRead
 from app.services import create_sub_industry, delete_sub_industry, get_sub_industry, list_sub_industries
 
@@ -20,7 +20,7 @@ async def create_sub_industry_endpoint(
 @router.get("", response_model=List[SubIndustryRead])
 async def list_sub_industries_endpoint(
     industry_id: Optional[int] = Query(default=None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[SubIndustryRead]:
     return await list_sub_industries(db, industry_id=industry_id)
 
@@ -1,9 +1,9 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Query, Response, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db_core import get_db
+from app.core.db_core import get_db, get_read_db
 from app.schemas import ActivityRead, UserCommentRead, UserCreate, UserRead, UserUpdate
 from app.services import (
     create_user,
@@ -27,18 +27,24 @@ async def register_user(payload: UserCreate, db: AsyncSession = Depends(get_db))
 @router.get("/{user_id}/activity", response_model=List[ActivityRead])
 async def get_user_activity_endpoint(
     user_id: int,
+    response: Response,
     limit: int = Query(default=50, ge=1, le=100, description="Maximum number of activities to return"),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(default=None, description="Value of X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[ActivityRead]:
     """
     Get recent user activity (points created, marks created, achievements unlocked).
-    Returns activities sorted by timestamp (most recent first).
+    Returns activities sorted by timestamp (most recent first); when more pages exist,
+    the cursor for the next one is sent in the X-Next-Cursor header.
     """
-    return await get_user_activity(db, user_id, limit)
+    activities, next_cursor = await get_user_activity(db, user_id, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return activities
 
 
 @router.get("/{user_id}/comments", response_model=List[UserCommentRead])
-async def get_user_comments_endpoint(user_id: int, db: AsyncSession = Depends(get_db)) -> List[UserCommentRead]:
+async def get_user_comments_endpoint(user_id: int, db: AsyncSession = Depends(get_read_db)) -> List[UserCommentRead]:
     """Return all comments left by the specified user."""
 
     return await list_user_comments(db, user_id)
@@ -50,7 +56,7 @@ async def retrieve_user(user_id: int, db: AsyncSession = Depends(get_db)) -> Use
 
 
 @router.get("", response_model=list[UserRead])
-async def list_users_endpoint(db: AsyncSession = Depends(get_db)) -> list[UserRead]:
+async def list_users_endpoint(db: AsyncSession = Depends(get_read_db)) -> list[UserRead]:
     return await list_users(db)
 
 
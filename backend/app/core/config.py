@@ -1,8 +1,9 @@
 from functools import lru_cache
 from pathlib import Path
 from typing import Literal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from pydantic import Field, model_validator
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,8 +15,76 @@ class Settings(BaseSettings):
     app_name: str = Field(default="Health Map API", validation_alias="APP_NAME")
     environment: Literal["local", "prod", "test"] = Field(default="local", validation_alias="ENVIRONMENT")
     database_url: str = Field(default="sqlite+aiosqlite:///./health_map.db", validation_alias="DATABASE_URL")
+    # Heavy reads (analytics, lists) use this URL; empty means a read-only view of the SQLite database_url.
+    read_database_url: str = Field(default="", validation_alias="READ_DATABASE_URL")
+    read_pool_size: int = Field(default=5, ge=1, validation_alias="READ_POOL_SIZE")
     secret_key: str = Field(default="super-secret-key", validation_alias="SECRET_KEY")
+    log_level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
     media_root: Path = Field(default=Path("media"), validation_alias="MEDIA_ROOT")
+    streak_timezone: str = Field(default="UTC", validation_alias="STREAK_TIMEZONE")
+    streak_day_start_hour: int = Field(default=0, ge=0, le=23, validation_alias="STREAK_DAY_START_HOUR")
+    level_curve: Literal["geometric", "polynomial", "table"] = Field(default="geometric", validation_alias="LEVEL_CURVE")
+    level_base_xp: float = Field(default=100, gt=0, validation_alias="LEVEL_BASE_XP")
+    level_multiplier: float = Field(default=1.5, gt=1, validation_alias="LEVEL_MULTIPLIER")
+    level_exponent: float = Field(default=2.0, ge=0, validation_alias="LEVEL_EXPONENT")
+    level_table: list[float] = Field(default_factory=list, validation_alias="LEVEL_TABLE")  # JSON list of cumulative XP
+    level_max: int = Field(default=100, ge=2, validation_alias="LEVEL_MAX")
+    achievement_catalog_ttl_seconds: float = Field(default=60.0, ge=0, validation_alias="ACHIEVEMENT_CATALOG_TTL_SECONDS")
+    leaderboard_cache_ttl_seconds: float = Field(default=30.0, ge=0, validation_alias="LEADERBOARD_CACHE_TTL_SECONDS")
+    leaderboard_cache_max_boards: int = Field(default=64, ge=1, validation_alias="LEADERBOARD_CACHE_MAX_BOARDS")
+    pubsub_backend: str = Field(default="local", validation_alias="PUBSUB_BACKEND")
+    pubsub_queue_size: int = Field(default=100, ge=1, validation_alias="PUBSUB_QUEUE_SIZE")  # per subscriber
+    pubsub_keepalive_seconds: float = Field(default=15.0, gt=0, validation_alias="PUBSUB_KEEPALIVE_SECONDS")
+    analytics_cache_ttl_seconds: float = Field(default=60.0, ge=0, validation_alias="ANALYTICS_CACHE_TTL_SECONDS")  # 0 disables
+    analytics_cache_max_entries: int = Field(default=512, ge=0, validation_alias="ANALYTICS_CACHE_MAX_ENTRIES")
+    analytics_max_concurrency: int = Field(default=4, ge=1, validation_alias="ANALYTICS_MAX_CONCURRENCY")  # per worker, capped at READ_POOL_SIZE
+    # Per-request SQL statistics (X-DB-* headers, "app.sql" log records).
+    sql_stats_enabled: bool = Field(default=True, validation_alias="SQL_STATS_ENABLED")
+    sql_stats_slowest: int = Field(default=3, ge=0, validation_alias="SQL_STATS_SLOWEST")  # statements kept per request
+    sql_stats_statement_chars: int = Field(default=300, ge=20, validation_alias="SQL_STATS_STATEMENT_CHARS")
+    # A statement run this many times in one request is logged as a probable N+1 pattern.
+    sql_n_plus_one_threshold: int = Field(default=5, ge=2, validation_alias="SQL_N_PLUS_ONE_THRESHOLD")
+    # /metrics: with a directory, each worker writes snapshots there and a scrape merges all workers.
+    metrics_enabled: bool = Field(default=True, validation_alias="METRICS_ENABLED")
+    metrics_multiproc_dir: Path | None = Field(default=None, validation_alias="PROMETHEUS_MULTIPROC_DIR")
+    metrics_snapshot_interval_seconds: float = Field(default=5.0, gt=0, validation_alias="METRICS_SNAPSHOT_INTERVAL_SECONDS")
+    # SQLite connection pragmas, applied to every new connection (ignored for other databases).
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = Field(
+        default="WAL", validation_alias="SQLITE_JOURNAL_MODE"
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        default="NORMAL", validation_alias="SQLITE_SYNCHRONOUS"
+    )
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, validation_alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size: int = Field(default=-65536, validation_alias="SQLITE_CACHE_SIZE")  # pages, or KiB when negative
+    sqlite_mmap_size: int = Field(default=268435456, ge=0, validation_alias="SQLITE_MMAP_SIZE")  # bytes
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = Field(default="MEMORY", validation_alias="SQLITE_TEMP_STORE")
+    sqlite_foreign_keys: bool = Field(default=False, validation_alias="SQLITE_FOREIGN_KEYS")
+
+    @field_validator("streak_timezone")
+    @classmethod
+    def validate_streak_timezone(cls, value: str) -> str:
+        """Reject unknown IANA zone names early instead of on the first mark."""
+
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError) as exc:
+            raise ValueError(f"Unknown timezone: {value}") from exc
+        return value
+
+    @model_validator(mode="after")
+    def validate_level_table(self) -> "Settings":
+        """Reject a missing or malformed table at startup instead of on the first level lookup."""
+
+        if self.level_curve != "table":
+            return self
+        if not self.level_table:
+            raise ValueError("LEVEL_TABLE is required when LEVEL_CURVE=table")
+        if self.level_table[0] != 0:
+            raise ValueError("LEVEL_TABLE must start with 0 XP for level 1")
+        if any(cur <= prev for prev, cur in zip(self.level_table, self.level_table[1:])):
+            raise ValueError("LEVEL_TABLE thresholds must be strictly increasing")
+        return self
 
     @model_validator(mode="after")
     def ensure_async_sqlite(self) -> "Settings":
@@ -23,6 +92,8 @@ class Settings(BaseSettings):
 
         if self.database_url.startswith("sqlite://") and "+aiosqlite" not in self.database_url:
             self.database_url = self.database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        if self.read_database_url.startswith("sqlite://") and "+aiosqlite" not in self.read_database_url:
+            self.read_database_url = self.read_database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
         return self
 
 
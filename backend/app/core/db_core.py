@@ -1,10 +1,12 @@
 from datetime import datetime
 
 from sqlalchemy import event
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.core.config import settings
+from app.core.query_stats import instrument_engine
 
 
 class Base(DeclarativeBase):
@@ -13,9 +15,67 @@ class Base(DeclarativeBase):
     pass
 
 
+def sqlite_pragmas() -> dict[str, str | int]:
+    """PRAGMA values of the configured SQLite tuning profile."""
+
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+        "temp_store": settings.sqlite_temp_store,
+        "foreign_keys": "ON" if settings.sqlite_foreign_keys else "OFF",
+    }
+
+
+def apply_sqlite_pragmas(target: AsyncEngine, pragmas: dict[str, str | int]) -> None:
+    """Run `pragmas` on every new connection of a SQLite engine."""
+
+    if target.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(target.sync_engine, "connect")
+    def _on_connect(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def read_only_url(database_url: str) -> str | None:
+    """Read-only URI for a file-based SQLite URL; None when there is none (e.g. in-memory)."""
+
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    if url.database.startswith("file:"):
+        return None
+    return url.set(database=f"file:{url.database}", query={**url.query, "mode": "ro", "uri": "true"}).render_as_string(
+        hide_password=False
+    )
+
+
 engine = create_async_engine(settings.database_url, echo=False)
+apply_sqlite_pragmas(engine, sqlite_pragmas())
+instrument_engine(engine)
 SessionLocal = async_sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
+# Long scans run on their own pool so they never hold the writer's connections. Read-only
+# SQLite connections skip the journal_mode pragma (the writer sets it) and refuse writes.
+_read_url = settings.read_database_url or read_only_url(settings.database_url)
+if _read_url:
+    read_engine = create_async_engine(_read_url, echo=False, pool_size=settings.read_pool_size)
+    apply_sqlite_pragmas(
+        read_engine, {**{k: v for k, v in sqlite_pragmas().items() if k != "journal_mode"}, "query_only": "ON"}
+    )
+    instrument_engine(read_engine)
+else:
+    read_engine = engine
+ReadSessionLocal = async_sessionmaker(bind=read_engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
 
 def _set_timestamps(session, flush_context, _instances):
     """Ensure created_at/updated_at are always populated before flush."""
@@ -44,10 +104,18 @@ async def get_db():
         yield db
 
 
+async def get_read_db():
+    """FastAPI dependency yielding a session on the read engine, for endpoints that only read."""
+
+    async with ReadSessionLocal() as db:
+        yield db
+
+
 async def init_db() -> None:
-    """Create all tables on startup."""
+    """Bring the schema to the latest migration on startup."""
 
     from app import models  # noqa: F401  # ensure models are imported
+    from app.core.migrations import run_migrations
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    async with engine.connect() as conn:
+        await conn.run_sync(run_migrations)
@@ -0,0 +1,46 @@
+"""Geohash cells and bounding boxes for geographic aggregates."""
+
+from __future__ import annotations
+
+BBox = tuple[float, float, float, float]  # min_lon, min_lat, max_lon, max_lat
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def parse_bbox(text: str) -> BBox:
+    """Parse "min_lon,min_lat,max_lon,max_lat"; raises ValueError on malformed input."""
+
+    min_lon, min_lat, max_lon, max_lat = (float(v) for v in text.split(","))
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox minimums must not exceed maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Height (degrees of latitude) and width (degrees of longitude) of a geohash cell."""
+
+    bits = 5 * precision
+    return 180.0 / (1 << (bits // 2)), 360.0 / (1 << ((bits + 1) // 2))
+
+
+def encode(latitude: float, longitude: float, precision: int) -> tuple[str, float, float]:
+    """Geohash of a location and the center of its cell."""
+
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bit, ch, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch <<= 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+    return "".join(chars), (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
@@ -0,0 +1,276 @@
+"""Prometheus metrics: a small registry, multi-worker snapshots and the text exposition format.
+
+Every worker keeps its own values. When `metrics_multiproc_dir` is set, workers write
+snapshots to `<dir>/metrics-<pid>.json` (periodically and on every scrape) and a scrape
+on any worker merges all files: counters and histograms are summed over every worker that
+ran since the directory was cleared, gauges over live workers only. Clear the directory
+whenever the server restarts, as with prometheus_client's multiprocess mode.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> {"type", "help", "labelnames", "buckets"?, "values": {label values: value}}
+Merged = dict[str, dict[str, Any]]
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": [[list(key), value] for key, value in self.values.items()],
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: Any) -> None:
+        """Mirror a monotonic count kept elsewhere (e.g. a cache's hit counter)."""
+
+        self.values[self._key(labels)] = float(value)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        # Per-bucket (non-cumulative) counts with a trailing +Inf bucket, then the sum.
+        entry = self.values.setdefault(self._key(labels), [0] * (len(self.buckets) + 1) + [0.0])
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run `collector` before each snapshot to refresh values read from elsewhere."""
+
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict[str, Any]:
+        for collector in self._collectors:
+            collector()
+        return {
+            "pid": os.getpid(),
+            "written_at": time.time(),
+            "metrics": {name: metric.snapshot() for name, metric in self._metrics.items()},
+        }
+
+
+REGISTRY = Registry()
+
+
+def write_snapshot(snapshot: dict[str, Any], directory: Path) -> None:
+    """Atomically replace this worker's snapshot file."""
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"metrics-{snapshot['pid']}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_snapshots(directory: Path) -> list[dict[str, Any]]:
+    snapshots = []
+    for path in sorted(directory.glob("metrics-*.json")):
+        try:
+            snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):  # removed or replaced while reading
+            continue
+    return snapshots
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge(snapshots: Iterable[dict[str, Any]]) -> Merged:
+    """Sum snapshots of several workers; gauges of workers that are gone are left out."""
+
+    merged: Merged = {}
+    for snapshot in snapshots:
+        alive = _pid_alive(snapshot["pid"])
+        for name, metric in snapshot["metrics"].items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**{k: v for k, v in metric.items() if k != "values"}, "values": {}})
+            for key, value in metric["values"]:
+                key = tuple(key)
+                if metric["type"] == "histogram":
+                    current = target["values"].get(key)
+                    target["values"][key] = value if current is None else [a + b for a, b in zip(current, value)]
+                else:
+                    target["values"][key] = target["values"].get(key, 0.0) + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render(merged: Merged) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for key in sorted(metric["values"]):
+            value = metric["values"][key]
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(labelnames, key)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*metric["buckets"], float("inf")], value[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labelnames, key)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by method, route template and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds by method, route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being handled.", ("method",))
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route, so path parameters do not multiply the series."""
+
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", None) or route.path
+    if scope.get("endpoint") is not None:  # a mounted app, e.g. /media
+        return f"{scope.get('root_path', '')}/{{path}}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Scrapes are left out, or every worker's snapshot would count the scrape that wrote it.
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc(method=method)
+
+        async def send_recording_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_recording_status)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=method)
+            labels = {"method": method, "route": _route_template(scope), "status": status_code}
+            HTTP_REQUESTS.inc(**labels)
+            HTTP_LATENCY.observe(time.perf_counter() - started, **labels)
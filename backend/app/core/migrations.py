@@ -0,0 +1,83 @@
+"""Alembic migrations run from the app, on the app's own connection."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from app.core.db_core import Base
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    """Config for `alembic.ini`; with a connection, env.py migrates on it instead of opening its own."""
+
+    config = Config(str(ALEMBIC_INI))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str | None:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> str | None:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def run_migrations(connection: Connection) -> None:
+    """
+    Upgrade the database to head on a connection that is not inside `begin()`.
+
+    Databases created by `create_all` before migrations existed have tables but no
+    revision: their missing tables are created and they are stamped at the baseline, so
+    only the later revisions run.
+    """
+
+    config = alembic_config(connection)
+    if current_revision(connection) is None and inspect(connection).has_table("users"):
+        Base.metadata.create_all(connection)
+        command.stamp(config, BASELINE_REVISION)
+    # Alembic has to own the transaction so revisions can step out of it (autocommit_block).
+    connection.commit()
+    command.upgrade(config, "head")
+    connection.commit()
+    for problem in index_drift(connection):
+        logger.warning("Index drift after migrating: %s", problem)
+
+
+def index_drift(connection: Connection) -> list[str]:
+    """Indexes declared on the models that are missing or different in the database, and unknown extra ones."""
+
+    inspector = inspect(connection)
+    problems = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            problems.append(f"{table.name}: table missing")
+            continue
+        declared = {index.name: ([c.name for c in index.columns], bool(index.unique)) for index in table.indexes}
+        actual = {
+            index["name"]: (list(index["column_names"]), bool(index["unique"]))
+            for index in inspector.get_indexes(table.name)
+            if not index["name"].startswith("sqlite_autoindex_")
+        }
+        for name, (columns, unique) in sorted(declared.items()):
+            if name not in actual:
+                problems.append(f"{table.name}.{name}: missing")
+            elif actual[name] != (columns, unique):
+                problems.append(f"{table.name}.{name}: database has {actual[name]}, model declares {(columns, unique)}")
+        for name in sorted(actual.keys() - declared.keys()):
+            problems.append(f"{table.name}.{name}: not declared on the model")
+    return problems
@@ -0,0 +1,176 @@
+"""In-process publish/subscribe for live updates, with a pluggable cross-worker backend.
+
+Write services call `publish(...)` after committing. The configured backend carries each
+event to every worker (the `local` backend only reaches the current process), and the
+broker fans it out to the matching subscribers of this worker. Each subscriber has a
+bounded queue: when a slow client falls behind, the oldest events are dropped and counted
+so the client can be told to resync.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Protocol
+
+from app.core.config import settings
+from app.core.geo import BBox
+
+
+@dataclass(frozen=True)
+class Event:
+    type: str
+    data: dict[str, Any]
+    id: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"id": self.id, "type": self.type, "data": self.data, "created_at": self.created_at.isoformat()}
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "Event":
+        return cls(
+            type=payload["type"],
+            data=payload["data"],
+            id=payload["id"],
+            created_at=datetime.fromisoformat(payload["created_at"]),
+        )
+
+
+class Subscription:
+    """A subscriber's filters and bounded queue."""
+
+    def __init__(self, types: set[str] | None, bbox: BBox | None, user_id: int | None, maxsize: int):
+        self.types = types
+        self.bbox = bbox
+        self.user_id = user_id
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, event: Event) -> bool:
+        if self.types and event.type not in self.types:
+            return False
+        data = event.data
+        if self.user_id is not None and "user_id" in data and data["user_id"] != self.user_id:
+            return False
+        if self.bbox is not None and data.get("latitude") is not None:
+            # A moved point matters to subscribers watching either its old or its new location.
+            locations = [(data["latitude"], data["longitude"])]
+            if data.get("previous_latitude") is not None:
+                locations.append((data["previous_latitude"], data["previous_longitude"]))
+            return any(self._in_bbox(lat, lon) for lat, lon in locations)
+        return True
+
+    def _in_bbox(self, latitude: float, longitude: float) -> bool:
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        return min_lon <= longitude <= max_lon and min_lat <= latitude <= max_lat
+
+    def offer(self, event: Event) -> None:
+        """Enqueue without blocking the publisher; drop the oldest event when full."""
+
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class PubSubBackend(Protocol):
+    """Carries events between workers; `deliver` is called for every event received."""
+
+    async def start(self, deliver: Callable[[Event], None]) -> None: ...
+
+    async def publish(self, event: Event) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class LocalBackend:
+    """Single-process stand-in: events only reach subscribers of this worker."""
+
+    def __init__(self) -> None:
+        self._deliver: Callable[[Event], None] | None = None
+
+    async def start(self, deliver: Callable[[Event], None]) -> None:
+        self._deliver = deliver
+
+    async def publish(self, event: Event) -> None:
+        if self._deliver is not None:
+            self._deliver(event)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+_backends: dict[str, Callable[[], PubSubBackend]] = {"local": LocalBackend}
+
+
+def register_backend(name: str, factory: Callable[[], PubSubBackend]) -> None:
+    """Make a cross-worker backend (e.g. Redis or Postgres LISTEN/NOTIFY) selectable via PUBSUB_BACKEND."""
+
+    _backends[name] = factory
+
+
+class Broker:
+    def __init__(self, backend: PubSubBackend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.subscriptions: set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self._started = False
+
+    async def start(self) -> None:
+        if not self._started:
+            await self.backend.start(self._deliver)
+            self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self.backend.stop()
+            self._started = False
+
+    def subscribe(
+        self, types: set[str] | None = None, bbox: BBox | None = None, user_id: int | None = None
+    ) -> Subscription:
+        subscription = Subscription(types, bbox, user_id, self.queue_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    async def publish(self, event_type: str, data: dict[str, Any]) -> None:
+        if not self._started:
+            return
+        await self.backend.publish(Event(type=event_type, data=data, id=next(self._ids)))
+
+    def _deliver(self, event: Event) -> None:
+        for subscription in list(self.subscriptions):
+            if subscription.matches(event):
+                subscription.offer(event)
+
+
+_broker: Broker | None = None
+
+
+def get_broker() -> Broker:
+    """Return this worker's broker, created with the configured backend."""
+
+    global _broker
+    if _broker is None:
+        factory = _backends.get(settings.pubsub_backend)
+        if factory is None:
+            raise ValueError(f"Unknown pub/sub backend: {settings.pubsub_backend}")
+        _broker = Broker(factory(), settings.pubsub_queue_size)
+    return _broker
+
+
+async def publish(event_type: str, data: dict[str, Any]) -> None:
+    """Publish an event to live subscribers; a no-op until the broker is started."""
+
+    await get_broker().publish(event_type, data)
@@ -0,0 +1,145 @@
+"""Per-request SQL statistics: query count, DB time, slowest and repeated statements.
+
+Cursor hooks on the engines record into the stats of the current request (a context
+variable set by `QueryStatsMiddleware`, and inherited by tasks the request spawns). The
+middleware reports them as `X-DB-*` response headers and a log record; a statement run
+many times in one request is flagged as a probable N+1 pattern.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self, keep_slowest: int):
+        self.count = 0
+        self.total_ms = 0.0
+        self.keep_slowest = keep_slowest
+        self._slowest: list[tuple[float, int, str]] = []  # min-heap of (ms, seq, statement)
+        self.statements: dict[str, list] = {}  # statement -> [executions, total ms]
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed_ms
+        if self.keep_slowest > 0:
+            item = (elapsed_ms, self.count, statement)
+            if len(self._slowest) < self.keep_slowest:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest(self) -> list[dict[str, Any]]:
+        return [
+            {"ms": round(ms, 2), "statement": statement}
+            for ms, _, statement in sorted(self._slowest, reverse=True)
+        ]
+
+    def repeated(self, threshold: int) -> list[dict[str, Any]]:
+        """Statements run at least `threshold` times, most frequent first."""
+
+        return [
+            {"count": count, "ms": round(total, 2), "statement": statement}
+            for statement, (count, total) in sorted(self.statements.items(), key=lambda item: -item[1][0])
+            if count >= threshold
+        ]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _normalize(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()[: settings.sql_stats_statement_chars]
+
+
+def instrument_engine(target: AsyncEngine) -> None:
+    """Time every statement of `target` and record it in the current request's stats."""
+
+    sync_engine = target.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, _cursor, _statement, _parameters, _context, _executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, _cursor, statement, _parameters, _context, _executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats.record(_normalize(statement), (time.perf_counter() - conn.info["query_started"]) * 1000)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware collecting SQL statistics per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.sql_stats_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(settings.sql_stats_slowest)
+        token = _current.set(stats)
+        status_code = None
+
+        async def send_with_headers(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                # Streaming responses (SSE) report what ran before the first byte.
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.2f}".encode()))
+                repeated = stats.repeated(settings.sql_n_plus_one_threshold)
+                if repeated:
+                    headers.append((b"x-db-n-plus-one", str(len(repeated)).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            self._log(scope, status_code, stats)
+
+    @staticmethod
+    def _log(scope, status_code: int | None, stats: QueryStats) -> None:
+        repeated = stats.repeated(settings.sql_n_plus_one_threshold)
+        level = logging.WARNING if repeated else logging.DEBUG
+        if not stats.count or not logger.isEnabledFor(level):
+            return
+        fields = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "db_queries": stats.count,
+            "db_time_ms": round(stats.total_ms, 2),
+            "db_slowest": stats.slowest(),
+            "db_repeated": repeated,
+        }
+        message = "%s %s %s: %d queries in %.1f ms"
+        args = [fields["method"], fields["path"], status_code, stats.count, stats.total_ms]
+        if repeated:
+            message += "; probable N+1: %s"
+            args.append("; ".join(f"{r['count']}x {r['statement']}" for r in repeated))
+        logger.log(level, message, *args, extra=fields)
@@ -1,9 +1,43 @@
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models import achievement_models  # noqa: F401
+from app.models import activity_models  # noqa: F401
 from app.models import db_models  # noqa: F401
+from app.models import leaderboard_models  # noqa: F401
+from app.models import meta_models  # noqa: F401
+from app.models import rollup_models  # noqa: F401
+from app.models import stats_models  # noqa: F401
 
 # Export models for convenience
 from app.models.achievement_models import Achievement, UserAchievement
+from app.models.activity_models import ActivityEvent
 from app.models.db_models import Criteria, Industry, Mark, Point, SubIndustry, User
+from app.models.leaderboard_models import LeaderboardEntry
+from app.models.meta_models import AppMeta
+from app.models.rollup_models import (
+    DailyActiveSketch,
+    DailyRollup,
+    GeoCellRollup,
+    PeriodRollup,
+    ScoreSketchBucket,
+)
+from app.models.stats_models import UserStats
 
-__all__ = ["User", "Industry", "SubIndustry", "Criteria", "Point", "Mark", "Achievement", "UserAchievement"]
+__all__ = [
+    "User",
+    "Industry",
+    "SubIndustry",
+    "Criteria",
+    "Point",
+    "Mark",
+    "Achievement",
+    "UserAchievement",
+    "ActivityEvent",
+    "UserStats",
+    "LeaderboardEntry",
+    "AppMeta",
+    "DailyRollup",
+    "PeriodRollup",
+    "DailyActiveSketch",
+    "ScoreSketchBucket",
+    "GeoCellRollup",
+]
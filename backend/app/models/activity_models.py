@@ -0,0 +1,29 @@
+"""Models for the append-only user activity log."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db_core import Base
+from app.models.my_types import int_pk, str_255, str_64
+
+
+class ActivityEvent(Base):
+    """One XP-relevant action of a user, written by the point/mark/achievement write paths."""
+
+    __tablename__ = "activity_events"
+    __table_args__ = (Index("ix_activity_events_user_occurred", "user_id", "occurred_at", "id"),)
+
+    id: Mapped[int_pk]
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    event_type: Mapped[str_64] = mapped_column(nullable=False)  # see ActivityType
+    occurred_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    title: Mapped[str_255] = mapped_column(nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    xp_gained: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # XP actually awarded at the time
+    point_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    achievement_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
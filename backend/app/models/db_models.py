@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Boolean, Float, ForeignKey, Integer, UniqueConstraint, JSON
+from sqlalchemy import Boolean, Float, ForeignKey, Index, Integer, UniqueConstraint, JSON
 from sqlalchemy import DateTime, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -35,6 +35,7 @@ class User(Base):
     points: Mapped[List["Point"]] = relationship(back_populates="creator", cascade="all, delete-orphan")
     marks: Mapped[List["Mark"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     user_achievements: Mapped[List["UserAchievement"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    stats: Mapped[Optional["UserStats"]] = relationship(back_populates="user", cascade="all, delete-orphan")
 
 
 class Industry(Base):
@@ -90,7 +91,10 @@ class Criteria(Base):
         DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    __table_args__ = (UniqueConstraint("text", "industry_id", name="uq_criteria_text_per_industry"),)
+    __table_args__ = (
+        UniqueConstraint("text", "industry_id", name="uq_criteria_text_per_industry"),
+        Index("ix_criteria_industry_id", "industry_id"),
+    )
 
 
 class Point(Base):
@@ -123,6 +127,13 @@ class Point(Base):
     evaluations: Mapped[List["Mark"]] = relationship(back_populates="point", cascade="all, delete-orphan")
     creator: Mapped[Optional["User"]] = relationship(back_populates="points")
 
+    __table_args__ = (
+        Index("ix_points_creator_created", "creator_id", "created_at"),
+        Index("ix_points_industry_created", "industry_id", "created_at"),
+        Index("ix_points_created_at", "created_at"),
+        Index("ix_points_mark", "mark"),
+    )
+
 
 class Mark(Base):
     __tablename__ = "marks"
@@ -152,3 +163,8 @@ class Mark(Base):
 
     point: Mapped["Point"] = relationship(back_populates="evaluations")
     user: Mapped[Optional["User"]] = relationship(back_populates="marks")
+
+    __table_args__ = (
+        Index("ix_marks_user_created", "user_id", "created_at"),
+        Index("ix_marks_created_at", "created_at"),
+    )
@@ -0,0 +1,21 @@
+"""Models for materialized leaderboards."""
+
+from __future__ import annotations
+
+from sqlalchemy import Float, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db_core import Base
+from app.models.my_types import str_64
+
+
+class LeaderboardEntry(Base):
+    """Score of one user on one board/scope, e.g. ("marks", "industry:3") or ("xp", "week:2026-10-12")."""
+
+    __tablename__ = "leaderboard_entries"
+    __table_args__ = (Index("ix_leaderboard_entries_board_scope_score", "board", "scope", "score"),)
+
+    board: Mapped[str_64] = mapped_column(primary_key=True)
+    scope: Mapped[str_64] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
+    score: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
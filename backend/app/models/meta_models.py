@@ -0,0 +1,21 @@
+"""Models for application-level bookkeeping."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db_core import Base
+from app.models.my_types import str_64
+
+
+class AppMeta(Base):
+    """Key/value pairs about the database itself, e.g. the applied bootstrap version."""
+
+    __tablename__ = "app_meta"
+
+    key: Mapped[str_64] = mapped_column(primary_key=True)
+    value: Mapped[str] = mapped_column(Text, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
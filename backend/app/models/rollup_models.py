@@ -0,0 +1,89 @@
+"""Models for pre-aggregated analytics rollups."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Float, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db_core import Base
+
+
+class DailyRollup(Base):
+    """Per-day, per-industry activity counters maintained by the write paths.
+
+    `industry_id` is 0 for counters that have no industry (new users).
+    """
+
+    __tablename__ = "daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    industry_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    new_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    new_points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    marks: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    photos: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    score_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)  # sum of marks' total_score
+
+
+class DailyActiveSketch(Base):
+    """HyperLogLog registers of the users who created a point or mark on a day."""
+
+    __tablename__ = "daily_active_sketches"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    registers: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class ScoreSketchBucket(Base):
+    """DDSketch bucket counts of marks' `total_score` per day, industry and sub-industry.
+
+    `industry_id` / `sub_industry_id` are 0 when the point has none.
+    """
+
+    __tablename__ = "score_sketch_buckets"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    industry_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sub_industry_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class PeriodRollup(Base):
+    """Hourly, weekly and monthly counterparts of `DailyRollup`.
+
+    `period` is "hour", "week" or "month" and `start` the beginning of the bucket
+    (weeks start on Monday).
+    """
+
+    __tablename__ = "period_rollups"
+
+    period: Mapped[str] = mapped_column(String(8), primary_key=True)
+    start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    industry_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    new_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    new_points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    marks: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    photos: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    score_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+
+
+class GeoCellRollup(Base):
+    """Point and mark counters per geohash cell and industry, at several precisions.
+
+    `latitude`/`longitude` are the cell center, used for bounding-box queries.
+    """
+
+    __tablename__ = "geo_cell_rollups"
+    __table_args__ = (Index("ix_geo_cell_rollups_center", "precision", "latitude", "longitude"),)
+
+    precision: Mapped[int] = mapped_column(Integer, primary_key=True)
+    geohash: Mapped[str] = mapped_column(String(12), primary_key=True)
+    industry_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    latitude: Mapped[float] = mapped_column(Float, nullable=False)
+    longitude: Mapped[float] = mapped_column(Float, nullable=False)
+    points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    marks: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    score_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)
@@ -0,0 +1,31 @@
+"""Models for denormalized per-user statistics."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.db_core import Base
+
+
+class UserStats(Base):
+    """Counters maintained by the mark/point write paths, one row per user."""
+
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    marks_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    points_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    photos_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_active_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)  # last local day with a mark
+    current_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # days ending at last_active_date
+    best_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_active_week: Mapped[Optional[date]] = mapped_column(Date, nullable=True)  # Monday of the last active week
+    current_week_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    best_week_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    user: Mapped["User"] = relationship(back_populates="stats")
@@ -0,0 +1,13 @@
+"""Schemas for analytics query parameters."""
+
+from enum import Enum
+
+
+class AnalyticsBucket(str, Enum):
+    """Width of the time buckets of analytics series; `auto` picks one from the range length."""
+
+    AUTO = "auto"
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
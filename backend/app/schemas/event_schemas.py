@@ -0,0 +1,13 @@
+"""Schemas for the live update stream."""
+
+from enum import Enum
+
+
+class LiveEventType(str, Enum):
+    """Event names sent on the live stream (the SSE `event:` field)."""
+
+    POINT_CREATED = "point.created"
+    POINT_UPDATED = "point.updated"
+    POINT_DELETED = "point.deleted"
+    POINT_RATING_CHANGED = "point.rating_changed"
+    ACHIEVEMENT_UNLOCKED = "achievement.unlocked"
@@ -0,0 +1,39 @@
+"""Schemas for leaderboard API responses."""
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class LeaderboardBoard(str, Enum):
+    """Available leaderboards."""
+
+    XP = "xp"
+    ENGAGEMENT = "engagement"
+    MARKS = "marks"
+
+
+class LeaderboardPeriod(str, Enum):
+    """Time window of a leaderboard."""
+
+    ALL = "all"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class LeaderboardEntryRead(BaseModel):
+    """One ranked user on a leaderboard."""
+
+    rank: int = Field(description="1-based position, ties broken by user id")
+    user_id: int
+    username: str | None = None
+    score: float
+
+
+class LeaderboardRead(BaseModel):
+    """A slice of a leaderboard."""
+
+    board: LeaderboardBoard
+    scope: str = Field(description="Scope key, e.g. all, industry:3, week:2026-10-12, month:2026-10")
+    total: int = Field(description="Number of ranked users on this board")
+    entries: list[LeaderboardEntryRead]
@@ -1,12 +1,24 @@
 """Service for handling user achievements."""
 
-from datetime import date, datetime, timedelta
+import time
+from datetime import datetime
 
-from sqlalchemy import func, select
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Achievement, Mark, Point, User, UserAchievement
+from app.core.config import settings
+from app.core.pubsub import publish
+from app.models import Achievement, UserAchievement, UserStats
+from app.schemas.activity_schemas import ActivityType
+from app.schemas.event_schemas import LiveEventType
+from app.services.activity_service import achievement_title, record_activity
 from app.services.gamification_service import add_xp
+from app.services.stats_service import get_user_stats, live_day_streak
+
+# In-process cache of the achievement catalog, see get_achievement_catalog().
+_achievement_catalog: dict[int, Achievement] | None = None
+_achievement_catalog_loaded_at = 0.0
 
 
 async def get_or_create_user_achievement(
@@ -44,13 +56,22 @@ async def check_and_update_achievement(
     Returns list of newly completed achievements.
     """
     # Get all achievements of this type
-    achievements_query = select(Achievement).where(Achievement.achievement_type == achievement_type)
-    result = await db.execute(achievements_query)
-    achievements = list(result.scalars().all())
+    catalog = await get_achievement_catalog(db)
+    achievements = [a for a in catalog.values() if a.achievement_type == achievement_type]
     
     if not achievements:
         return []
     
+    # Calculate current progress once; it is the same for every achievement of this type
+    if achievement_type == "marks_count":
+        progress = await get_user_marks_count(db, user_id)
+    elif achievement_type == "points_count":
+        progress = await get_user_points_count(db, user_id)
+    elif achievement_type == "marks_streak":
+        progress = await get_user_marks_streak(db, user_id)
+    else:
+        return []
+
     newly_completed = []
     
     for achievement in achievements:
@@ -61,16 +82,6 @@ async def check_and_update_achievement(
         if user_achievement.is_completed:
             continue
         
-        # Calculate current progress based on achievement type
-        if achievement_type == "marks_count":
-            progress = await get_user_marks_count(db, user_id)
-        elif achievement_type == "points_count":
-            progress = await get_user_points_count(db, user_id)
-        elif achievement_type == "marks_streak":
-            progress = await get_user_marks_streak(db, user_id)
-        else:
-            continue
-        
         # Update progress
         user_achievement.progress = progress
         
@@ -78,6 +89,16 @@ async def check_and_update_achievement(
         if progress >= achievement.requirement_value and not user_achievement.is_completed:
             user_achievement.is_completed = True
             user_achievement.completed_at = datetime.utcnow()
+            record_activity(
+                db,
+                user_id,
+                ActivityType.ACHIEVEMENT_UNLOCKED,
+                occurred_at=user_achievement.completed_at,
+                title=achievement_title(achievement),
+                description=achievement.description,
+                xp_gained=achievement.xp_reward or None,
+                achievement_id=achievement.id,
+            )
             
             # Award XP for completing achievement
             if achievement.xp_reward > 0:
@@ -90,59 +111,39 @@ async def check_and_update_achievement(
     # Refresh all newly completed achievements
     for ua in newly_completed:
         await db.refresh(ua)
+        achievement = catalog[ua.achievement_id]
+        await publish(
+            LiveEventType.ACHIEVEMENT_UNLOCKED.value,
+            {
+                "user_id": user_id,
+                "achievement_id": achievement.id,
+                "name": achievement.name,
+                "xp_reward": achievement.xp_reward,
+            },
+        )
     
     return newly_completed
 
 
 async def get_user_marks_count(db: AsyncSession, user_id: int) -> int:
     """Get total count of marks (reviews) created by user."""
-    result = await db.execute(select(func.count(Mark.id)).where(Mark.user_id == user_id))
-    return result.scalar() or 0
+    stats = await get_user_stats(db, user_id)
+    return stats.marks_count if stats else 0
 
 
 async def get_user_points_count(db: AsyncSession, user_id: int) -> int:
     """Get total count of points created by user."""
-    result = await db.execute(select(func.count(Point.id)).where(Point.creator_id == user_id))
-    return result.scalar() or 0
+    stats = await get_user_stats(db, user_id)
+    return stats.points_count if stats else 0
 
 
 async def get_user_marks_streak(db: AsyncSession, user_id: int) -> int:
     """
-    Calculate current streak of consecutive days with at least one mark.
-    Returns the number of consecutive days ending today.
+    Get current streak of consecutive days with at least one mark.
+    The streak stays alive while the last mark was made today or yesterday
+    (days are counted in the configured streak timezone).
     """
-    # Get all marks for this user, ordered by date
-    marks_query = select(Mark).where(Mark.user_id == user_id).order_by(Mark.created_at.desc())
-    result = await db.execute(marks_query)
-    marks = list(result.scalars().all())
-    
-    if not marks:
-        return 0
-    
-    # Group marks by date
-    marks_by_date: dict[date, bool] = {}
-    for mark in marks:
-        mark_date = mark.created_at.date()
-        marks_by_date[mark_date] = True
-    
-    # Calculate streak starting from today
-    current_date = date.today()
-    streak = 0
-    
-    # Check if there's a mark today or yesterday (to allow for timezone differences)
-    check_date = current_date
-    if check_date not in marks_by_date and (current_date - timedelta(days=1)) not in marks_by_date:
-        # If no mark today or yesterday, check if we should start from yesterday
-        check_date = current_date - timedelta(days=1)
-        if check_date not in marks_by_date:
-            return 0
-    
-    # Count consecutive days backwards
-    while check_date in marks_by_date:
-        streak += 1
-        check_date -= timedelta(days=1)
-    
-    return streak
+    return live_day_streak(await get_user_stats(db, user_id))
 
 
 async def check_marks_achievements(db: AsyncSession, user_id: int) -> list[UserAchievement]:
@@ -180,26 +181,54 @@ async def get_all_achievements_with_user_progress(
     Get all achievements with user progress.
     Returns list of dictionaries with achievement and user progress info.
     If user hasn't started an achievement, progress will be 0 and is_completed will be False.
+    
+    Served by one query (achievements LEFT JOIN user_achievements LEFT JOIN user_stats);
+    achievement details come from the in-process catalog.
     """
-    # Get all achievements
-    all_achievements = await list_achievements(db)
+    catalog = await get_achievement_catalog(db)
     
-    # Get user achievements as a dict for quick lookup
-    user_achievements_result = await db.execute(
-        select(UserAchievement).where(UserAchievement.user_id == user_id)
-    )
-    user_achievements_list = list(user_achievements_result.scalars().all())
-    user_achievements_dict = {ua.achievement_id: ua for ua in user_achievements_list}
+    rows = (
+        await db.execute(
+            select(
+                Achievement.id,
+                UserAchievement.progress,
+                UserAchievement.is_completed,
+                UserAchievement.completed_at,
+                UserStats,
+            )
+            .select_from(Achievement)
+            .outerjoin(
+                UserAchievement,
+                (UserAchievement.achievement_id == Achievement.id) & (UserAchievement.user_id == user_id),
+            )
+            .outerjoin(UserStats, UserStats.user_id == user_id)
+            .order_by(Achievement.id)
+        )
+    ).all()
+    
+    stats = next((row[4] for row in rows if row[4] is not None), None)
+    if stats is None and rows:
+        # First visit since user_stats was introduced: build the row once
+        stats = await get_user_stats(db, user_id)
+        await db.commit()
+    
+    # Calculate current progress for each achievement type from the user's stats row
+    marks_count = stats.marks_count if stats else 0
+    points_count = stats.points_count if stats else 0
+    marks_streak = live_day_streak(stats)
     
-    # Calculate current progress for each achievement type
-    marks_count = await get_user_marks_count(db, user_id)
-    points_count = await get_user_points_count(db, user_id)
-    marks_streak = await get_user_marks_streak(db, user_id)
+    if any(row[0] not in catalog for row in rows):
+        # Added since the catalog was loaded
+        catalog = await get_achievement_catalog(db, reload=True)
     
     result = []
-    for achievement in all_achievements:
-        # Get user achievement if exists
-        user_achievement = user_achievements_dict.get(achievement.id)
+    seen: set[int] = set()
+    for achievement_id, saved_progress, saved_completed, saved_completed_at, _ in rows:
+        achievement = catalog.get(achievement_id)
+        if achievement is None or achievement_id in seen:
+            # Deleted after the rows were read
+            continue
+        seen.add(achievement_id)
         
         # Calculate current progress based on achievement type
         if achievement.achievement_type == "marks_count":
@@ -212,12 +241,12 @@ async def get_all_achievements_with_user_progress(
             current_progress = 0
         
         # Use user_achievement data if exists, otherwise create default
-        if user_achievement:
+        if saved_progress is not None:
             # Use saved progress from UserAchievement, but ensure it doesn't exceed current_progress
             # This allows showing saved progress even if real data is different
-            progress = user_achievement.progress
-            is_completed = user_achievement.is_completed
-            completed_at = user_achievement.completed_at
+            progress = saved_progress
+            is_completed = saved_completed
+            completed_at = saved_completed_at
             # Update is_completed if current progress meets requirement (but keep saved progress)
             if current_progress >= achievement.requirement_value and not is_completed:
                 is_completed = True
@@ -240,9 +269,38 @@ async def get_all_achievements_with_user_progress(
     return result
 
 
+async def get_achievement_catalog(db: AsyncSession, reload: bool = False) -> dict[int, Achievement]:
+    """
+    Return all achievements keyed by id, cached for `achievement_catalog_ttl_seconds`.
+    
+    initialize_default_achievements invalidates the cache at once; achievements written
+    elsewhere (SQL, scripts, other workers) show up within the TTL, or right away for
+    callers that `reload` on an id they do not know. Cached objects are detached from
+    the loading session.
+    """
+    global _achievement_catalog, _achievement_catalog_loaded_at
+    expired = time.monotonic() - _achievement_catalog_loaded_at >= settings.achievement_catalog_ttl_seconds
+    if _achievement_catalog is None or expired or reload:
+        result = await db.execute(select(Achievement).order_by(Achievement.id))
+        achievements = list(result.scalars().all())
+        for achievement in achievements:
+            db.expunge(achievement)
+        _achievement_catalog = {achievement.id: achievement for achievement in achievements}
+        _achievement_catalog_loaded_at = time.monotonic()
+    return _achievement_catalog
+
+
+def invalidate_achievement_catalog() -> None:
+    """Drop the cached catalog so the next access reloads it."""
+    global _achievement_catalog
+    _achievement_catalog = None
+
+
 async def get_achievement(db: AsyncSession, achievement_id: int) -> Achievement:
     """Get an achievement by ID."""
-    achievement = await db.get(Achievement, achievement_id)
+    achievement = (await get_achievement_catalog(db)).get(achievement_id)
+    if not achievement:
+        achievement = (await get_achievement_catalog(db, reload=True)).get(achievement_id)
     if not achievement:
         raise ValueError(f"Achievement with id {achievement_id} not found")
     return achievement
@@ -250,95 +308,96 @@ async def get_achievement(db: AsyncSession, achievement_id: int) -> Achievement:
 
 async def list_achievements(db: AsyncSession) -> list[Achievement]:
     """List all available achievements."""
-    result = await db.execute(select(Achievement))
-    return list(result.scalars().all())
+    return list((await get_achievement_catalog(db)).values())
+
+
+DEFAULT_ACHIEVEMENTS: list[dict] = [
+    {
+        "name": "Первый отзыв",
+        "description": "Оставьте свой первый отзыв",
+        "achievement_type": "marks_count",
+        "requirement_value": 1,
+        "xp_reward": 25,
+    },
+    {
+        "name": "Активный рецензент",
+        "description": "Оставьте 10 отзывов",
+        "achievement_type": "marks_count",
+        "requirement_value": 10,
+        "xp_reward": 100,
+    },
+    {
+        "name": "Эксперт по отзывам",
+        "description": "Оставьте 50 отзывов",
+        "achievement_type": "marks_count",
+        "requirement_value": 50,
+        "xp_reward": 500,
+    },
+    {
+        "name": "Мастер отзывов",
+        "description": "Оставьте 100 отзывов",
+        "achievement_type": "marks_count",
+        "requirement_value": 100,
+        "xp_reward": 1000,
+    },
+    {
+        "name": "Первый объект",
+        "description": "Создайте свою первую точку на карте",
+        "achievement_type": "points_count",
+        "requirement_value": 1,
+        "xp_reward": 50,
+    },
+    {
+        "name": "Картограф",
+        "description": "Создайте 10 точек на карте",
+        "achievement_type": "points_count",
+        "requirement_value": 10,
+        "xp_reward": 200,
+    },
+    {
+        "name": "Мастер картографии",
+        "description": "Создайте 50 точек на карте",
+        "achievement_type": "points_count",
+        "requirement_value": 50,
+        "xp_reward": 1000,
+    },
+    {
+        "name": "Ежедневная активность",
+        "description": "Оставляйте отзывы каждый день на протяжении 3 дней",
+        "achievement_type": "marks_streak",
+        "requirement_value": 3,
+        "xp_reward": 75,
+    },
+    {
+        "name": "Неделя активности",
+        "description": "Оставляйте отзывы каждый день на протяжении 7 дней",
+        "achievement_type": "marks_streak",
+        "requirement_value": 7,
+        "xp_reward": 200,
+    },
+    {
+        "name": "Декада активности",
+        "description": "Оставляйте отзывы каждый день на протяжении 10 дней",
+        "achievement_type": "marks_streak",
+        "requirement_value": 10,
+        "xp_reward": 500,
+    },
+]
 
 
 async def initialize_default_achievements(db: AsyncSession) -> None:
-    """Initialize default achievements if they don't exist."""
-    default_achievements = [
-        {
-            "name": "Первый отзыв",
-            "description": "Оставьте свой первый отзыв",
-            "achievement_type": "marks_count",
-            "requirement_value": 1,
-            "xp_reward": 25,
-        },
-        {
-            "name": "Активный рецензент",
-            "description": "Оставьте 10 отзывов",
-            "achievement_type": "marks_count",
-            "requirement_value": 10,
-            "xp_reward": 100,
-        },
-        {
-            "name": "Эксперт по отзывам",
-            "description": "Оставьте 50 отзывов",
-            "achievement_type": "marks_count",
-            "requirement_value": 50,
-            "xp_reward": 500,
-        },
-        {
-            "name": "Мастер отзывов",
-            "description": "Оставьте 100 отзывов",
-            "achievement_type": "marks_count",
-            "requirement_value": 100,
-            "xp_reward": 1000,
-        },
-        {
-            "name": "Первый объект",
-            "description": "Создайте свою первую точку на карте",
-            "achievement_type": "points_count",
-            "requirement_value": 1,
-            "xp_reward": 50,
+    """Insert or update the default achievements with a single upsert keyed by name."""
+    now = datetime.utcnow()
+    stmt = sqlite_insert(Achievement).values([{**data, "created_at": now} for data in DEFAULT_ACHIEVEMENTS])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Achievement.name],
+        set_={
+            "description": stmt.excluded.description,
+            "achievement_type": stmt.excluded.achievement_type,
+            "requirement_value": stmt.excluded.requirement_value,
+            "xp_reward": stmt.excluded.xp_reward,
         },
-        {
-            "name": "Картограф",
-            "description": "Создайте 10 точек на карте",
-            "achievement_type": "points_count",
-            "requirement_value": 10,
-            "xp_reward": 200,
-        },
-        {
-            "name": "Мастер картографии",
-            "description": "Создайте 50 точек на карте",
-            "achievement_type": "points_count",
-            "requirement_value": 50,
-            "xp_reward": 1000,
-        },
-        {
-            "name": "Ежедневная активность",
-            "description": "Оставляйте отзывы каждый день на протяжении 3 дней",
-            "achievement_type": "marks_streak",
-            "requirement_value": 3,
-            "xp_reward": 75,
-        },
-        {
-            "name": "Неделя активности",
-            "description": "Оставляйте отзывы каждый день на протяжении 7 дней",
-            "achievement_type": "marks_streak",
-            "requirement_value": 7,
-            "xp_reward": 200,
-        },
-        {
-            "name": "Декада активности",
-            "description": "Оставляйте отзывы каждый день на протяжении 10 дней",
-            "achievement_type": "marks_streak",
-            "requirement_value": 10,
-            "xp_reward": 500,
-        },
-    ]
-    
-    for achievement_data in default_achievements:
-        # Check if achievement already exists
-        existing = await db.execute(
-            select(Achievement).where(Achievement.name == achievement_data["name"])
-        )
-        if existing.scalar_one_or_none():
-            continue
-        
-        achievement = Achievement(**achievement_data)
-        db.add(achievement)
-    
+    )
+    await db.execute(stmt)
     await db.commit()
-
+    invalidate_achievement_catalog()
@@ -1,101 +1,185 @@
-"""Service for retrieving user activity."""
+"""Service for recording and retrieving user activity."""
 
+import base64
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import select
+from fastapi import HTTPException, status
+from sqlalchemy import String, delete, func, insert, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.models import Achievement, Mark, Point, UserAchievement
+from app.models import Achievement, ActivityEvent, Mark, Point, UserAchievement
 from app.schemas.activity_schemas import ActivityRead, ActivityType
 from app.services.gamification_service import XP_FOR_MARK_CREATION, XP_FOR_POINT_CREATION
 
 
+def record_activity(
+    db: AsyncSession,
+    user_id: int | None,
+    activity_type: ActivityType,
+    *,
+    occurred_at: datetime,
+    title: str,
+    description: str | None = None,
+    xp_gained: int | None = None,
+    point_id: int | None = None,
+    achievement_id: int | None = None,
+) -> None:
+    """Append an activity event to the session; it is written with the caller's commit."""
+
+    if user_id is None:
+        return
+    db.add(
+        ActivityEvent(
+            user_id=user_id,
+            event_type=activity_type.value,
+            occurred_at=occurred_at,
+            title=title,
+            description=description,
+            xp_gained=xp_gained,
+            point_id=point_id,
+            achievement_id=achievement_id,
+        )
+    )
+
+
+def point_created_title(point: Point) -> str:
+    return f"Создана точка: {point.name}"
+
+
+def mark_created_title(point: Point | None) -> str:
+    return f"Оставлен отзыв: {point.name if point else 'Неизвестная точка'}"
+
+
+def achievement_title(achievement: Achievement) -> str:
+    return f"Получено достижение: {achievement.name}"
+
+
+def encode_activity_cursor(event: ActivityEvent) -> str:
+    raw = f"{event.occurred_at.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_activity_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        occurred_at, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(occurred_at), int(event_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.") from exc
+
+
 async def get_user_activity(
-    db: AsyncSession, user_id: int, limit: int = 50
-) -> List[ActivityRead]:
+    db: AsyncSession, user_id: int, limit: int = 50, cursor: str | None = None
+) -> tuple[List[ActivityRead], str | None]:
     """
-    Get recent user activity (points created, marks created, achievements unlocked).
-    
-    Returns activities sorted by timestamp (most recent first).
+    Get user activity (points created, marks created, achievements unlocked), most recent first.
+
+    Returns one page and the cursor of the next page (None on the last page).
     """
-    activities: List[ActivityRead] = []
-
-    # Get points created by user
-    points_result = await db.execute(
-        select(Point)
-        .where(Point.creator_id == user_id)
-        .order_by(Point.created_at.desc())
-        .limit(limit)
+    query = select(ActivityEvent).where(ActivityEvent.user_id == user_id)
+    if cursor:
+        query = query.where(tuple_(ActivityEvent.occurred_at, ActivityEvent.id) < tuple_(*_decode_activity_cursor(cursor)))
+    result = await db.execute(
+        query.order_by(ActivityEvent.occurred_at.desc(), ActivityEvent.id.desc()).limit(limit + 1)
     )
-    points = list(points_result.scalars().all())
-
-    for point in points:
-        activities.append(
-            ActivityRead(
-                type=ActivityType.POINT_CREATED,
-                timestamp=point.created_at,
-                title=f"Создана точка: {point.name}",
-                description=f"Точка на карте создана",
-                xp_gained=XP_FOR_POINT_CREATION if point.creator_id else None,
-                point_id=point.id,
-            )
+    events = list(result.scalars().all())
+
+    next_cursor = encode_activity_cursor(events[limit - 1]) if len(events) > limit else None
+    activities = [
+        ActivityRead(
+            type=ActivityType(event.event_type),
+            timestamp=event.occurred_at,
+            title=event.title,
+            description=event.description,
+            xp_gained=event.xp_gained,
+            point_id=event.point_id,
+            achievement_id=event.achievement_id,
         )
+        for event in events[:limit]
+    ]
+    return activities, next_cursor
+
 
-    # Get marks (reviews) created by user
-    marks_result = await db.execute(
-        select(Mark)
-        .options(selectinload(Mark.point))
-        .where(Mark.user_id == user_id)
-        .order_by(Mark.created_at.desc())
-        .limit(limit)
+async def detach_point_activity(db: AsyncSession, point_id: int) -> None:
+    """Keep the history of a deleted point but drop the dangling link."""
+
+    await db.execute(
+        update(ActivityEvent)
+        .where(ActivityEvent.point_id == point_id)
+        .values(point_id=None)
+        .execution_options(synchronize_session=False)
     )
-    marks = list(marks_result.scalars().all())
-
-    for mark in marks:
-        point_name = mark.point.name if mark.point else "Неизвестная точка"
-        activities.append(
-            ActivityRead(
-                type=ActivityType.MARK_CREATED,
-                timestamp=mark.created_at,
-                title=f"Оставлен отзыв: {point_name}",
-                description=f"Оценка: {mark.total_score:.1f}",
-                xp_gained=XP_FOR_MARK_CREATION if mark.user_id else None,
-                point_id=mark.point_id,
-            )
-        )
 
-    # Get achievements unlocked by user
-    achievements_result = await db.execute(
-        select(UserAchievement)
-        .options(selectinload(UserAchievement.achievement))
-        .where(
-            UserAchievement.user_id == user_id,
-            UserAchievement.is_completed == True,
-            UserAchievement.completed_at.isnot(None),
+
+def _stored_timestamp(column):
+    """
+    `column` as the DateTime type writes it ('YYYY-MM-DD HH:MM:SS.ffffff').
+
+    Rows written before the ORM stored microseconds lack the fraction; copied as-is they
+    would sort below the cursor bound of their own second and repeat on every page.
+    """
+
+    seconds = func.strftime("%Y-%m-%d %H:%M:%S", column, type_=String)
+    return func.substr(seconds + func.substr(column, 20, type_=String) + ".000000", 1, 26, type_=String)
+
+
+async def rebuild_activity_events(db: AsyncSession) -> int:
+    """
+    Recreate the activity log from points, marks and completed achievements.
+
+    Uses INSERT ... SELECT per source, so the rows never pass through Python.
+    Returns the number of events written.
+    """
+
+    await db.execute(delete(ActivityEvent))
+
+    columns = ["user_id", "event_type", "occurred_at", "title", "description", "xp_gained", "point_id", "achievement_id"]
+    sources = [
+        select(
+            Point.creator_id,
+            literal(ActivityType.POINT_CREATED.value),
+            _stored_timestamp(Point.created_at),
+            literal("Создана точка: ") + Point.name,
+            literal("Точка на карте создана"),
+            literal(XP_FOR_POINT_CREATION),
+            Point.id,
+            literal(None),
+        ).where(Point.creator_id.is_not(None)),
+        select(
+            Mark.user_id,
+            literal(ActivityType.MARK_CREATED.value),
+            _stored_timestamp(Mark.created_at),
+            literal("Оставлен отзыв: ") + Point.name,
+            literal("Оценка: ") + func.printf("%.1f", Mark.total_score),
+            literal(XP_FOR_MARK_CREATION),
+            Mark.point_id,
+            literal(None),
         )
-        .order_by(UserAchievement.completed_at.desc())
-        .limit(limit)
-    )
-    user_achievements = list(achievements_result.scalars().all())
-
-    for user_achievement in user_achievements:
-        if user_achievement.completed_at and user_achievement.achievement:
-            activities.append(
-                ActivityRead(
-                    type=ActivityType.ACHIEVEMENT_UNLOCKED,
-                    timestamp=user_achievement.completed_at,
-                    title=f"Получено достижение: {user_achievement.achievement.name}",
-                    description=user_achievement.achievement.description,
-                    xp_gained=user_achievement.achievement.xp_reward if user_achievement.achievement.xp_reward > 0 else None,
-                    achievement_id=user_achievement.achievement_id,
-                )
-            )
-
-    # Sort all activities by timestamp (most recent first)
-    activities.sort(key=lambda x: x.timestamp, reverse=True)
-
-    # Limit to requested number
-    return activities[:limit]
+        .join(Point, Point.id == Mark.point_id)
+        .where(Mark.user_id.is_not(None)),
+        select(
+            UserAchievement.user_id,
+            literal(ActivityType.ACHIEVEMENT_UNLOCKED.value),
+            _stored_timestamp(UserAchievement.completed_at),
+            literal("Получено достижение: ") + Achievement.name,
+            Achievement.description,
+            func.nullif(Achievement.xp_reward, 0),
+            literal(None),
+            UserAchievement.achievement_id,
+        )
+        .join(Achievement, Achievement.id == UserAchievement.achievement_id)
+        .where(UserAchievement.is_completed.is_(True), UserAchievement.completed_at.is_not(None)),
+    ]
+    for source in sources:
+        await db.execute(insert(ActivityEvent).from_select(columns, source))
+    await db.commit()
+    return await db.scalar(select(func.count(ActivityEvent.id)))
+
+
+async def ensure_activity_events(db: AsyncSession) -> None:
+    """Build the activity log once for databases created before the table existed."""
 
+    has_events = await db.scalar(select(ActivityEvent.id).limit(1))
+    has_points = await db.scalar(select(Point.id).limit(1))
+    if has_events is None and has_points is not None:
+        await rebuild_activity_events(db)
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import date, datetime
-from typing import Any, Dict, List, Optional
-
-from sqlalchemy import func, select
+import asyncio
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Integer, cast, func, select, true, union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
-from app.models import Criteria, Industry, Mark, Point, SubIndustry, User
+from app.core.cache import AsyncTTLCache
+from app.core.config import settings
+from app.core.db_core import ReadSessionLocal
+from app.models import Criteria, DailyRollup, Industry, Mark, PeriodRollup, Point, SubIndustry, User, UserStats
+from app.schemas.analytics_schemas import AnalyticsBucket
+from app.services.rollup_service import period_start
 
 
 def _date_filters(query, model, start: Optional[date], end: Optional[date]):
@@ -19,58 +27,232 @@ def _date_filters(query, model, start: Optional[date], end: Optional[date]):
     return query
 
 
-async def get_analytics_summary(
-    db: AsyncSession,
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    top_limit: int = 10,
-) -> Dict[str, Any]:
-    summary: Dict[str, Any] = {}
+@dataclass(frozen=True)
+class MetricContext:
+    """Arguments shared by all metric providers of one analytics request."""
 
-    # Users by day
-    q_users = select(func.date(User.created_at), func.count()).group_by(func.date(User.created_at)).order_by(
-        func.date(User.created_at)
-    )
-    q_users = _date_filters(q_users, User, start_date, end_date)
-    users_by_day = [{"date": row[0], "count": row[1]} for row in (await db.execute(q_users)).all()]
-    summary["users_by_day"] = users_by_day
+    db: AsyncSession
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    top_limit: int = 10
+    bucket: AnalyticsBucket = AnalyticsBucket.DAY
 
-    # Points by day
-    q_points_day = select(func.date(Point.created_at), func.count()).group_by(func.date(Point.created_at)).order_by(
-        func.date(Point.created_at)
-    )
-    q_points_day = _date_filters(q_points_day, Point, start_date, end_date)
-    points_by_day = [{"date": row[0], "count": row[1]} for row in (await db.execute(q_points_day)).all()]
-    summary["points_by_day"] = points_by_day
 
-    # Marks by day
-    q_marks_day = select(func.date(Mark.created_at), func.count()).group_by(func.date(Mark.created_at)).order_by(
-        func.date(Mark.created_at)
+MetricProvider = Callable[[MetricContext], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class _RegisteredMetric:
+    name: str
+    group: str
+    provider: MetricProvider
+    sources: frozenset[str]
+    limited: bool
+    bucketed: bool
+
+
+# Registration order is the key order of the summary.
+_METRICS: Dict[str, _RegisteredMetric] = {}
+
+_cache = AsyncTTLCache(maxsize=settings.analytics_cache_max_entries, ttl=settings.analytics_cache_ttl_seconds)
+
+
+def metric(
+    name: str, group: str, sources: tuple[str, ...], limited: bool = False, bucketed: bool = False
+) -> Callable[[MetricProvider], MetricProvider]:
+    """
+    Register an async provider computing one summary key.
+
+    `group` is the endpoint serving it, `sources` the tables it reads (for cache
+    invalidation), `limited` whether its result depends on top_limit and `bucketed`
+    whether it depends on the time bucket.
+    """
+
+    def decorator(provider: MetricProvider) -> MetricProvider:
+        if name in _METRICS:
+            raise ValueError(f"Metric {name} is already registered")
+        _METRICS[name] = _RegisteredMetric(name, group, provider, frozenset(sources), limited, bucketed)
+        return provider
+
+    return decorator
+
+
+async def _cached(
+    name: str, limited: bool, ctx: MetricContext, compute: Callable[[], Awaitable[Any]], bucketed: bool = False
+) -> Any:
+    key = (name, ctx.start_date, ctx.end_date, ctx.top_limit if limited else None, ctx.bucket if bucketed else None)
+    return await _cache.get_or_compute(key, compute)
+
+
+def invalidate_analytics(*tables: str) -> None:
+    """Drop cached metrics reading any of `tables` (all metrics when none given); call after commit."""
+
+    touched = set(tables)
+    _cache.invalidate(lambda key: not touched or bool(_sources(key[0]) & touched))
+
+
+def _sources(name: str) -> frozenset[str]:
+    registered = _METRICS.get(name)
+    return registered.sources if registered else _ENGAGEMENT_SOURCES
+
+
+def get_analytics_cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+
+def metric_names(group: Optional[str] = None) -> List[str]:
+    return [m.name for m in _METRICS.values() if group is None or m.group == group]
+
+
+# Provider sessions open at once over all requests of this worker.
+_provider_slots = asyncio.Semaphore(min(settings.analytics_max_concurrency, settings.read_pool_size))
+
+
+async def compute_metrics(ctx: MetricContext, names: List[str]) -> Dict[str, Any]:
+    """
+    Run only the providers of the requested metrics.
+
+    Several providers run concurrently, each on its own read-only session, so the latency
+    is close to the slowest provider instead of the sum. The sessions of all requests share
+    one semaphore sized to the read pool, so concurrent requests queue for a provider slot
+    instead of for a pool connection. A single provider reuses the request's session.
+    """
+
+    if len(names) <= 1 or settings.analytics_max_concurrency <= 1:
+        results = {}
+        for name in names:
+            registered = _METRICS[name]
+            results[name] = await _cached(
+                name, registered.limited, ctx, lambda: registered.provider(ctx), registered.bucketed
+            )
+        return results
+
+    async def run(registered: _RegisteredMetric) -> Any:
+        async with _provider_slots, ReadSessionLocal() as db:
+            return await registered.provider(replace(ctx, db=db))
+
+    # Hand the request's read connection back so waiting requests hold none of the pool.
+    await ctx.db.rollback()
+    values = await asyncio.gather(
+        *(
+            _cached(name, _METRICS[name].limited, ctx, partial(run, _METRICS[name]), _METRICS[name].bucketed)
+            for name in names
+        )
     )
-    q_marks_day = _date_filters(q_marks_day, Mark, start_date, end_date)
-    marks_by_day = [{"date": row[0], "count": row[1]} for row in (await db.execute(q_marks_day)).all()]
-    summary["marks_by_day"] = marks_by_day
+    return dict(zip(names, values))
+
+
+def _rollup_filters(query, start: Optional[date], end: Optional[date]):
+    if start:
+        query = query.where(DailyRollup.day >= start)
+    if end:
+        query = query.where(DailyRollup.day <= end)
+    return query
 
-    # Counts and averages by industry
-    q_points_ind = select(Industry.id, Industry.name, func.count(Point.id)).join(Point).group_by(
-        Industry.id, Industry.name
+
+# Widest range (in days) still served by each bucket when `bucket=auto`; longer ranges use months.
+_AUTO_BUCKET_MAX_DAYS = ((AnalyticsBucket.HOUR, 2), (AnalyticsBucket.DAY, 92), (AnalyticsBucket.WEEK, 730))
+
+
+async def resolve_bucket(
+    db: AsyncSession, bucket: AnalyticsBucket, start_date: Optional[date], end_date: Optional[date]
+) -> AnalyticsBucket:
+    """Pick the bucket for `auto` so a series has a bounded number of points; others pass through."""
+
+    if bucket != AnalyticsBucket.AUTO:
+        return bucket
+    if start_date is None or end_date is None:
+        first, last = (await db.execute(select(func.min(DailyRollup.day), func.max(DailyRollup.day)))).one()
+        start_date = start_date or first
+        end_date = end_date or last
+    if start_date is None or end_date is None:
+        return AnalyticsBucket.DAY
+    span = (end_date - start_date).days + 1
+    for candidate, max_days in _AUTO_BUCKET_MAX_DAYS:
+        if span <= max_days:
+            return candidate
+    return AnalyticsBucket.MONTH
+
+
+async def _rollup_series(ctx: MetricContext, counter_name: str) -> List[Dict[str, Any]]:
+    """
+    Totals of one rollup counter per `ctx.bucket`, skipping empty buckets.
+
+    Week and month buckets are whole periods: the first one starts on or before start_date.
+    """
+
+    if ctx.bucket == AnalyticsBucket.DAY:
+        total = func.sum(getattr(DailyRollup, counter_name))
+        query = select(DailyRollup.day, total).group_by(DailyRollup.day).having(total > 0).order_by(DailyRollup.day)
+        query = _rollup_filters(query, ctx.start_date, ctx.end_date)
+        return [{"date": row[0].isoformat(), "count": row[1]} for row in (await ctx.db.execute(query)).all()]
+
+    period = ctx.bucket.value
+    total = func.sum(getattr(PeriodRollup, counter_name))
+    query = (
+        select(PeriodRollup.start, total)
+        .where(PeriodRollup.period == period)
+        .group_by(PeriodRollup.start)
+        .having(total > 0)
+        .order_by(PeriodRollup.start)
     )
-    q_points_ind = _date_filters(q_points_ind, Point, start_date, end_date)
-    summary["points_by_industry"] = [
-        {"industry_id": row[0], "industry": row[1], "count": row[2]} for row in (await db.execute(q_points_ind)).all()
+    if ctx.start_date:
+        query = query.where(PeriodRollup.start >= period_start(period, ctx.start_date))
+    if ctx.end_date:
+        query = query.where(PeriodRollup.start <= datetime.combine(ctx.end_date, time.max))
+    return [
+        {"date": (start.isoformat() if ctx.bucket == AnalyticsBucket.HOUR else start.date().isoformat()), "count": count}
+        for start, count in (await ctx.db.execute(query)).all()
     ]
 
-    q_marks_ind = (
-        select(Industry.id, Industry.name, func.count(Mark.id))
-        .join(Point, Point.industry_id == Industry.id)
-        .join(Mark, Mark.point_id == Point.id)
+
+async def _rollup_by_industry(ctx: MetricContext, counter) -> List[Dict[str, Any]]:
+    total = func.sum(counter)
+    query = (
+        select(Industry.id, Industry.name, total)
+        .join(DailyRollup, DailyRollup.industry_id == Industry.id)
         .group_by(Industry.id, Industry.name)
+        .having(total > 0)
+        .order_by(Industry.id)
     )
-    q_marks_ind = _date_filters(q_marks_ind, Mark, start_date, end_date)
-    summary["marks_by_industry"] = [
-        {"industry_id": row[0], "industry": row[1], "count": row[2]} for row in (await db.execute(q_marks_ind)).all()
+    query = _rollup_filters(query, ctx.start_date, ctx.end_date)
+    return [
+        {"industry_id": row[0], "industry": row[1], "count": row[2]} for row in (await ctx.db.execute(query)).all()
     ]
 
+
+async def _rollup_total(ctx: MetricContext, counter) -> int:
+    query = _rollup_filters(select(func.coalesce(func.sum(counter), 0)), ctx.start_date, ctx.end_date)
+    return await ctx.db.scalar(query)
+
+
+@metric("users_by_day", group="activity", sources=("users",), bucketed=True)
+async def _users_by_day(ctx: MetricContext) -> List[Dict[str, Any]]:
+    return await _rollup_series(ctx, "new_users")
+
+
+@metric("points_by_day", group="activity", sources=("points",), bucketed=True)
+async def _points_by_day(ctx: MetricContext) -> List[Dict[str, Any]]:
+    return await _rollup_series(ctx, "new_points")
+
+
+@metric("marks_by_day", group="activity", sources=("marks",), bucketed=True)
+async def _marks_by_day(ctx: MetricContext) -> List[Dict[str, Any]]:
+    return await _rollup_series(ctx, "marks")
+
+
+@metric("points_by_industry", group="points", sources=("points", "industries"))
+async def _points_by_industry(ctx: MetricContext) -> List[Dict[str, Any]]:
+    return await _rollup_by_industry(ctx, DailyRollup.new_points)
+
+
+@metric("marks_by_industry", group="marks", sources=("marks", "points", "industries"))
+async def _marks_by_industry(ctx: MetricContext) -> List[Dict[str, Any]]:
+    return await _rollup_by_industry(ctx, DailyRollup.marks)
+
+
+@metric("avg_rating_by_industry", group="points", sources=("points", "industries"))
+async def _avg_rating_by_industry(ctx: MetricContext) -> List[Dict[str, Any]]:
     # Average rating per industry: skip unrated points (mark <= 0)
     q_avg_ind = (
         select(Industry.id, Industry.name, func.avg(Point.mark))
@@ -78,238 +260,334 @@ async def get_analytics_summary(
         .where(Point.mark > 0)
         .group_by(Industry.id, Industry.name)
     )
-    q_avg_ind = _date_filters(q_avg_ind, Point, start_date, end_date)
-    summary["avg_rating_by_industry"] = [
+    q_avg_ind = _date_filters(q_avg_ind, Point, ctx.start_date, ctx.end_date)
+    return [
         {"industry_id": row[0], "industry": row[1], "avg_mark": float(row[2]) if row[2] is not None else None}
-        for row in (await db.execute(q_avg_ind)).all()
+        for row in (await ctx.db.execute(q_avg_ind)).all()
     ]
 
-    # Top points high/low (respect date filter)
-    # Top points (rated only)
-    rated_points = select(Point).where(Point.mark > 0)
-    rated_points = _date_filters(rated_points, Point, start_date, end_date)
 
-    q_top = rated_points.order_by(Point.mark.desc(), Point.id).limit(top_limit)
-    summary["top_points"] = [{"id": p.id, "name": p.name, "mark": p.mark} for p in (await db.scalars(q_top)).all()]
+def _rated_points(ctx: MetricContext):
+    rated_points = select(Point.id, Point.name, Point.mark).where(Point.mark > 0)
+    return _date_filters(rated_points, Point, ctx.start_date, ctx.end_date)
+
+
+@metric("top_points", group="points", sources=("points",), limited=True)
+async def _top_points(ctx: MetricContext) -> List[Dict[str, Any]]:
+    q_top = _rated_points(ctx).order_by(Point.mark.desc(), Point.id).limit(ctx.top_limit)
+    return [{"id": row.id, "name": row.name, "mark": row.mark} for row in (await ctx.db.execute(q_top)).all()]
+
 
-    q_low = rated_points.order_by(Point.mark.asc(), Point.id).limit(top_limit)
-    summary["worst_points"] = [{"id": p.id, "name": p.name, "mark": p.mark} for p in (await db.scalars(q_low)).all()]
+@metric("worst_points", group="points", sources=("points",), limited=True)
+async def _worst_points(ctx: MetricContext) -> List[Dict[str, Any]]:
+    q_low = _rated_points(ctx).order_by(Point.mark.asc(), Point.id).limit(ctx.top_limit)
+    return [{"id": row.id, "name": row.name, "mark": row.mark} for row in (await ctx.db.execute(q_low)).all()]
 
+
+@metric("points_without_marks", group="points", sources=("points", "marks"))
+async def _points_without_marks(ctx: MetricContext) -> List[Dict[str, Any]]:
     # Points without marks (respect date filter)
     sub_mark_counts = (
         select(Mark.point_id, func.count(Mark.id).label("cnt"))
         .group_by(Mark.point_id)
     )
-    sub_mark_counts = _date_filters(sub_mark_counts, Mark, start_date, end_date)
+    sub_mark_counts = _date_filters(sub_mark_counts, Mark, ctx.start_date, ctx.end_date)
     sub_mark_counts = sub_mark_counts.subquery()
     q_no_marks = (
-        select(Point)
+        select(Point.id, Point.name)
         .join(sub_mark_counts, Point.id == sub_mark_counts.c.point_id, isouter=True)
         .where((sub_mark_counts.c.cnt.is_(None)) | (sub_mark_counts.c.cnt == 0))
     )
-    q_no_marks = _date_filters(q_no_marks, Point, start_date, end_date)
-    summary["points_without_marks"] = [{"id": p.id, "name": p.name} for p in (await db.scalars(q_no_marks)).all()]
+    q_no_marks = _date_filters(q_no_marks, Point, ctx.start_date, ctx.end_date)
+    return [{"id": row.id, "name": row.name} for row in (await ctx.db.execute(q_no_marks)).all()]
+
+
+@metric("top_users", group="users", sources=("users", "marks", "points"), limited=True)
+async def _top_users(ctx: MetricContext) -> List[Dict[str, Any]]:
+    # Top users (by marks + points created, all time) from the per-user stats table
+    activity = (UserStats.marks_count + UserStats.points_count).label("activity")
+    q_top_users = (
+        select(User.id, User.username, activity)
+        .join(UserStats, UserStats.user_id == User.id)
+        .where(activity > 0)
+        .order_by(activity.desc(), User.id)
+        .limit(ctx.top_limit)
+    )
+    return [
+        {"id": row[0], "username": row[1], "activity": row[2]} for row in (await ctx.db.execute(q_top_users)).all()
+    ]
+
 
-    # Top users (by marks + points created)
-    point_counts = dict(
-        (await db.execute(select(Point.creator_id, func.count()).group_by(Point.creator_id))).all()
+@metric("photos_total", group="marks", sources=("marks",))
+async def _photos_total(ctx: MetricContext) -> int:
+    return int(await _rollup_total(ctx, DailyRollup.photos))
+
+
+@metric("marks_to_points_ratio", group="marks", sources=("marks", "points"))
+async def _marks_to_points_ratio(ctx: MetricContext) -> Optional[float]:
+    total_points = await _rollup_total(ctx, DailyRollup.new_points)
+    total_marks = await _rollup_total(ctx, DailyRollup.marks)
+    return float(total_marks) / float(total_points) if total_points else None
+
+
+@metric("criteria_avg", group="criteria", sources=("marks", "criteria"))
+async def _criteria_avg(ctx: MetricContext) -> List[Dict[str, Any]]:
+    # Pair question_ids[i] with answers[i] inside SQLite, so only one row per criterion comes back.
+    questions = func.json_each(Mark.question_ids).table_valued("key", "value").alias("q")
+    answers = func.json_each(Mark.answers).table_valued("key", "value").alias("a")
+    query = (
+        select(questions.c.value, Criteria.text, func.sum(answers.c.value), func.count(answers.c.value))
+        .select_from(Mark)
+        .join(questions, true())
+        .join(answers, answers.c.key == questions.c.key)
+        .join(Criteria, Criteria.id == questions.c.value, isouter=True)
+        .group_by(questions.c.value, Criteria.text)
+        .order_by(questions.c.value)
     )
-    mark_counts = dict((await db.execute(select(Mark.user_id, func.count()).group_by(Mark.user_id))).all())
-    totals = defaultdict(int)
-    for uid, cnt in point_counts.items():
-        totals[uid] += cnt
-    for uid, cnt in mark_counts.items():
-        totals[uid] += cnt
-    top_users_ids = sorted(totals.items(), key=lambda x: x[1], reverse=True)[:top_limit]
-    if top_users_ids:
-        ids = [uid for uid, _ in top_users_ids if uid is not None]
-        users = {u.id: u for u in (await db.execute(select(User).where(User.id.in_(ids)))).scalars().all()}
-        summary["top_users"] = [
-            {"id": uid, "username": users.get(uid).username if users.get(uid) else None, "activity": cnt}
-            for uid, cnt in top_users_ids
-        ]
-    else:
-        summary["top_users"] = []
-
-    # Photos count (respect date filter)
-    marks_query = select(Mark)
-    marks_query = _date_filters(marks_query, Mark, start_date, end_date)
-    marks = (await db.execute(marks_query)).scalars().all()
-    photos_total = sum(len(m.photos or []) for m in marks)
-    summary["photos_total"] = photos_total
-
-    # Ratio marks/points
-    total_points_query = select(func.count()).select_from(Point)
-    total_points_query = _date_filters(total_points_query, Point, start_date, end_date)
-    total_marks_query = select(func.count()).select_from(Mark)
-    total_marks_query = _date_filters(total_marks_query, Mark, start_date, end_date)
-    total_points = await db.scalar(total_points_query)
-    total_marks = await db.scalar(total_marks_query)
-    summary["marks_to_points_ratio"] = float(total_marks) / float(total_points) if total_points else None
-
-    # Criteria stats (avg per criteria)
-    criteria_map = {c.id: c.text for c in (await db.execute(select(Criteria))).scalars().all()}
-    crit_sum = defaultdict(int)
-    crit_count = defaultdict(int)
-    for m in marks:
-        for cid, ans in zip(m.question_ids or [], m.answers or []):
-            crit_sum[cid] += ans
-            crit_count[cid] += 1
-    summary["criteria_avg"] = [
+    query = _date_filters(query, Mark, ctx.start_date, ctx.end_date)
+    return [
         {
             "criteria_id": cid,
-            "text": criteria_map.get(cid),
-            "avg": (crit_sum[cid] / crit_count[cid]) if crit_count[cid] else None,
-            "count": crit_count[cid],
+            "text": text,
+            "avg": (total / count) if count else None,
+            "count": count,
         }
-        for cid in crit_sum.keys()
+        for cid, text, total, count in (await ctx.db.execute(query)).all()
     ]
 
-    return summary
+
+async def get_analytics_summary(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    top_limit: int = 10,
+    bucket: AnalyticsBucket = AnalyticsBucket.DAY,
+) -> Dict[str, Any]:
+    """All registered metrics."""
+
+    bucket = await resolve_bucket(db, bucket, start_date, end_date)
+    ctx = MetricContext(db, start_date, end_date, top_limit, bucket)
+    return await compute_metrics(ctx, metric_names())
+
+
+async def _get_group_metrics(
+    group: str,
+    db: AsyncSession,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    top_limit: int,
+    bucket: AnalyticsBucket = AnalyticsBucket.DAY,
+) -> Dict[str, Any]:
+    bucket = await resolve_bucket(db, bucket, start_date, end_date)
+    ctx = MetricContext(db, start_date, end_date, top_limit, bucket)
+    return await compute_metrics(ctx, metric_names(group))
 
 
 async def get_activity_metrics(
-    db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, top_limit: int = 10
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    top_limit: int = 10,
+    bucket: AnalyticsBucket = AnalyticsBucket.DAY,
 ) -> Dict[str, Any]:
-    summary = await get_analytics_summary(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
-    return {
-        "users_by_day": summary.get("users_by_day", []),
-        "points_by_day": summary.get("points_by_day", []),
-        "marks_by_day": summary.get("marks_by_day", []),
-    }
+    return await _get_group_metrics("activity", db, start_date, end_date, top_limit, bucket)
 
 
 async def get_points_metrics(
     db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, top_limit: int = 10
 ) -> Dict[str, Any]:
-    summary = await get_analytics_summary(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
-    return {
-        "points_by_industry": summary.get("points_by_industry", []),
-        "avg_rating_by_industry": summary.get("avg_rating_by_industry", []),
-        "top_points": summary.get("top_points", []),
-        "worst_points": summary.get("worst_points", []),
-        "points_without_marks": summary.get("points_without_marks", []),
-    }
+    return await _get_group_metrics("points", db, start_date, end_date, top_limit)
 
 
 async def get_marks_metrics(
     db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, top_limit: int = 10
 ) -> Dict[str, Any]:
-    summary = await get_analytics_summary(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
-    return {
-        "marks_by_industry": summary.get("marks_by_industry", []),
-        "marks_to_points_ratio": summary.get("marks_to_points_ratio"),
-        "photos_total": summary.get("photos_total", 0),
-    }
+    return await _get_group_metrics("marks", db, start_date, end_date, top_limit)
 
 
 async def get_users_metrics(
     db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, top_limit: int = 10
 ) -> Dict[str, Any]:
-    summary = await get_analytics_summary(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
-    return {
-        "top_users": summary.get("top_users", []),
-    }
+    return await _get_group_metrics("users", db, start_date, end_date, top_limit)
 
 
 async def get_criteria_metrics(
     db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, top_limit: int = 10
 ) -> Dict[str, Any]:
-    summary = await get_analytics_summary(db, start_date=start_date, end_date=end_date, top_limit=top_limit)
-    return {
-        "criteria_avg": summary.get("criteria_avg", []),
-    }
+    return await _get_group_metrics("criteria", db, start_date, end_date, top_limit)
 
 
-def _week_index(dt: datetime) -> int:
-    iso = dt.isocalendar()
-    return iso.year * 100 + iso.week
+def _week_number(column):
+    """Monday-based week number counted from the epoch, so consecutive weeks differ by 1 across years."""
 
+    return cast((func.julianday(func.date(column)) - 2440587.5 + 3) / 7, Integer)
 
-def _compute_streak(weeks: List[int]) -> Dict[str, int]:
-    """Return current and best streak length (in weeks) from a sorted list of week indices."""
 
-    if not weeks:
-        return {"streak_current": 0, "streak_best": 0}
+def _week_streaks(user_pos: np.ndarray, weeks: np.ndarray, n_users: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Current and best streak of consecutive weeks for every user, vectorized.
 
-    weeks = sorted(set(weeks))
-    best = 1
-    current = 1
-    # best streak
-    for prev, cur in zip(weeks, weeks[1:]):
-        if cur == prev + 1:
-            current += 1
-            best = max(best, current)
-        else:
-            current = 1
+    `user_pos`/`weeks` hold one row per distinct (user, week), sorted by user then week.
+    The current streak is the run ending at the user's latest active week.
+    """
 
-    # current streak (from latest week backwards)
-    current_streak = 1
-    for prev, cur in zip(reversed(weeks[:-1]), reversed(weeks[1:])):
-        if prev == cur - 1:
-            current_streak += 1
-        else:
-            break
+    current = np.zeros(n_users, dtype=np.int64)
+    best = np.zeros(n_users, dtype=np.int64)
+    if len(weeks) == 0:
+        return current, best
 
-    return {"streak_current": current_streak, "streak_best": best}
+    new_run = np.ones(len(weeks), dtype=bool)
+    new_run[1:] = (user_pos[1:] != user_pos[:-1]) | (weeks[1:] != weeks[:-1] + 1)
+    run_starts = np.flatnonzero(new_run)
+    run_lengths = np.diff(np.append(run_starts, len(weeks)))
+    run_users = user_pos[run_starts]
 
+    # Runs are grouped by user: reduce each user's runs to the longest and take the last one.
+    user_first_run = np.flatnonzero(np.r_[True, run_users[1:] != run_users[:-1]])
+    users = run_users[user_first_run]
+    best[users] = np.maximum.reduceat(run_lengths, user_first_run)
+    user_last_run = np.r_[user_first_run[1:] - 1, len(run_users) - 1]
+    current[users] = run_lengths[user_last_run]
+    return current, best
 
-async def get_users_engagement(
-    db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, top_limit: int = 20
-) -> List[Dict[str, Any]]:
-    """Calculate engagement and streaks per user without persisting to DB."""
 
-    # Load users
-    users = {u.id: u for u in (await db.execute(select(User))).scalars().all()}
-    if not users:
-        return []
+def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k best scores (ties by ascending id) without sorting every user."""
 
-    # Points per user
-    points_q = select(Point)
-    points_q = _date_filters(points_q, Point, start_date, end_date)
-    points = (await db.execute(points_q)).scalars().all()
-
-    # Marks per user
-    marks_q = select(Mark)
-    marks_q = _date_filters(marks_q, Mark, start_date, end_date)
-    marks = (await db.execute(marks_q)).scalars().all()
-
-    # Aggregate
-    points_count: Dict[int, int] = defaultdict(int)
-    marks_count: Dict[int, int] = defaultdict(int)
-    photos_count: Dict[int, int] = defaultdict(int)
-    weeks_by_user: Dict[int, List[int]] = defaultdict(list)
-
-    for p in points:
-        if p.creator_id:
-            points_count[p.creator_id] += 1
-            weeks_by_user[p.creator_id].append(_week_index(p.created_at))
-
-    for m in marks:
-        if m.user_id:
-            marks_count[m.user_id] += 1
-            photos_count[m.user_id] += len(m.photos or [])
-            weeks_by_user[m.user_id].append(_week_index(m.created_at))
+    if k >= len(scores):
+        return np.lexsort((ids, -scores))
+    threshold = np.partition(-scores, k - 1)[k - 1]
+    candidates = np.flatnonzero(-scores <= threshold)
+    order = np.lexsort((ids[candidates], -scores[candidates]))
+    return candidates[order[:k]]
 
+
+async def _get_users_engagement_from_stats(db: AsyncSession, top_limit: int) -> List[Dict[str, Any]]:
+    """All-time engagement read from the per-user stats table (one row per user)."""
+
+    engagement = (
+        func.coalesce(UserStats.marks_count, 0)
+        + func.coalesce(UserStats.points_count, 0) * 2
+        + func.coalesce(UserStats.photos_count, 0) * 0.5
+    ).label("engagement")
+    query = (
+        select(User.id, User.username, engagement, UserStats)
+        .join(UserStats, UserStats.user_id == User.id, isouter=True)
+        .order_by(engagement.desc(), User.id)
+        .limit(top_limit)
+    )
     results: List[Dict[str, Any]] = []
-    for uid, user in users.items():
-        pc = points_count.get(uid, 0)
-        mc = marks_count.get(uid, 0)
-        phc = photos_count.get(uid, 0)
-        engagement = mc + pc * 2 + phc * 0.5
-        streaks = _compute_streak(weeks_by_user.get(uid, []))
+    for uid, username, score, stats in (await db.execute(query)).all():
         results.append(
             {
                 "user_id": uid,
-                "username": user.username,
-                "engagement": engagement,
-                "points_count": pc,
-                "marks_count": mc,
-                "photos_count": phc,
-                "streak_current_weeks": streaks["streak_current"],
-                "streak_best_weeks": streaks["streak_best"],
+                "username": username,
+                "engagement": float(score),
+                "points_count": stats.points_count if stats else 0,
+                "marks_count": stats.marks_count if stats else 0,
+                "photos_count": stats.photos_count if stats else 0,
+                "streak_current_weeks": stats.current_week_streak if stats else 0,
+                "streak_best_weeks": stats.best_week_streak if stats else 0,
             }
         )
+    return results
+
 
-    results.sort(key=lambda x: x["engagement"], reverse=True)
-    return results[:top_limit]
+_ENGAGEMENT_SOURCES = frozenset({"users", "marks", "points"})
+
+
+async def get_users_engagement(
+    db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, top_limit: int = 20
+) -> List[Dict[str, Any]]:
+    """Calculate engagement and streaks per user without persisting to DB (cached like the metrics)."""
+
+    ctx = MetricContext(db, start_date, end_date, top_limit)
+    return await _cached(
+        "users_engagement", True, ctx, lambda: _compute_users_engagement(db, start_date, end_date, top_limit)
+    )
+
+
+async def _compute_users_engagement(
+    db: AsyncSession, start_date: Optional[date], end_date: Optional[date], top_limit: int
+) -> List[Dict[str, Any]]:
+    if start_date is None and end_date is None:
+        return await _get_users_engagement_from_stats(db, top_limit)
+
+    user_ids = np.fromiter((await db.execute(select(User.id).order_by(User.id))).scalars(), dtype=np.int64)
+    if not len(user_ids):
+        return []
+    n_users = len(user_ids)
+
+    def positions(rows: List[tuple]) -> tuple[np.ndarray, List[tuple]]:
+        """Map aggregate rows keyed by user id onto positions in `user_ids`, dropping unknown users."""
+
+        if not rows:
+            return np.empty(0, dtype=np.int64), []
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        pos = np.minimum(np.searchsorted(user_ids, ids), n_users - 1)
+        known = user_ids[pos] == ids
+        return pos[known], [row for row, ok in zip(rows, known) if ok]
+
+    points_q = _date_filters(
+        select(Point.creator_id, func.count(Point.id)).where(Point.creator_id.is_not(None)).group_by(Point.creator_id),
+        Point,
+        start_date,
+        end_date,
+    )
+    marks_q = _date_filters(
+        select(Mark.user_id, func.count(Mark.id), func.coalesce(func.sum(func.json_array_length(Mark.photos)), 0))
+        .where(Mark.user_id.is_not(None))
+        .group_by(Mark.user_id),
+        Mark,
+        start_date,
+        end_date,
+    )
+    points_count = np.zeros(n_users, dtype=np.int64)
+    marks_count = np.zeros(n_users, dtype=np.int64)
+    photos_count = np.zeros(n_users, dtype=np.int64)
+    pos, rows = positions((await db.execute(points_q)).all())
+    points_count[pos] = [row[1] for row in rows]
+    pos, rows = positions((await db.execute(marks_q)).all())
+    marks_count[pos] = [row[1] for row in rows]
+    photos_count[pos] = [row[2] for row in rows]
+
+    # Distinct active weeks per user from points and marks, sorted for the streak scan.
+    point_weeks = _date_filters(
+        select(Point.creator_id.label("user_id"), _week_number(Point.created_at).label("week")).where(
+            Point.creator_id.is_not(None)
+        ),
+        Point,
+        start_date,
+        end_date,
+    )
+    mark_weeks = _date_filters(
+        select(Mark.user_id.label("user_id"), _week_number(Mark.created_at).label("week")).where(
+            Mark.user_id.is_not(None)
+        ),
+        Mark,
+        start_date,
+        end_date,
+    )
+    weeks_q = union(point_weeks, mark_weeks).subquery()
+    week_rows = (await db.execute(select(weeks_q.c.user_id, weeks_q.c.week).order_by(weeks_q.c.user_id, weeks_q.c.week))).all()
+    pos, rows = positions(week_rows)
+    streak_current, streak_best = _week_streaks(pos, np.array([row[1] for row in rows], dtype=np.int64), n_users)
+
+    engagement = marks_count + points_count * 2 + photos_count * 0.5
+    top = _top_k(engagement, user_ids, top_limit)
+    top_ids = [int(user_ids[i]) for i in top]
+    usernames = dict((await db.execute(select(User.id, User.username).where(User.id.in_(top_ids)))).all())
+
+    return [
+        {
+            "user_id": int(user_ids[i]),
+            "username": usernames.get(int(user_ids[i])),
+            "engagement": float(engagement[i]),
+            "points_count": int(points_count[i]),
+            "marks_count": int(marks_count[i]),
+            "photos_count": int(photos_count[i]),
+            "streak_current_weeks": int(streak_current[i]),
+            "streak_best_weeks": int(streak_best[i]),
+        }
+        for i in top
+    ]
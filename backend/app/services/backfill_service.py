@@ -0,0 +1,156 @@
+"""Bulk recompute of achievement progress, XP and levels for all users."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Achievement, ActivityEvent, User, UserAchievement, UserStats
+from app.schemas.activity_schemas import ActivityType
+from app.services.activity_service import achievement_title
+from app.services.gamification_service import XP_FOR_MARK_CREATION, XP_FOR_POINT_CREATION
+from app.services.level_curve import get_level_curve
+from app.services.stats_service import live_day_streak, refresh_user_stats
+
+
+def _progress_for(achievement: Achievement, stats: UserStats | None) -> tuple[int, bool]:
+    """Return (progress, requirement met) of an achievement for a user's stats row."""
+
+    if stats is None:
+        return 0, False
+    if achievement.achievement_type == "marks_count":
+        return stats.marks_count, stats.marks_count >= achievement.requirement_value
+    if achievement.achievement_type == "points_count":
+        return stats.points_count, stats.points_count >= achievement.requirement_value
+    if achievement.achievement_type == "marks_streak":
+        # A streak that reached the requirement in the past still earns the achievement.
+        return live_day_streak(stats), stats.best_streak >= achievement.requirement_value
+    return 0, False
+
+
+async def _recompute_chunk(
+    db: AsyncSession, user_ids: list[int], achievements: list[Achievement], recompute_xp: bool
+) -> None:
+    await refresh_user_stats(db, user_ids)
+
+    stats_rows = await db.execute(
+        select(UserStats).where(UserStats.user_id.in_(user_ids)).execution_options(populate_existing=True)
+    )
+    stats_by_user = {s.user_id: s for s in stats_rows.scalars().all()}
+
+    existing_rows = await db.execute(
+        select(
+            UserAchievement.id,
+            UserAchievement.user_id,
+            UserAchievement.achievement_id,
+            UserAchievement.is_completed,
+            UserAchievement.completed_at,
+        ).where(UserAchievement.user_id.in_(user_ids))
+    )
+    existing = {(uid, aid): (row_id, done, done_at) for row_id, uid, aid, done, done_at in existing_rows.all()}
+
+    now = datetime.utcnow()
+    inserts = []
+    updates = []
+    unlocked = []
+    rewards: dict[int, int] = {uid: 0 for uid in user_ids}
+    for uid in user_ids:
+        stats = stats_by_user.get(uid)
+        for achievement in achievements:
+            progress, met = _progress_for(achievement, stats)
+            row_id, was_done, done_at = existing.get((uid, achievement.id), (None, False, None))
+            completed = was_done or met
+            if completed:
+                rewards[uid] += achievement.xp_reward
+            if met and not was_done:
+                unlocked.append(
+                    {
+                        "user_id": uid,
+                        "event_type": ActivityType.ACHIEVEMENT_UNLOCKED.value,
+                        "occurred_at": now,
+                        "title": achievement_title(achievement),
+                        "description": achievement.description,
+                        "xp_gained": achievement.xp_reward or None,
+                        "achievement_id": achievement.id,
+                    }
+                )
+            values = {
+                "progress": progress,
+                "is_completed": completed,
+                "completed_at": done_at or (now if completed else None),
+            }
+            if row_id is not None:
+                updates.append({"id": row_id, **values})
+            elif progress > 0 or completed:
+                inserts.append({"user_id": uid, "achievement_id": achievement.id, "created_at": now, **values})
+
+    # Executemany by primary key: older databases lack the (user_id, achievement_id) unique
+    # constraint, so an ON CONFLICT upsert cannot be used here.
+    if updates:
+        await db.execute(update(UserAchievement), updates)
+    if inserts:
+        await db.execute(insert(UserAchievement), inserts)
+    if unlocked:
+        await db.execute(insert(ActivityEvent), unlocked)
+
+    if recompute_xp:
+        xp_by_user = {}
+        for uid in user_ids:
+            stats = stats_by_user.get(uid)
+            earned = (stats.marks_count * XP_FOR_MARK_CREATION + stats.points_count * XP_FOR_POINT_CREATION) if stats else 0
+            xp_by_user[uid] = earned + rewards[uid]
+        levels = get_level_curve().levels_for_xp(list(xp_by_user.values()))
+        level_by_user = {uid: int(level) for uid, level in zip(xp_by_user, levels)}
+        await db.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(xp=case(xp_by_user, value=User.id), level=case(level_by_user, value=User.id))
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def recompute_achievements_and_xp(
+    db: AsyncSession,
+    chunk_size: int = 1000,
+    recompute_xp: bool = True,
+    report: Callable[[int, float], None] | None = None,
+) -> dict:
+    """
+    Recompute stats, achievement progress/completion and XP/level for every user.
+
+    Works on chunks of users with set-based aggregates (one commit per chunk) and is
+    idempotent: XP is derived from counts and completed achievements rather than added,
+    and completed achievements stay completed with their original completion date.
+    `report(processed_users, elapsed_seconds)` is called after each chunk.
+    """
+
+    started = time.perf_counter()
+    achievements = list((await db.execute(select(Achievement))).scalars().all())
+
+    processed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            (await db.execute(select(User.id).where(User.id > last_id).order_by(User.id).limit(chunk_size)))
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+        await _recompute_chunk(db, ids, achievements, recompute_xp)
+        await db.commit()
+        processed += len(ids)
+        last_id = ids[-1]
+        if report:
+            report(processed, time.perf_counter() - started)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "users": processed,
+        "seconds": round(elapsed, 3),
+        "users_per_second": round(processed / elapsed, 1) if elapsed > 0 else None,
+    }
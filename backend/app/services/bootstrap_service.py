@@ -0,0 +1,97 @@
+"""Version-stamped startup: schema creation and seeding run only when something changed."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+
+from app.core.db_core import Base, SessionLocal, engine, init_db
+from app.core.migrations import head_revision
+from app.models import AppMeta
+from app.services.achievement_service import DEFAULT_ACHIEVEMENTS, initialize_default_achievements
+from app.services.activity_service import ensure_activity_events
+from app.services.geo_service import ensure_geo_cells
+from app.services.leaderboard_service import ensure_leaderboards
+from app.services.rollup_service import ensure_rollups
+from app.services.sketch_service import ensure_active_sketches, ensure_score_sketches
+from app.services.stats_service import ensure_user_stats
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_VERSION_KEY = "bootstrap_version"
+
+
+def bootstrap_version() -> str:
+    """Hash of the ORM schema (tables, columns, indexes), the latest migration and the seed data."""
+
+    schema = []
+    for table in Base.metadata.sorted_tables:
+        schema.append(
+            {
+                "table": table.name,
+                "columns": [[c.name, repr(c.type), c.nullable, c.primary_key] for c in table.columns],
+                "indexes": sorted([i.name, [c.name for c in i.columns], i.unique] for i in table.indexes),
+            }
+        )
+    payload = json.dumps(
+        {"schema": schema, "migration": head_revision(), "achievements": DEFAULT_ACHIEVEMENTS},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def _applied_version() -> str | None:
+    try:
+        async with engine.connect() as conn:
+            return await conn.scalar(select(AppMeta.value).where(AppMeta.key == BOOTSTRAP_VERSION_KEY))
+    except OperationalError:  # fresh database without the app_meta table
+        return None
+
+
+async def bootstrap() -> dict:
+    """
+    Bring the database up to date for this build and return timings in milliseconds.
+
+    A matching version stamp costs one SELECT; otherwise migrations are run, the default
+    achievements upserted, derived tables backfilled and the new stamp written.
+    """
+
+    started = time.perf_counter()
+    version = bootstrap_version()
+    timings: dict = {"skipped": (await _applied_version()) == version}
+
+    if not timings["skipped"]:
+        step = time.perf_counter()
+        await init_db()
+        timings["migrate_ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+        step = time.perf_counter()
+        async with SessionLocal() as db:
+            await initialize_default_achievements(db)
+            await ensure_user_stats(db)
+            await ensure_leaderboards(db)
+            await ensure_activity_events(db)
+            await ensure_rollups(db)
+            await ensure_active_sketches(db)
+            await ensure_score_sketches(db)
+            await ensure_geo_cells(db)
+
+            stmt = sqlite_insert(AppMeta).values(key=BOOTSTRAP_VERSION_KEY, value=version, updated_at=datetime.utcnow())
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AppMeta.key], set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at}
+            )
+            await db.execute(stmt)
+            await db.commit()
+        timings["seed_ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info("Startup bootstrap (version %s): %s", version[:12], timings)
+    return timings
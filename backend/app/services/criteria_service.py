@@ -5,6 +5,7 @@ from fastapi import HTTPException, status
 
 from app.models import Criteria
 from app.schemas import CriteriaCreate
+from app.services.analytics_service import invalidate_analytics
 from app.services.industry_service import get_industry
 
 
@@ -20,6 +21,7 @@ async def create_criteria(db: AsyncSession, payload: CriteriaCreate) -> Criteria
     crit = Criteria(text=payload.text, industry_id=payload.industry_id)
     db.add(crit)
     await db.commit()
+    invalidate_analytics("criteria")
     await db.refresh(crit)
     return crit
 
@@ -43,3 +45,4 @@ async def delete_criteria(db: AsyncSession, criteria_id: int) -> None:
     crit = await get_criteria(db, criteria_id)
     await db.delete(crit)
     await db.commit()
+    invalidate_analytics("criteria")
@@ -1,49 +1,39 @@
 """Service for handling user gamification: XP, levels, and achievements."""
 
+from datetime import datetime
+
+from sqlalchemy import case, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
+from app.services.leaderboard_service import bump_leaderboards
+from app.services.level_curve import get_level_curve
 
 
 # XP rewards for different actions
 XP_FOR_POINT_CREATION = 50
 XP_FOR_MARK_CREATION = 20
 
-# Level calculation: XP required for level N = BASE_XP * (LEVEL_MULTIPLIER ^ (N - 1))
-BASE_XP = 100
-LEVEL_MULTIPLIER = 1.5
-
 
 def calculate_level_from_xp(xp: int) -> int:
     """
     Calculate user level based on total XP.
     
-    Formula: level is the highest level where total XP >= required XP for that level.
+    Level is the highest level whose cumulative threshold is <= total XP; thresholds
+    come from the configured level curve (see app/services/level_curve.py).
+    With the default geometric curve:
     Level 1: 0 XP
     Level 2: 100 XP
     Level 3: 250 XP (100 * 1.5^1 + 100)
     Level 4: 475 XP (100 * 1.5^2 + 250)
     And so on...
     """
-    if xp < BASE_XP:
-        return 1
-    
-    level = 1
-    required_xp = 0
-    
-    while required_xp <= xp:
-        level += 1
-        required_xp = sum(BASE_XP * (LEVEL_MULTIPLIER ** (i - 1)) for i in range(1, level))
-    
-    return level - 1
+    return get_level_curve().level_for_xp(xp)
 
 
 def calculate_xp_for_level(level: int) -> int:
     """Calculate total XP required to reach a specific level."""
-    if level <= 1:
-        return 0
-    
-    return int(sum(BASE_XP * (LEVEL_MULTIPLIER ** (i - 1)) for i in range(1, level)))
+    return get_level_curve().xp_for_level(level)
 
 
 def calculate_xp_for_next_level(level: int) -> int:
@@ -85,6 +75,10 @@ async def add_xp(db: AsyncSession, user_id: int, xp_amount: int) -> User:
     """
     Add XP to user and recalculate level.
     
+    The increment is a single `UPDATE ... SET xp = xp + :n RETURNING xp`, so concurrent
+    requests (including other workers) never overwrite each other's XP. The level is
+    derived from the returned total and only ever raised.
+    
     Args:
         db: Database session
         user_id: User ID
@@ -93,20 +87,32 @@ async def add_xp(db: AsyncSession, user_id: int, xp_amount: int) -> User:
     Returns:
         Updated User object
     """
-    user = await db.get(User, user_id)
-    if not user:
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(xp=User.xp + xp_amount)
+        .returning(User.xp, User.level)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if row is None:
         raise ValueError(f"User with id {user_id} not found")
     
-    user.xp += xp_amount
-    new_level = calculate_level_from_xp(user.xp)
+    new_xp, current_level = row
+    new_level = calculate_level_from_xp(new_xp)
     
-    # Update level if it increased
-    if new_level > user.level:
-        user.level = new_level
+    # Update level if it increased (conditional, so a racing larger level is kept)
+    if new_level > current_level:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id, User.level < new_level)
+            .values(level=new_level)
+            .execution_options(synchronize_session=False)
+        )
     
+    await bump_leaderboards(db, user_id, at=datetime.utcnow(), xp=xp_amount)
     await db.commit()
-    await db.refresh(user)
-    return user
+    return await db.get(User, user_id, populate_existing=True)
 
 
 async def add_xp_for_point_creation(db: AsyncSession, user_id: int) -> User:
@@ -133,12 +139,50 @@ async def get_user_progress(db: AsyncSession, user_id: int) -> dict:
     # Recalculate level based on XP to ensure it's always accurate
     calculated_level = calculate_level_from_xp(user.xp)
     
-    # Update user level if it's different (sync issue fix)
+    # Update user level if it's different (sync issue fix); skipped if XP changed meanwhile
     if calculated_level != user.level:
-        user.level = calculated_level
+        await db.execute(
+            update(User)
+            .where(User.id == user_id, User.xp == user.xp)
+            .values(level=calculated_level)
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
         await db.refresh(user)
     
     progress = get_progress_to_next_level(user.xp, user.level)
     return progress
 
+
+async def recalculate_all_levels(db: AsyncSession, chunk_size: int = 5000) -> int:
+    """
+    Recompute levels of all users from their XP, e.g. after the level curve changed.
+    
+    Levels are computed for a whole chunk at once and written with one UPDATE per chunk.
+    Returns the number of users whose level changed.
+    """
+    curve = get_level_curve()
+    changed = 0
+    last_id = 0
+    while True:
+        rows = (
+            await db.execute(
+                select(User.id, User.xp, User.level).where(User.id > last_id).order_by(User.id).limit(chunk_size)
+            )
+        ).all()
+        if not rows:
+            break
+
+        levels = curve.levels_for_xp([xp for _, xp, _ in rows])
+        updates = {uid: int(new) for (uid, _, old), new in zip(rows, levels) if int(new) != old}
+        if updates:
+            await db.execute(
+                update(User)
+                .where(User.id.in_(updates))
+                .values(level=case(updates, value=User.id))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            changed += len(updates)
+        last_id = rows[-1][0]
+    return changed
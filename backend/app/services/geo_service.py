@@ -0,0 +1,238 @@
+"""Service for geographic aggregates: points, marks and ratings per geohash cell.
+
+Every point counts in one cell per precision in `GEO_PRECISIONS` (about 39 km, 4.9 km
+and 1.2 km wide); its marks count in the same cells. The write paths apply deltas, so
+coverage maps are read from the cells inside a bounding box without touching raw points.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import geo
+from app.core.geo import BBox
+from app.models import GeoCellRollup, Industry, Mark, Point
+
+GEO_PRECISIONS = (4, 5, 6)
+NO_INDUSTRY = 0
+
+
+async def bump_geo_cells(
+    db: AsyncSession,
+    latitude: float,
+    longitude: float,
+    industry_id: int | None,
+    *,
+    points: int = 0,
+    marks: int = 0,
+    score_sum: float = 0.0,
+) -> None:
+    """Add deltas to the cells containing a location, one upsert for all precisions."""
+
+    deltas = {"points": points, "marks": marks, "score_sum": score_sum}
+    if not any(deltas.values()):
+        return
+    rows = []
+    for precision in GEO_PRECISIONS:
+        geohash, cell_lat, cell_lon = geo.encode(latitude, longitude, precision)
+        rows.append(
+            {
+                "precision": precision,
+                "geohash": geohash,
+                "industry_id": industry_id or NO_INDUSTRY,
+                "latitude": cell_lat,
+                "longitude": cell_lon,
+                **deltas,
+            }
+        )
+    stmt = sqlite_insert(GeoCellRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GeoCellRollup.precision, GeoCellRollup.geohash, GeoCellRollup.industry_id],
+        set_={name: getattr(GeoCellRollup, name) + getattr(stmt.excluded, name) for name, delta in deltas.items() if delta},
+    )
+    await db.execute(stmt)
+    if points < 0 or marks < 0:
+        await db.execute(
+            delete(GeoCellRollup).where(
+                or_(*((GeoCellRollup.precision == r["precision"]) & (GeoCellRollup.geohash == r["geohash"]) for r in rows)),
+                GeoCellRollup.industry_id == (industry_id or NO_INDUSTRY),
+                GeoCellRollup.points <= 0,
+                GeoCellRollup.marks <= 0,
+            )
+        )
+
+
+async def _point_totals(db: AsyncSession, point_ids: Iterable[int]) -> list[tuple[float, float, int | None, int, float]]:
+    """(latitude, longitude, industry_id, marks, score_sum) of each point."""
+
+    ids = list(point_ids)
+    if not ids:
+        return []
+    query = (
+        select(
+            Point.latitude,
+            Point.longitude,
+            Point.industry_id,
+            func.count(Mark.id),
+            func.coalesce(func.sum(Mark.total_score), 0),
+        )
+        .join(Mark, Mark.point_id == Point.id, isouter=True)
+        .where(Point.id.in_(ids))
+        .group_by(Point.id)
+    )
+    return [tuple(row) for row in (await db.execute(query)).all()]
+
+
+async def move_point_in_geo_cells(
+    db: AsyncSession, point: Point, previous: tuple[float, float, int | None]
+) -> None:
+    """Move a point and its marks from its previous (latitude, longitude, industry_id)."""
+
+    current = (point.latitude, point.longitude, point.industry_id)
+    if current == previous:
+        return
+    for _, _, _, marks, score_sum in await _point_totals(db, [point.id]):
+        await bump_geo_cells(db, *previous, points=-1, marks=-marks, score_sum=-score_sum)
+        await bump_geo_cells(db, *current, points=1, marks=marks, score_sum=score_sum)
+
+
+async def remove_points_from_geo_cells(db: AsyncSession, point_ids: Iterable[int]) -> None:
+    """Subtract points and their marks; call before deleting them."""
+
+    for latitude, longitude, industry_id, marks, score_sum in await _point_totals(db, point_ids):
+        await bump_geo_cells(db, latitude, longitude, industry_id, points=-1, marks=-marks, score_sum=-score_sum)
+
+
+async def remove_user_from_geo_cells(db: AsyncSession, user_id: int) -> None:
+    """Subtract a user's points (with all their marks) and the user's marks on other points."""
+
+    own_points = (await db.execute(select(Point.id).where(Point.creator_id == user_id))).scalars().all()
+    await remove_points_from_geo_cells(db, own_points)
+    other_marks = await db.execute(
+        select(Point.latitude, Point.longitude, Point.industry_id, func.count(Mark.id), func.sum(Mark.total_score))
+        .join(Point, Point.id == Mark.point_id)
+        .where(Mark.user_id == user_id, or_(Point.creator_id.is_(None), Point.creator_id != user_id))
+        .group_by(Point.id)
+    )
+    for latitude, longitude, industry_id, marks, score_sum in other_marks.all():
+        await bump_geo_cells(db, latitude, longitude, industry_id, marks=-marks, score_sum=-(score_sum or 0))
+
+
+def _mean(score_sum: float, marks: int) -> float | None:
+    return round(score_sum / marks, 4) if marks else None
+
+
+async def get_geo_cells(
+    db: AsyncSession, bbox: BBox, precision: int = 5, industry_id: int | None = None, limit: int = 2000
+) -> dict:
+    """Cells of one precision whose area intersects `bbox`, with per-industry breakdowns."""
+
+    if precision not in GEO_PRECISIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"precision must be one of {', '.join(map(str, GEO_PRECISIONS))}.",
+        )
+    min_lon, min_lat, max_lon, max_lat = bbox
+    height, width = geo.cell_size(precision)
+    query = (
+        select(GeoCellRollup, Industry.name)
+        .join(Industry, Industry.id == GeoCellRollup.industry_id, isouter=True)
+        .where(
+            GeoCellRollup.precision == precision,
+            GeoCellRollup.latitude.between(min_lat - height / 2, max_lat + height / 2),
+            GeoCellRollup.longitude.between(min_lon - width / 2, max_lon + width / 2),
+        )
+        .order_by(GeoCellRollup.geohash, GeoCellRollup.industry_id)
+    )
+    if industry_id is not None:
+        query = query.where(GeoCellRollup.industry_id == industry_id)
+
+    cells: dict[str, dict] = {}
+    for row, industry_name in (await db.execute(query)).all():
+        cell = cells.get(row.geohash)
+        if cell is None:
+            if len(cells) >= limit:
+                break
+            cell = cells[row.geohash] = {
+                "geohash": row.geohash,
+                "latitude": row.latitude,
+                "longitude": row.longitude,
+                "points": 0,
+                "marks": 0,
+                "score_sum": 0.0,
+                "industries": [],
+            }
+        cell["points"] += row.points
+        cell["marks"] += row.marks
+        cell["score_sum"] += row.score_sum
+        cell["industries"].append(
+            {
+                "industry_id": row.industry_id or None,
+                "industry": industry_name,
+                "points": row.points,
+                "marks": row.marks,
+                "mean_rating": _mean(row.score_sum, row.marks),
+            }
+        )
+
+    for cell in cells.values():
+        score_sum = cell.pop("score_sum")
+        cell["mean_rating"] = _mean(score_sum, cell["marks"])
+        cell["marks_per_point"] = round(cell["marks"] / cell["points"], 4) if cell["points"] else None
+    return {
+        "precision": precision,
+        "cell_height": height,
+        "cell_width": width,
+        "truncated": len(cells) >= limit,
+        "cells": list(cells.values()),
+    }
+
+
+async def rebuild_geo_cells(db: AsyncSession, batch_size: int = 5000) -> int:
+    """Recompute all geo cells from points and marks. Returns the number of rows written."""
+
+    totals: dict[tuple[int, str, int], dict] = defaultdict(lambda: {"points": 0, "marks": 0, "score_sum": 0.0})
+    query = (
+        select(
+            Point.latitude,
+            Point.longitude,
+            Point.industry_id,
+            func.count(Mark.id),
+            func.coalesce(func.sum(Mark.total_score), 0),
+        )
+        .join(Mark, Mark.point_id == Point.id, isouter=True)
+        .group_by(Point.id)
+    )
+    for latitude, longitude, industry_id, marks, score_sum in (await db.execute(query)).all():
+        for precision in GEO_PRECISIONS:
+            geohash, cell_lat, cell_lon = geo.encode(latitude, longitude, precision)
+            cell = totals[(precision, geohash, industry_id or NO_INDUSTRY)]
+            cell["latitude"], cell["longitude"] = cell_lat, cell_lon
+            cell["points"] += 1
+            cell["marks"] += marks
+            cell["score_sum"] += score_sum
+
+    await db.execute(delete(GeoCellRollup))
+    values = [
+        {"precision": precision, "geohash": geohash, "industry_id": industry_id, **counters}
+        for (precision, geohash, industry_id), counters in sorted(totals.items())
+    ]
+    for offset in range(0, len(values), batch_size):
+        await db.execute(insert(GeoCellRollup), values[offset : offset + batch_size])
+    await db.commit()
+    return len(values)
+
+
+async def ensure_geo_cells(db: AsyncSession) -> None:
+    """Build the geo cells once for databases created before the table existed."""
+
+    has_cells = await db.scalar(select(GeoCellRollup.geohash).limit(1))
+    has_points = await db.scalar(select(Point.id).limit(1))
+    if has_cells is None and has_points is not None:
+        await rebuild_geo_cells(db)
@@ -5,6 +5,7 @@ from fastapi import HTTPException, status
 
 from app.models import Industry
 from app.schemas import IndustryCreate
+from app.services.analytics_service import invalidate_analytics
 
 
 async def create_industry(db: AsyncSession, payload: IndustryCreate) -> Industry:
@@ -14,6 +15,7 @@ async def create_industry(db: AsyncSession, payload: IndustryCreate) -> Industry
     industry = Industry(name=payload.name)
     db.add(industry)
     await db.commit()
+    invalidate_analytics("industries")
     await db.refresh(industry)
     return industry
 
@@ -34,3 +36,4 @@ async def delete_industry(db: AsyncSession, industry_id: int) -> None:
     industry = await get_industry(db, industry_id)
     await db.delete(industry)
     await db.commit()
+    invalidate_analytics()
@@ -0,0 +1,301 @@
+"""Service for materialized leaderboards: by XP, engagement and marks, per industry and per period.
+
+Scores live in `leaderboard_entries` and are bumped by the write paths. Each worker keeps
+the boards it serves (least recently used ones beyond the configured count are dropped)
+as sorted lists with O(log n) updates and ranks, so top-N, rank and window lookups are a
+bisect plus a slice. Write paths apply their new scores to cached boards only once their
+session commits; a board is reloaded from the table once it is older than the TTL.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
+
+from fastapi import HTTPException, status
+from sortedcontainers import SortedList
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Achievement, LeaderboardEntry, Mark, Point, User, UserAchievement
+from app.schemas.leaderboard_schemas import (
+    LeaderboardBoard,
+    LeaderboardEntryRead,
+    LeaderboardPeriod,
+    LeaderboardRead,
+)
+
+ALL_SCOPE = "all"
+
+# Engagement weights, shared with analytics_service.get_users_engagement.
+ENGAGEMENT_PER_MARK = 1.0
+ENGAGEMENT_PER_POINT = 2.0
+ENGAGEMENT_PER_PHOTO = 0.5
+
+
+def week_scope(day: date) -> str:
+    return f"week:{(day - timedelta(days=day.weekday())).isoformat()}"
+
+
+def month_scope(day: date) -> str:
+    return f"month:{day:%Y-%m}"
+
+
+def resolve_scope(period: LeaderboardPeriod, industry_id: int | None = None, at: date | None = None) -> str:
+    """Map request parameters to a scope key; an industry scope is all-time."""
+
+    if industry_id is not None:
+        return f"industry:{industry_id}"
+    day = at or datetime.utcnow().date()
+    if period == LeaderboardPeriod.WEEK:
+        return week_scope(day)
+    if period == LeaderboardPeriod.MONTH:
+        return month_scope(day)
+    return ALL_SCOPE
+
+
+def _scopes(board: str, at: datetime, industry_id: int | None) -> list[str]:
+    day = at.date()
+    scopes = [ALL_SCOPE, week_scope(day), month_scope(day)]
+    if industry_id is not None and board != LeaderboardBoard.XP.value:
+        scopes.append(f"industry:{industry_id}")
+    return scopes
+
+
+class _SortedBoard:
+    """Positive scores of one board/scope kept ordered by (-score, user_id); updates and ranks in O(log n)."""
+
+    def __init__(self, scores: dict[int, float]):
+        self.scores = {uid: score for uid, score in scores.items() if score > 0}
+        self.keys = SortedList((-score, uid) for uid, score in self.scores.items())
+        self.loaded_at = time.monotonic()
+
+    def rank(self, user_id: int) -> int | None:
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return self.keys.bisect_left((-score, user_id)) + 1
+
+    def slice(self, start: int, stop: int) -> list[tuple[int, int, float]]:
+        start = max(start, 0)
+        return [(pos + 1, uid, -neg) for pos, (neg, uid) in enumerate(self.keys.islice(start, stop), start)]
+
+    def set(self, user_id: int, score: float) -> None:
+        self.remove(user_id)
+        if score > 0:
+            self.scores[user_id] = score
+            self.keys.add((-score, user_id))
+
+    def remove(self, user_id: int) -> None:
+        old = self.scores.pop(user_id, None)
+        if old is not None:
+            self.keys.remove((-old, user_id))
+
+
+# Boards loaded by this worker, least recently used first; week/month scopes keep coming.
+_boards: OrderedDict[tuple[str, str], _SortedBoard] = OrderedDict()
+_board_cache_counts = {"hits": 0, "misses": 0}
+_PENDING_KEY = "leaderboard_cache_updates"
+
+
+def get_leaderboard_cache_stats() -> dict[str, int]:
+    """Hit/miss counters and size of this worker's cache of loaded boards."""
+
+    return {**_board_cache_counts, "entries": len(_boards)}
+
+
+async def _get_board(db: AsyncSession, board: str, scope: str) -> _SortedBoard:
+    cached = _boards.get((board, scope))
+    if cached is not None and time.monotonic() - cached.loaded_at < settings.leaderboard_cache_ttl_seconds:
+        _boards.move_to_end((board, scope))
+        _board_cache_counts["hits"] += 1
+        return cached
+    _board_cache_counts["misses"] += 1
+
+    rows = await db.execute(
+        select(LeaderboardEntry.user_id, LeaderboardEntry.score).where(
+            LeaderboardEntry.board == board, LeaderboardEntry.scope == scope, LeaderboardEntry.score > 0
+        )
+    )
+    loaded = _SortedBoard(dict(rows.all()))
+    _boards[(board, scope)] = loaded
+    _boards.move_to_end((board, scope))
+    while len(_boards) > settings.leaderboard_cache_max_boards:
+        _boards.popitem(last=False)
+    return loaded
+
+
+def _defer_cache_update(db: AsyncSession, key: tuple[str, str] | None, user_id: int, score: float | None) -> None:
+    """Queue a cached-board change until the session commits; `key=None` removes the user everywhere."""
+
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append((key, user_id, score))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_updates(session: Session) -> None:
+    for key, user_id, score in session.info.pop(_PENDING_KEY, ()):
+        if key is None:
+            for cached in _boards.values():
+                cached.remove(user_id)
+        elif key in _boards:
+            _boards[key].set(user_id, score)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_updates(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def bump_leaderboards(
+    db: AsyncSession,
+    user_id: int | None,
+    *,
+    at: datetime,
+    industry_id: int | None = None,
+    xp: float = 0,
+    engagement: float = 0,
+    marks: float = 0,
+) -> None:
+    """Add score deltas to the all-time, weekly, monthly (and industry) boards in one upsert."""
+
+    if user_id is None:
+        return
+
+    deltas = {LeaderboardBoard.XP.value: xp, LeaderboardBoard.ENGAGEMENT.value: engagement, LeaderboardBoard.MARKS.value: marks}
+    rows = [
+        {"board": board, "scope": scope, "user_id": user_id, "score": delta}
+        for board, delta in deltas.items()
+        if delta
+        for scope in _scopes(board, at, industry_id)
+    ]
+    if not rows:
+        return
+
+    stmt = sqlite_insert(LeaderboardEntry).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LeaderboardEntry.board, LeaderboardEntry.scope, LeaderboardEntry.user_id],
+        set_={"score": LeaderboardEntry.score + stmt.excluded.score},
+    ).returning(LeaderboardEntry.board, LeaderboardEntry.scope, LeaderboardEntry.score)
+    for board, scope, score in (await db.execute(stmt)).all():
+        _defer_cache_update(db, (board, scope), user_id, score)
+
+
+async def remove_user_from_leaderboards(db: AsyncSession, user_id: int) -> None:
+    await db.execute(delete(LeaderboardEntry).where(LeaderboardEntry.user_id == user_id))
+    _defer_cache_update(db, None, user_id, None)
+
+
+async def _to_read(
+    db: AsyncSession, board: LeaderboardBoard, scope: str, total: int, ranked: list[tuple[int, int, float]]
+) -> LeaderboardRead:
+    ids = [uid for _, uid, _ in ranked]
+    names = dict((await db.execute(select(User.id, User.username).where(User.id.in_(ids)))).all()) if ids else {}
+    return LeaderboardRead(
+        board=board,
+        scope=scope,
+        total=total,
+        entries=[
+            LeaderboardEntryRead(rank=rank, user_id=uid, username=names.get(uid), score=score)
+            for rank, uid, score in ranked
+        ],
+    )
+
+
+async def get_leaderboard_top(db: AsyncSession, board: LeaderboardBoard, scope: str, limit: int = 10) -> LeaderboardRead:
+    """Return the first `limit` users of a board."""
+
+    sorted_board = await _get_board(db, board.value, scope)
+    return await _to_read(db, board, scope, len(sorted_board.keys), sorted_board.slice(0, limit))
+
+
+async def get_leaderboard_window(
+    db: AsyncSession, board: LeaderboardBoard, scope: str, user_id: int, radius: int = 0
+) -> LeaderboardRead:
+    """Return a user's position with `radius` neighbours above and below (radius=0: just the user)."""
+
+    sorted_board = await _get_board(db, board.value, scope)
+    rank = sorted_board.rank(user_id)
+    if rank is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User is not ranked on this leaderboard.")
+    return await _to_read(
+        db, board, scope, len(sorted_board.keys), sorted_board.slice(rank - 1 - radius, rank + radius)
+    )
+
+
+async def rebuild_leaderboards(db: AsyncSession, batch_size: int = 5000) -> int:
+    """Recompute every leaderboard from raw tables. Returns the number of entries written.
+
+    Activity is first grouped per user/industry/day in SQL and then folded into scopes.
+    """
+
+    # Imported here: gamification_service imports this module to bump XP boards.
+    from app.services.gamification_service import XP_FOR_MARK_CREATION, XP_FOR_POINT_CREATION
+
+    totals: dict[tuple[str, str, int], float] = defaultdict(float)
+
+    def add(board: LeaderboardBoard, user_id: int, amount: float, day: str, industry_id: int | None = None) -> None:
+        for scope in _scopes(board.value, datetime.fromisoformat(day), industry_id):
+            totals[(board.value, scope, user_id)] += amount
+
+    mark_day = func.date(Mark.created_at)
+    marks = await db.execute(
+        select(Mark.user_id, Point.industry_id, mark_day, func.count(Mark.id), func.sum(func.json_array_length(Mark.photos)))
+        .join(Point, Point.id == Mark.point_id)
+        .where(Mark.user_id.is_not(None))
+        .group_by(Mark.user_id, Point.industry_id, mark_day)
+    )
+    for uid, industry_id, day, count, photos in marks.all():
+        add(LeaderboardBoard.MARKS, uid, count, day, industry_id)
+        add(LeaderboardBoard.ENGAGEMENT, uid, count * ENGAGEMENT_PER_MARK + (photos or 0) * ENGAGEMENT_PER_PHOTO, day, industry_id)
+        add(LeaderboardBoard.XP, uid, count * XP_FOR_MARK_CREATION, day)
+
+    point_day = func.date(Point.created_at)
+    points = await db.execute(
+        select(Point.creator_id, Point.industry_id, point_day, func.count(Point.id))
+        .where(Point.creator_id.is_not(None))
+        .group_by(Point.creator_id, Point.industry_id, point_day)
+    )
+    for uid, industry_id, day, count in points.all():
+        add(LeaderboardBoard.ENGAGEMENT, uid, count * ENGAGEMENT_PER_POINT, day, industry_id)
+        add(LeaderboardBoard.XP, uid, count * XP_FOR_POINT_CREATION, day)
+
+    completed_day = func.date(UserAchievement.completed_at)
+    rewards = await db.execute(
+        select(UserAchievement.user_id, completed_day, func.sum(Achievement.xp_reward))
+        .join(Achievement, Achievement.id == UserAchievement.achievement_id)
+        .where(UserAchievement.is_completed.is_(True), UserAchievement.completed_at.is_not(None))
+        .group_by(UserAchievement.user_id, completed_day)
+    )
+    for uid, day, reward in rewards.all():
+        add(LeaderboardBoard.XP, uid, reward or 0, day)
+
+    # Per-period XP is re-derived from rewarded actions; all-time XP is the stored total.
+    for key in [key for key in totals if key[0] == LeaderboardBoard.XP.value and key[1] == ALL_SCOPE]:
+        del totals[key]
+    for uid, xp in (await db.execute(select(User.id, User.xp).where(User.xp > 0))).all():
+        totals[(LeaderboardBoard.XP.value, ALL_SCOPE, uid)] = xp
+
+    await db.execute(delete(LeaderboardEntry))
+    rows = [
+        {"board": board, "scope": scope, "user_id": uid, "score": score}
+        for (board, scope, uid), score in totals.items()
+        if score > 0
+    ]
+    for start in range(0, len(rows), batch_size):
+        await db.execute(insert(LeaderboardEntry), rows[start : start + batch_size])
+    await db.commit()
+    _boards.clear()
+    return len(rows)
+
+
+async def ensure_leaderboards(db: AsyncSession) -> None:
+    """Build the leaderboards once for databases created before the table existed."""
+
+    has_entries = await db.scalar(select(LeaderboardEntry.user_id).limit(1))
+    has_activity = await db.scalar(select(User.id).where(User.xp > 0).limit(1))
+    if has_entries is None and has_activity is not None:
+        await rebuild_leaderboards(db)
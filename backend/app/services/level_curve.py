@@ -0,0 +1,103 @@
+"""Level curves: cumulative XP thresholds precomputed once and searched with bisect."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class LevelCurve:
+    """Cumulative XP thresholds where `thresholds[i]` is the total XP needed for level `i + 1`."""
+
+    def __init__(self, thresholds: Sequence[float]):
+        if not thresholds or thresholds[0] != 0:
+            raise ValueError("Level curve must start with 0 XP for level 1")
+        if any(cur <= prev for prev, cur in zip(thresholds, thresholds[1:])):
+            raise ValueError("Level curve thresholds must be strictly increasing")
+
+        self._thresholds = tuple(float(t) for t in thresholds)
+        self._array = np.asarray(self._thresholds, dtype=np.float64)
+
+    @property
+    def max_level(self) -> int:
+        return len(self._thresholds)
+
+    def level_for_xp(self, xp: int) -> int:
+        """Return the highest level whose threshold is <= `xp`."""
+
+        return max(1, bisect_right(self._thresholds, xp))
+
+    def levels_for_xp(self, xps: Sequence[int] | np.ndarray) -> np.ndarray:
+        """Vectorized `level_for_xp` for many XP values at once."""
+
+        levels = np.searchsorted(self._array, np.asarray(xps, dtype=np.float64), side="right")
+        return np.maximum(levels, 1)
+
+    def xp_for_level(self, level: int) -> int:
+        """Return total XP required to reach `level` (capped at the last level of the curve)."""
+
+        if level <= 1:
+            return 0
+        return int(self._thresholds[min(level, self.max_level) - 1])
+
+    @classmethod
+    def geometric(cls, base_xp: float, multiplier: float, max_level: int) -> "LevelCurve":
+        """Level N -> N+1 costs `base_xp * multiplier ** (N - 1)`."""
+
+        thresholds = [0.0]
+        step = float(base_xp)
+        for _ in range(1, max_level):
+            thresholds.append(thresholds[-1] + step)
+            step *= multiplier
+        return cls(thresholds)
+
+    @classmethod
+    def polynomial(cls, base_xp: float, exponent: float, max_level: int) -> "LevelCurve":
+        """Level N -> N+1 costs `base_xp * N ** exponent`."""
+
+        thresholds = [0.0]
+        for level in range(1, max_level):
+            thresholds.append(thresholds[-1] + base_xp * level**exponent)
+        return cls(thresholds)
+
+    @classmethod
+    def table(cls, thresholds: Sequence[float]) -> "LevelCurve":
+        """Explicit cumulative thresholds, starting with 0 for level 1."""
+
+        return cls(list(thresholds))
+
+
+def build_level_curve(
+    kind: str,
+    base_xp: float,
+    multiplier: float,
+    exponent: float,
+    table: Sequence[float],
+    max_level: int,
+) -> LevelCurve:
+    if kind == "geometric":
+        return LevelCurve.geometric(base_xp, multiplier, max_level)
+    if kind == "polynomial":
+        return LevelCurve.polynomial(base_xp, exponent, max_level)
+    if kind == "table":
+        return LevelCurve.table(table)
+    raise ValueError(f"Unknown level curve: {kind}")
+
+
+@lru_cache
+def get_level_curve() -> LevelCurve:
+    """Return the level curve configured in settings, built once per process."""
+
+    return build_level_curve(
+        settings.level_curve,
+        base_xp=settings.level_base_xp,
+        multiplier=settings.level_multiplier,
+        exponent=settings.level_exponent,
+        table=settings.level_table,
+        max_level=settings.level_max,
+    )
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -5,9 +7,21 @@ from fastapi import HTTPException, status
 
 from app.models import Criteria, Mark, Point, User
 from app.schemas import MarkCreate
+from app.schemas.activity_schemas import ActivityType
 from app.services.achievement_service import check_marks_achievements, check_streak_achievements
-from app.services.gamification_service import add_xp_for_mark_creation
+from app.services.activity_service import mark_created_title, record_activity
+from app.services.analytics_service import invalidate_analytics
+from app.services.gamification_service import XP_FOR_MARK_CREATION, add_xp_for_mark_creation
+from app.services.geo_service import bump_geo_cells
+from app.services.leaderboard_service import (
+    ENGAGEMENT_PER_MARK,
+    ENGAGEMENT_PER_PHOTO,
+    bump_leaderboards,
+)
 from app.services.point_service import recalculate_point_mark
+from app.services.rollup_service import bump_rollup
+from app.services.sketch_service import bump_score_sketch, record_active_user
+from app.services.stats_service import bump_user_stats, refresh_user_stats
 
 
 async def _get_point_and_user(db: AsyncSession, point_id: int, user_id: int | None) -> tuple[Point, User | None]:
@@ -62,7 +76,34 @@ async def create_mark(db: AsyncSession, payload: MarkCreate) -> Mark:
         total_score=total_score,
     )
     db.add(mark)
+    await db.flush()
+    await bump_user_stats(db, payload.user_id, marks=1, photos=len(mark.photos), active_at=mark.created_at)
+    await bump_leaderboards(
+        db,
+        payload.user_id,
+        at=mark.created_at,
+        industry_id=point.industry_id,
+        marks=1,
+        engagement=ENGAGEMENT_PER_MARK + len(mark.photos) * ENGAGEMENT_PER_PHOTO,
+    )
+    await bump_rollup(
+        db, mark.created_at, point.industry_id, marks=1, photos=len(mark.photos), score_sum=total_score
+    )
+    await bump_score_sketch(db, mark.created_at, point.industry_id, point.sub_industry_id, total_score)
+    await bump_geo_cells(db, point.latitude, point.longitude, point.industry_id, marks=1, score_sum=total_score)
+    await record_active_user(db, payload.user_id, mark.created_at)
+    record_activity(
+        db,
+        payload.user_id,
+        ActivityType.MARK_CREATED,
+        occurred_at=mark.created_at,
+        title=mark_created_title(point),
+        description=f"Оценка: {total_score:.1f}",
+        xp_gained=XP_FOR_MARK_CREATION,
+        point_id=point.id,
+    )
     await db.commit()
+    invalidate_analytics("marks")
     await db.refresh(mark)
 
     await recalculate_point_mark(db, payload.point_id)
@@ -117,7 +158,14 @@ async def append_photos_to_mark(db: AsyncSession, mark_id: int, urls: list[str])
     photos = list(mark.photos or [])
     photos.extend(urls)
     mark.photos = photos
+    await bump_user_stats(db, mark.user_id, photos=len(urls))
+    point = await db.get(Point, mark.point_id)
+    await bump_leaderboards(
+        db, mark.user_id, at=datetime.utcnow(), industry_id=point.industry_id, engagement=len(urls) * ENGAGEMENT_PER_PHOTO
+    )
+    await bump_rollup(db, mark.created_at, point.industry_id, photos=len(urls))
     await db.commit()
+    invalidate_analytics("marks")
     await db.refresh(mark)
     return mark
 
@@ -125,6 +173,26 @@ async def append_photos_to_mark(db: AsyncSession, mark_id: int, urls: list[str])
 async def delete_mark(db: AsyncSession, mark_id: int) -> None:
     mark = await get_mark(db, mark_id)
     point_id = mark.point_id
+    user_id = mark.user_id
+    point = await db.get(Point, point_id)
+    await bump_leaderboards(
+        db,
+        user_id,
+        at=mark.created_at,
+        industry_id=point.industry_id,
+        marks=-1,
+        engagement=-(ENGAGEMENT_PER_MARK + len(mark.photos or []) * ENGAGEMENT_PER_PHOTO),
+    )
+    await bump_rollup(
+        db, mark.created_at, point.industry_id, marks=-1, photos=-len(mark.photos or []), score_sum=-mark.total_score
+    )
+    await bump_score_sketch(db, mark.created_at, point.industry_id, point.sub_industry_id, mark.total_score, delta=-1)
+    await bump_geo_cells(
+        db, point.latitude, point.longitude, point.industry_id, marks=-1, score_sum=-mark.total_score
+    )
     await db.delete(mark)
+    await db.flush()
+    await refresh_user_stats(db, [user_id])
     await db.commit()
+    invalidate_analytics("marks")
     await recalculate_point_mark(db, point_id)
@@ -0,0 +1,127 @@
+"""Service for the /metrics endpoint: app collectors, cross-worker merge and snapshot writer."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.db_core import engine, read_engine
+from app.core.metrics import REGISTRY, Merged, load_snapshots, merge, render, write_snapshot
+from app.core.pubsub import get_broker
+from app.services.analytics_service import get_analytics_cache_stats
+from app.services.leaderboard_service import get_leaderboard_cache_stats
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = REGISTRY.gauge("db_pool_size", "Configured connections of the engine's pool.", ("engine",))
+DB_POOL_CHECKED_OUT = REGISTRY.gauge("db_pool_checked_out", "Connections in use.", ("engine",))
+DB_POOL_CHECKED_IN = REGISTRY.gauge("db_pool_checked_in", "Idle connections in the pool.", ("engine",))
+DB_POOL_OVERFLOW = REGISTRY.gauge("db_pool_overflow", "Connections opened beyond the pool size.", ("engine",))
+CACHE_HITS = REGISTRY.counter("cache_hits_total", "Cache lookups served from the cache.", ("cache",))
+CACHE_MISSES = REGISTRY.counter("cache_misses_total", "Cache lookups that had to compute or load.", ("cache",))
+CACHE_ENTRIES = REGISTRY.gauge("cache_entries", "Entries currently cached.", ("cache",))
+PUBSUB_SUBSCRIBERS = REGISTRY.gauge("pubsub_subscribers", "Live event subscribers.")
+PUBSUB_QUEUED = REGISTRY.gauge("pubsub_queued_events", "Events waiting in subscriber queues.")
+PUBSUB_QUEUE_MAX = REGISTRY.gauge("pubsub_queue_depth_max", "Depth of the fullest subscriber queue.")
+ANALYTICS_INFLIGHT = REGISTRY.gauge("analytics_computations_in_flight", "Analytics cache misses being computed.")
+
+
+def _collect_db_pools() -> None:
+    engines = {"write": engine} if read_engine is engine else {"write": engine, "read": read_engine}
+    for name, target in engines.items():
+        pool = target.sync_engine.pool
+        if not isinstance(pool, QueuePool):  # e.g. StaticPool for in-memory SQLite
+            continue
+        DB_POOL_SIZE.set(pool.size(), engine=name)
+        DB_POOL_CHECKED_OUT.set(pool.checkedout(), engine=name)
+        DB_POOL_CHECKED_IN.set(pool.checkedin(), engine=name)
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0), engine=name)
+
+
+def _collect_caches() -> None:
+    analytics = get_analytics_cache_stats()
+    leaderboard = get_leaderboard_cache_stats()
+    for name, stats in (("analytics", analytics), ("leaderboard", leaderboard)):
+        CACHE_HITS.set_total(stats["hits"], cache=name)
+        CACHE_MISSES.set_total(stats["misses"], cache=name)
+        CACHE_ENTRIES.set(stats["entries"], cache=name)
+    ANALYTICS_INFLIGHT.set(analytics["inflight"])
+
+
+def _collect_pubsub() -> None:
+    depths = [subscription.queue.qsize() for subscription in get_broker().subscriptions]
+    PUBSUB_SUBSCRIBERS.set(len(depths))
+    PUBSUB_QUEUED.set(sum(depths))
+    PUBSUB_QUEUE_MAX.set(max(depths, default=0))
+
+
+REGISTRY.add_collector(_collect_db_pools)
+REGISTRY.add_collector(_collect_caches)
+REGISTRY.add_collector(_collect_pubsub)
+
+
+def _add_hit_ratios(merged: Merged) -> None:
+    """Hit ratio per cache from the merged counters, so it is correct across workers."""
+
+    hits = merged.get("cache_hits_total", {}).get("values", {})
+    misses = merged.get("cache_misses_total", {}).get("values", {})
+    ratios = {}
+    for key in hits.keys() | misses.keys():
+        lookups = hits.get(key, 0.0) + misses.get(key, 0.0)
+        if lookups:
+            ratios[key] = hits.get(key, 0.0) / lookups
+    merged["cache_hit_ratio"] = {
+        "type": "gauge",
+        "help": "Share of cache lookups served from the cache, over all workers.",
+        "labelnames": ["cache"],
+        "values": ratios,
+    }
+
+
+def render_metrics() -> str:
+    """Metrics of this worker, or of all workers when a multiprocess directory is configured."""
+
+    snapshot = REGISTRY.snapshot()
+    directory = settings.metrics_multiproc_dir
+    if directory is None:
+        merged = merge([snapshot])
+    else:
+        write_snapshot(snapshot, directory)
+        merged = merge(load_snapshots(directory))
+    _add_hit_ratios(merged)
+    return render(merged)
+
+
+_writer: asyncio.Task | None = None
+
+
+async def _write_snapshots() -> None:
+    while True:
+        await asyncio.sleep(settings.metrics_snapshot_interval_seconds)
+        try:
+            write_snapshot(REGISTRY.snapshot(), settings.metrics_multiproc_dir)
+        except OSError:
+            logger.exception("Could not write the metrics snapshot")
+
+
+def start_metrics_writer() -> None:
+    """Keep this worker's snapshot file fresh for scrapes served by other workers."""
+
+    global _writer
+    if settings.metrics_multiproc_dir is not None and _writer is None:
+        _writer = asyncio.create_task(_write_snapshots())
+
+
+async def stop_metrics_writer() -> None:
+    global _writer
+    if _writer is None:
+        return
+    _writer.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _writer
+    _writer = None
+    write_snapshot(REGISTRY.snapshot(), settings.metrics_multiproc_dir)
@@ -4,12 +4,41 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi import HTTPException, status
 
+from app.core.pubsub import publish
 from app.models import Criteria, Mark, Point, SubIndustry, User
 from app.schemas import PointCreate, PointUpdate
+from app.schemas.activity_schemas import ActivityType
+from app.schemas.event_schemas import LiveEventType
 from app.services.achievement_service import check_points_achievements
-from app.services.gamification_service import add_xp_for_point_creation
+from app.services.activity_service import detach_point_activity, point_created_title, record_activity
+from app.services.analytics_service import invalidate_analytics
+from app.services.gamification_service import XP_FOR_POINT_CREATION, add_xp_for_point_creation
+from app.services.geo_service import bump_geo_cells, move_point_in_geo_cells, remove_points_from_geo_cells
 from app.services.sub_industry_service import get_sub_industry
 from app.services.industry_service import get_industry
+from app.services.leaderboard_service import (
+    ENGAGEMENT_PER_MARK,
+    ENGAGEMENT_PER_PHOTO,
+    ENGAGEMENT_PER_POINT,
+    bump_leaderboards,
+)
+from app.services.rollup_service import bump_rollup, refresh_rollup_days
+from app.services.sketch_service import record_active_user, refresh_score_sketch_days
+from app.services.stats_service import bump_user_stats, refresh_user_stats
+
+
+def point_event_data(point: Point) -> dict:
+    """Payload of live point events; latitude/longitude drive the subscribers' bbox filter."""
+
+    return {
+        "point_id": point.id,
+        "name": point.name,
+        "latitude": point.latitude,
+        "longitude": point.longitude,
+        "industry_id": point.industry_id,
+        "sub_industry_id": point.sub_industry_id,
+        "mark": point.mark,
+    }
 
 
 async def create_point(db: AsyncSession, payload: PointCreate) -> Point:
@@ -40,8 +69,28 @@ async def create_point(db: AsyncSession, payload: PointCreate) -> Point:
     )
 
     db.add(point)
+    await db.flush()
+    await bump_user_stats(db, payload.creator_id, points=1, active_at=point.created_at)
+    await bump_leaderboards(
+        db, payload.creator_id, at=point.created_at, industry_id=point.industry_id, engagement=ENGAGEMENT_PER_POINT
+    )
+    await bump_rollup(db, point.created_at, point.industry_id, new_points=1)
+    await bump_geo_cells(db, point.latitude, point.longitude, point.industry_id, points=1)
+    await record_active_user(db, payload.creator_id, point.created_at)
+    record_activity(
+        db,
+        payload.creator_id,
+        ActivityType.POINT_CREATED,
+        occurred_at=point.created_at,
+        title=point_created_title(point),
+        description="Точка на карте создана",
+        xp_gained=XP_FOR_POINT_CREATION,
+        point_id=point.id,
+    )
     await db.commit()
+    invalidate_analytics("points")
     await db.refresh(point)
+    await publish(LiveEventType.POINT_CREATED.value, point_event_data(point))
     
     # Award XP for creating a point
     await add_xp_for_point_creation(db, payload.creator_id)
@@ -80,13 +129,19 @@ async def recalculate_point_mark(db: AsyncSession, point_id: int) -> float:
     if not point:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Point not found.")
 
+    previous_mark = point.mark
     if user_average is None:
         point.mark = float(point.sub_industry.base_score)
     else:
         point.mark = float((user_average + point.sub_industry.base_score) / 2)
 
     await db.commit()
+    invalidate_analytics("points")
     await db.refresh(point)
+    if point.mark != previous_mark:
+        await publish(
+            LiveEventType.POINT_RATING_CHANGED.value, {**point_event_data(point), "previous_mark": previous_mark}
+        )
     return point.mark
 
 
@@ -94,6 +149,10 @@ async def update_point(db: AsyncSession, point_id: int, payload: PointUpdate) ->
     """Update mutable fields of a point."""
 
     point = await get_point(db, point_id)
+    previous_location = {"previous_latitude": point.latitude, "previous_longitude": point.longitude}
+    previous_industry_id = point.industry_id
+    previous_sub_industry_id = point.sub_industry_id
+    previous_geo = (point.latitude, point.longitude, point.industry_id)
 
     if payload.name is not None:
         point.name = payload.name
@@ -114,14 +173,32 @@ async def update_point(db: AsyncSession, point_id: int, payload: PointUpdate) ->
                 detail="SubIndustry does not belong to the selected Industry.",
             )
         point.sub_industry_id = payload.sub_industry_id
+    previous_creator_id = point.creator_id
     if payload.creator_id is not None:
         creator = await db.get(User, payload.creator_id)
         if not creator:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Creator user not found.")
         point.creator_id = payload.creator_id
 
+    if point.creator_id != previous_creator_id:
+        await db.flush()
+        await refresh_user_stats(db, [previous_creator_id, point.creator_id])
+
+    industry_changed = point.industry_id != previous_industry_id
+    if industry_changed or point.sub_industry_id != previous_sub_industry_id:
+        # The point and its marks move to another industry in the rollups and score sketches.
+        await db.flush()
+        mark_times = (await db.execute(select(Mark.created_at).where(Mark.point_id == point.id))).scalars().all()
+        if industry_changed:
+            await refresh_rollup_days(db, [point.created_at, *mark_times])
+        await refresh_score_sketch_days(db, mark_times)
+
+    await move_point_in_geo_cells(db, point, previous_geo)
+
     await db.commit()
+    invalidate_analytics("points")
     await db.refresh(point)
+    await publish(LiveEventType.POINT_UPDATED.value, {**point_event_data(point), **previous_location})
     return point
 
 
@@ -129,8 +206,32 @@ async def delete_point(db: AsyncSession, point_id: int) -> None:
     """Delete a point and its marks."""
 
     point = await get_point(db, point_id)
+    marks = list((await db.execute(select(Mark).where(Mark.point_id == point_id))).scalars().all())
+    affected_users = [point.creator_id, *(m.user_id for m in marks)]
+
+    await bump_leaderboards(
+        db, point.creator_id, at=point.created_at, industry_id=point.industry_id, engagement=-ENGAGEMENT_PER_POINT
+    )
+    for mark in marks:
+        await bump_leaderboards(
+            db,
+            mark.user_id,
+            at=mark.created_at,
+            industry_id=point.industry_id,
+            marks=-1,
+            engagement=-(ENGAGEMENT_PER_MARK + len(mark.photos or []) * ENGAGEMENT_PER_PHOTO),
+        )
+    await detach_point_activity(db, point_id)
+    await remove_points_from_geo_cells(db, [point_id])
+    event_data = point_event_data(point)
     await db.delete(point)
+    await db.flush()
+    await refresh_user_stats(db, affected_users)
+    await refresh_rollup_days(db, [point.created_at, *(m.created_at for m in marks)])
+    await refresh_score_sketch_days(db, [m.created_at for m in marks])
     await db.commit()
+    invalidate_analytics("points", "marks")
+    await publish(LiveEventType.POINT_DELETED.value, event_data)
 
 
 async def get_point_criteria(db: AsyncSession, point_id: int) -> list[Criteria]:
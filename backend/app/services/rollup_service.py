@@ -0,0 +1,264 @@
+"""Service maintaining the analytics rollups.
+
+Counters are kept per day (`daily_rollups`) and per hour, week and month
+(`period_rollups`), so a series of any range is read from buckets of a matching width.
+Writes bump all four levels; repairs recompute days and hours from raw tables and
+weeks and months from the days.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Mapping
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DailyRollup, Mark, Point, PeriodRollup, User
+
+NO_INDUSTRY = 0
+_COUNTERS = ("new_users", "new_points", "marks", "photos", "score_sum")
+HOUR, WEEK, MONTH = "hour", "week", "month"
+_CHUNK = 200  # ranges or days per statement, well inside SQLite's expression limits
+
+
+def period_start(period: str, at: datetime | date) -> datetime:
+    """Start of the hour, week (Monday) or month containing `at`."""
+
+    if not isinstance(at, datetime):
+        at = datetime.combine(at, time.min)
+    if period == HOUR:
+        return at.replace(minute=0, second=0, microsecond=0)
+    day = at.date()
+    if period == WEEK:
+        return datetime.combine(day - timedelta(days=day.weekday()), time.min)
+    if period == MONTH:
+        return datetime.combine(day.replace(day=1), time.min)
+    raise ValueError(f"Unknown rollup period: {period}")
+
+
+async def bump_rollup(
+    db: AsyncSession,
+    at: datetime,
+    industry_id: int | None = None,
+    *,
+    new_users: int = 0,
+    new_points: int = 0,
+    marks: int = 0,
+    photos: int = 0,
+    score_sum: float = 0.0,
+) -> None:
+    """Add deltas to the rollup row of `at`'s day and industry with one upsert."""
+
+    deltas = {"new_users": new_users, "new_points": new_points, "marks": marks, "photos": photos, "score_sum": score_sum}
+    if not any(deltas.values()):
+        return
+    stmt = sqlite_insert(DailyRollup).values(day=at.date(), industry_id=industry_id or NO_INDUSTRY, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyRollup.day, DailyRollup.industry_id],
+        set_={name: getattr(DailyRollup, name) + getattr(stmt.excluded, name) for name, delta in deltas.items() if delta},
+    )
+    await db.execute(stmt)
+
+    rows = [
+        {"period": period, "start": period_start(period, at), "industry_id": industry_id or NO_INDUSTRY, **deltas}
+        for period in (HOUR, WEEK, MONTH)
+    ]
+    stmt = sqlite_insert(PeriodRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PeriodRollup.period, PeriodRollup.start, PeriodRollup.industry_id],
+        set_={name: getattr(PeriodRollup, name) + getattr(stmt.excluded, name) for name, delta in deltas.items() if delta},
+    )
+    await db.execute(stmt)
+
+
+def _day_ranges(days: list[date]) -> list[tuple[datetime, datetime]]:
+    """[start, end) datetimes of each run of consecutive days in the sorted `days`."""
+
+    ranges: list[tuple[datetime, datetime]] = []
+    for day in days:
+        start = datetime.combine(day, time.min)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], start + timedelta(days=1))
+        else:
+            ranges.append((start, start + timedelta(days=1)))
+    return ranges
+
+
+def _in_ranges(column, ranges: list[tuple[datetime, datetime]]):
+    return or_(*(and_(column >= start, column < end) for start, end in ranges))
+
+
+async def _aggregate(
+    db: AsyncSession, ranges: list[tuple[datetime, datetime]] | None = None, hourly: bool = False
+) -> dict[tuple[date | datetime, int], dict[str, float]]:
+    """Group users, points and marks created in the [start, end) `ranges` (default: all) by day (or hour) and industry."""
+
+    def in_range(query, column):
+        return query if ranges is None else query.where(_in_ranges(column, ranges))
+
+    def truncate(column):
+        return func.strftime("%Y-%m-%d %H:00:00", column) if hourly else func.date(column)
+
+    parse = datetime.fromisoformat if hourly else date.fromisoformat
+    rows: dict[tuple[date | datetime, int], dict[str, float]] = defaultdict(lambda: dict.fromkeys(_COUNTERS, 0))
+
+    user_day = truncate(User.created_at)
+    for day, count in (await db.execute(in_range(select(user_day, func.count(User.id)), User.created_at).group_by(user_day))).all():
+        rows[(parse(day), NO_INDUSTRY)]["new_users"] = count
+
+    point_day = truncate(Point.created_at)
+    points_q = in_range(select(point_day, Point.industry_id, func.count(Point.id)), Point.created_at)
+    for day, industry_id, count in (await db.execute(points_q.group_by(point_day, Point.industry_id))).all():
+        rows[(parse(day), industry_id or NO_INDUSTRY)]["new_points"] = count
+
+    mark_day = truncate(Mark.created_at)
+    marks_q = in_range(
+        select(
+            mark_day,
+            Point.industry_id,
+            func.count(Mark.id),
+            func.coalesce(func.sum(func.json_array_length(Mark.photos)), 0),
+            func.coalesce(func.sum(Mark.total_score), 0),
+        ).join(Point, Point.id == Mark.point_id),
+        Mark.created_at,
+    )
+    for day, industry_id, count, photos, score in (await db.execute(marks_q.group_by(mark_day, Point.industry_id))).all():
+        row = rows[(parse(day), industry_id or NO_INDUSTRY)]
+        row["marks"], row["photos"], row["score_sum"] = count, photos, score
+
+    return rows
+
+
+def _row_values(key: tuple[date, int], counters: dict[str, float]) -> dict:
+    return {"day": key[0], "industry_id": key[1], **counters}
+
+
+def _period_values(period: str, rows: dict[tuple[datetime, int], dict[str, float]]) -> list[dict]:
+    return [
+        {"period": period, "start": start, "industry_id": industry_id, **counters}
+        for (start, industry_id), counters in sorted(rows.items())
+    ]
+
+
+def _fold_days(daily: Iterable[Mapping], periods: Iterable[tuple[str, datetime]] | None = None) -> list[dict]:
+    """Sum daily rollup rows into week and month rows (only into `periods` when given)."""
+
+    wanted = set(periods) if periods is not None else None
+    folded: dict[tuple[str, datetime, int], dict[str, float]] = defaultdict(lambda: dict.fromkeys(_COUNTERS, 0))
+    for row in daily:
+        for period in (WEEK, MONTH):
+            start = period_start(period, row["day"])
+            if wanted is None or (period, start) in wanted:
+                totals = folded[(period, start, row["industry_id"])]
+                for name in _COUNTERS:
+                    totals[name] += row[name]
+    return [
+        {"period": period, "start": start, "industry_id": industry_id, **counters}
+        for (period, start, industry_id), counters in sorted(folded.items())
+    ]
+
+
+def _period_end(period: str, start: datetime) -> datetime:
+    if period == WEEK:
+        return start + timedelta(days=7)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+async def _refresh_periods(db: AsyncSession, days: list[date]) -> None:
+    """Recompute the weeks and months containing `days` from the daily rollups."""
+
+    periods = {(period, period_start(period, day)) for day in days for period in (WEEK, MONTH)}
+    period_days = sorted(
+        {
+            (start + timedelta(days=offset)).date()
+            for period, start in periods
+            for offset in range((_period_end(period, start) - start).days)
+        }
+    )
+    daily = []
+    for offset in range(0, len(period_days), _CHUNK):
+        chunk = period_days[offset : offset + _CHUNK]
+        daily += (
+            await db.execute(
+                select(DailyRollup.day, DailyRollup.industry_id, *(getattr(DailyRollup, name) for name in _COUNTERS)).where(
+                    DailyRollup.day.in_(chunk)
+                )
+            )
+        ).mappings().all()
+
+    for period in (WEEK, MONTH):
+        starts = [start for p, start in periods if p == period]
+        await db.execute(delete(PeriodRollup).where(PeriodRollup.period == period, PeriodRollup.start.in_(starts)))
+    values = _fold_days(daily, periods)
+    if values:
+        await db.execute(insert(PeriodRollup), values)
+
+
+async def refresh_rollup_days(db: AsyncSession, days: Iterable[date | datetime | None]) -> None:
+    """Recompute the rollups of the given days from raw tables (used on deletes and moves)."""
+
+    wanted = sorted({d.date() if isinstance(d, datetime) else d for d in days if d is not None})
+    if not wanted:
+        return
+    # Only the wanted days are rescanned, as one range per run of consecutive days.
+    await db.execute(delete(DailyRollup).where(DailyRollup.day.in_(wanted)))
+    day_ranges = _day_ranges(wanted)
+    for offset in range(0, len(day_ranges), _CHUNK):
+        ranges = day_ranges[offset : offset + _CHUNK]
+        values = [_row_values(key, counters) for key, counters in (await _aggregate(db, ranges)).items()]
+        if values:
+            await db.execute(insert(DailyRollup), values)
+
+        await db.execute(delete(PeriodRollup).where(PeriodRollup.period == HOUR, _in_ranges(PeriodRollup.start, ranges)))
+        values = _period_values(HOUR, await _aggregate(db, ranges, hourly=True))
+        if values:
+            await db.execute(insert(PeriodRollup), values)
+
+    await _refresh_periods(db, wanted)
+
+
+async def rollup_days_for_user(db: AsyncSession, user_id: int) -> set[date]:
+    """Days whose rollups change when a user and everything they own are deleted."""
+
+    user_points = select(Point.id).where(Point.creator_id == user_id)
+    queries = [
+        select(func.date(User.created_at)).where(User.id == user_id),
+        select(func.date(Point.created_at)).where(Point.creator_id == user_id).distinct(),
+        select(func.date(Mark.created_at))
+        .where((Mark.user_id == user_id) | Mark.point_id.in_(user_points))
+        .distinct(),
+    ]
+    days: set[date] = set()
+    for query in queries:
+        days.update(date.fromisoformat(day) for day in (await db.execute(query)).scalars().all() if day)
+    return days
+
+
+async def rebuild_rollups(db: AsyncSession, batch_size: int = 5000) -> int:
+    """Recompute all rollup levels from raw tables. Returns the number of rows written."""
+
+    rows = await _aggregate(db)
+    await db.execute(delete(DailyRollup))
+    await db.execute(delete(PeriodRollup))
+    values = [_row_values(key, counters) for key, counters in sorted(rows.items())]
+    for offset in range(0, len(values), batch_size):
+        await db.execute(insert(DailyRollup), values[offset : offset + batch_size])
+
+    period_values = _period_values(HOUR, await _aggregate(db, hourly=True)) + _fold_days(values)
+    for offset in range(0, len(period_values), batch_size):
+        await db.execute(insert(PeriodRollup), period_values[offset : offset + batch_size])
+    await db.commit()
+    return len(values) + len(period_values)
+
+
+async def ensure_rollups(db: AsyncSession) -> None:
+    """Build the rollups once for databases created before the table existed."""
+
+    has_rollups = await db.scalar(select(DailyRollup.day).limit(1))
+    has_periods = await db.scalar(select(PeriodRollup.start).limit(1))
+    has_users = await db.scalar(select(User.id).limit(1))
+    if (has_rollups is None or has_periods is None) and has_users is not None:
+        await rebuild_rollups(db)
@@ -0,0 +1,282 @@
+"""Service for mergeable per-day sketches maintained by the write paths.
+
+Active users: a user is active on a day when they create a point or a mark. Each day
+keeps one 4 KiB HyperLogLog; any date range is answered by merging its days' registers,
+with a relative standard error of 1.04 / sqrt(4096) ≈ 1.6% (near exact for small counts).
+Deleting content does not remove past activity from these sketches.
+
+Score percentiles: marks' `total_score` is counted in DDSketch buckets per day, industry
+and sub-industry. Range percentiles sum bucket counts in SQL, never reading raw marks, and
+are within 1% (relative) of a true score. Deletes and moves keep these counts exact.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, Literal
+
+from sqlalchemy import delete, func, insert, select, union
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.sketches import DDSketch, HyperLogLog
+from app.models import DailyActiveSketch, Industry, Mark, Point, ScoreSketchBucket, SubIndustry
+from app.services.rollup_service import _CHUNK, _day_ranges, _in_ranges
+
+HLL_PRECISION = 12
+SCORE_SKETCH = DDSketch(alpha=0.01)
+SCORE_PERCENTILES = (0.1, 0.5, 0.9)
+
+
+async def record_active_user(db: AsyncSession, user_id: int | None, at: datetime) -> None:
+    """
+    Add a user to the sketch of `at`'s day.
+
+    Called after the write path has flushed its own insert, so the transaction already
+    holds SQLite's write lock and this read-modify-write cannot interleave with another one.
+    Most adds leave the registers unchanged and then cost a single SELECT.
+    """
+
+    if user_id is None:
+        return
+    day = at.date()
+    blob = await db.scalar(select(DailyActiveSketch.registers).where(DailyActiveSketch.day == day))
+    sketch = HyperLogLog(HLL_PRECISION, blob)
+    if not sketch.add(user_id) and blob is not None:
+        return
+    stmt = sqlite_insert(DailyActiveSketch).values(day=day, registers=sketch.to_bytes())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyActiveSketch.day], set_={"registers": stmt.excluded.registers}
+    )
+    await db.execute(stmt)
+
+
+async def _merged(db: AsyncSession, start: date, end: date) -> tuple[HyperLogLog, int]:
+    blobs = (
+        await db.execute(
+            select(DailyActiveSketch.registers).where(DailyActiveSketch.day >= start, DailyActiveSketch.day <= end)
+        )
+    ).scalars().all()
+    return HyperLogLog.merge_blobs(blobs, HLL_PRECISION), len(blobs)
+
+
+async def estimate_active_users(db: AsyncSession, start_date: date, end_date: date) -> dict:
+    """Estimated number of distinct active users between two days (inclusive)."""
+
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+    sketch, days = await _merged(db, start_date, end_date)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "active_users": round(sketch.estimate()),
+        "relative_error": round(sketch.relative_error, 4),
+        "days_with_activity": days,
+    }
+
+
+async def get_active_users_summary(db: AsyncSession, at: date | None = None) -> dict:
+    """DAU, WAU and MAU for the day, 7 days and 30 days ending at `at` (default: today)."""
+
+    at = at or datetime.utcnow().date()
+    rows = (
+        await db.execute(
+            select(DailyActiveSketch.day, DailyActiveSketch.registers).where(
+                DailyActiveSketch.day > at - timedelta(days=30), DailyActiveSketch.day <= at
+            )
+        )
+    ).all()
+
+    def window(days: int) -> int:
+        since = at - timedelta(days=days)
+        sketch = HyperLogLog.merge_blobs([blob for day, blob in rows if day > since], HLL_PRECISION)
+        return round(sketch.estimate())
+
+    return {
+        "date": at,
+        "dau": window(1),
+        "wau": window(7),
+        "mau": window(30),
+        "relative_error": round(HyperLogLog(HLL_PRECISION).relative_error, 4),
+    }
+
+
+async def rebuild_active_sketches(db: AsyncSession, batch_size: int = 500) -> int:
+    """Recompute all sketches from point and mark authors. Returns the number of days written."""
+
+    activity = union(
+        select(func.date(Mark.created_at).label("day"), Mark.user_id.label("user_id")).where(Mark.user_id.is_not(None)),
+        select(func.date(Point.created_at), Point.creator_id).where(Point.creator_id.is_not(None)),
+    ).subquery()
+    sketches: dict[str, HyperLogLog] = {}
+    for day, user_id in (await db.execute(select(activity.c.day, activity.c.user_id))).all():
+        if day:
+            sketches.setdefault(day, HyperLogLog(HLL_PRECISION)).add(user_id)
+
+    await db.execute(delete(DailyActiveSketch))
+    values = [
+        {"day": date.fromisoformat(day), "registers": sketch.to_bytes()} for day, sketch in sorted(sketches.items())
+    ]
+    for offset in range(0, len(values), batch_size):
+        await db.execute(insert(DailyActiveSketch), values[offset : offset + batch_size])
+    await db.commit()
+    return len(values)
+
+
+async def ensure_active_sketches(db: AsyncSession) -> None:
+    """Build the sketches once for databases created before the table existed."""
+
+    has_sketches = await db.scalar(select(DailyActiveSketch.day).limit(1))
+    has_activity = await db.scalar(select(Mark.id).where(Mark.user_id.is_not(None)).limit(1)) or await db.scalar(
+        select(Point.id).where(Point.creator_id.is_not(None)).limit(1)
+    )
+    if has_sketches is None and has_activity is not None:
+        await rebuild_active_sketches(db)
+
+
+async def bump_score_sketch(
+    db: AsyncSession,
+    at: datetime,
+    industry_id: int | None,
+    sub_industry_id: int | None,
+    score: float,
+    delta: int = 1,
+) -> None:
+    """Add (or with a negative delta, remove) one mark score in its day's sketch."""
+
+    key = {
+        "day": at.date(),
+        "industry_id": industry_id or 0,
+        "sub_industry_id": sub_industry_id or 0,
+        "bucket": SCORE_SKETCH.key(score),
+    }
+    stmt = sqlite_insert(ScoreSketchBucket).values(**key, count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            ScoreSketchBucket.day,
+            ScoreSketchBucket.industry_id,
+            ScoreSketchBucket.sub_industry_id,
+            ScoreSketchBucket.bucket,
+        ],
+        set_={"count": ScoreSketchBucket.count + stmt.excluded.count},
+    )
+    await db.execute(stmt)
+    if delta < 0:
+        await db.execute(
+            delete(ScoreSketchBucket).where(
+                *(getattr(ScoreSketchBucket, name) == value for name, value in key.items()),
+                ScoreSketchBucket.count <= 0,
+            )
+        )
+
+
+async def _score_buckets(
+    db: AsyncSession, ranges: list[tuple[datetime, datetime]] | None = None
+) -> dict[tuple[date, int, int, int], int]:
+    """Bucket counts of marks created in the [start, end) `ranges` (default: all), grouped by distinct score in SQL."""
+
+    mark_day = func.date(Mark.created_at)
+    query = (
+        select(mark_day, Point.industry_id, Point.sub_industry_id, Mark.total_score, func.count(Mark.id))
+        .join(Point, Point.id == Mark.point_id)
+        .where(Mark.total_score.is_not(None))
+        .group_by(mark_day, Point.industry_id, Point.sub_industry_id, Mark.total_score)
+    )
+    if ranges is not None:
+        query = query.where(_in_ranges(Mark.created_at, ranges))
+
+    counts: dict[tuple[date, int, int, int], int] = defaultdict(int)
+    for day, industry_id, sub_industry_id, score, count in (await db.execute(query)).all():
+        counts[(date.fromisoformat(day), industry_id or 0, sub_industry_id or 0, SCORE_SKETCH.key(score))] += count
+    return counts
+
+
+def _bucket_values(counts: dict[tuple[date, int, int, int], int]) -> list[dict]:
+    return [
+        {"day": day, "industry_id": industry_id, "sub_industry_id": sub_industry_id, "bucket": bucket, "count": count}
+        for (day, industry_id, sub_industry_id, bucket), count in sorted(counts.items())
+    ]
+
+
+async def refresh_score_sketch_days(db: AsyncSession, days: Iterable[date | datetime | None]) -> None:
+    """Recompute the score sketches of the given days from marks (used on deletes and moves)."""
+
+    wanted = sorted({d.date() if isinstance(d, datetime) else d for d in days if d is not None})
+    if not wanted:
+        return
+    # Marks are scanned per run of wanted days, not from the first wanted day to the last.
+    await db.execute(delete(ScoreSketchBucket).where(ScoreSketchBucket.day.in_(wanted)))
+    day_ranges = _day_ranges(wanted)
+    for offset in range(0, len(day_ranges), _CHUNK):
+        values = _bucket_values(await _score_buckets(db, day_ranges[offset : offset + _CHUNK]))
+        if values:
+            await db.execute(insert(ScoreSketchBucket), values)
+
+
+async def get_score_percentiles(
+    db: AsyncSession,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    group_by: Literal["industry", "sub_industry"] = "industry",
+    industry_id: int | None = None,
+) -> dict:
+    """p10/p50/p90 of mark scores overall and per industry (or sub-industry) for a date range."""
+
+    group_column = ScoreSketchBucket.industry_id if group_by == "industry" else ScoreSketchBucket.sub_industry_id
+    query = select(group_column, ScoreSketchBucket.bucket, func.sum(ScoreSketchBucket.count)).group_by(
+        group_column, ScoreSketchBucket.bucket
+    )
+    if start_date:
+        query = query.where(ScoreSketchBucket.day >= start_date)
+    if end_date:
+        query = query.where(ScoreSketchBucket.day <= end_date)
+    if industry_id is not None:
+        query = query.where(ScoreSketchBucket.industry_id == industry_id)
+
+    groups: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    overall: dict[int, int] = defaultdict(int)
+    for group_id, bucket, count in (await db.execute(query)).all():
+        groups[group_id][bucket] += count
+        overall[bucket] += count
+
+    name_model = Industry if group_by == "industry" else SubIndustry
+    ids = [group_id for group_id in groups if group_id]
+    names = dict((await db.execute(select(name_model.id, name_model.name).where(name_model.id.in_(ids)))).all()) if ids else {}
+
+    def summarize(counts: dict[int, int]) -> dict:
+        p10, p50, p90 = (
+            None if value is None else round(value, 4)
+            for value in SCORE_SKETCH.quantiles(counts.items(), SCORE_PERCENTILES)
+        )
+        return {"count": sum(counts.values()), "p10": p10, "p50": p50, "p90": p90}
+
+    id_key = f"{group_by}_id"
+    return {
+        "relative_accuracy": SCORE_SKETCH.alpha,
+        "overall": summarize(overall),
+        "groups": [
+            {id_key: group_id or None, group_by: names.get(group_id), **summarize(counts)}
+            for group_id, counts in sorted(groups.items())
+        ],
+    }
+
+
+async def rebuild_score_sketches(db: AsyncSession, batch_size: int = 5000) -> int:
+    """Recompute all score sketches from marks. Returns the number of bucket rows written."""
+
+    values = _bucket_values(await _score_buckets(db))
+    await db.execute(delete(ScoreSketchBucket))
+    for offset in range(0, len(values), batch_size):
+        await db.execute(insert(ScoreSketchBucket), values[offset : offset + batch_size])
+    await db.commit()
+    return len(values)
+
+
+async def ensure_score_sketches(db: AsyncSession) -> None:
+    """Build the score sketches once for databases created before the table existed."""
+
+    has_buckets = await db.scalar(select(ScoreSketchBucket.day).limit(1))
+    has_marks = await db.scalar(select(Mark.id).limit(1))
+    if has_buckets is None and has_marks is not None:
+        await rebuild_score_sketches(db)
@@ -0,0 +1,249 @@
+"""Service for maintaining denormalized per-user statistics (the `user_stats` table)."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import case, func, literal_column, select, union, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Mark, Point, User, UserStats
+
+
+def activity_day(moment: datetime) -> date:
+    """Return the streak day of a naive UTC timestamp in the configured timezone and day start."""
+
+    local = moment.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(settings.streak_timezone))
+    return (local - timedelta(hours=settings.streak_day_start_hour)).date()
+
+
+def live_day_streak(stats: UserStats | None) -> int:
+    """Return the stored daily streak, or 0 if it was broken since the last mark."""
+
+    if not stats or stats.last_active_date is None:
+        return 0
+    if stats.last_active_date < activity_day(datetime.utcnow()) - timedelta(days=1):
+        return 0
+    return stats.current_streak
+
+
+def _day_streaks(days: list[date]) -> tuple[int, int]:
+    """Return (current, best) streak of consecutive days from a sorted list of distinct days."""
+
+    if not days:
+        return 0, 0
+
+    best = current = 1
+    for prev, cur in zip(days, days[1:]):
+        current = current + 1 if cur - prev == timedelta(days=1) else 1
+        best = max(best, current)
+    return current, best
+
+
+def _week_start(moment: datetime) -> date:
+    """Return the Monday of the week containing `moment`."""
+
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+def _week_streaks(weeks: list[date]) -> tuple[int, int]:
+    """Return (current, best) streak of consecutive weeks from a sorted list of week starts."""
+
+    if not weeks:
+        return 0, 0
+
+    best = current = 1
+    for prev, cur in zip(weeks, weeks[1:]):
+        current = current + 1 if cur - prev == timedelta(days=7) else 1
+        best = max(best, current)
+    return current, best
+
+
+async def refresh_user_stats(db: AsyncSession, user_ids: Iterable[int | None]) -> None:
+    """Recompute stats rows for the given users from the raw marks/points tables.
+
+    Used on deletes (where counters cannot be decremented safely) and by the rebuild job.
+    """
+
+    ids = sorted({uid for uid in user_ids if uid is not None})
+    if not ids:
+        return
+
+    existing = set((await db.execute(select(User.id).where(User.id.in_(ids)))).scalars().all())
+    if not existing:
+        return
+
+    marks_rows = await db.execute(
+        select(Mark.user_id, func.count(Mark.id), func.coalesce(func.sum(func.json_array_length(Mark.photos)), 0))
+        .where(Mark.user_id.in_(existing))
+        .group_by(Mark.user_id)
+    )
+    marks = {uid: (cnt, photos) for uid, cnt, photos in marks_rows.all()}
+
+    points_rows = await db.execute(
+        select(Point.creator_id, func.count(Point.id)).where(Point.creator_id.in_(existing)).group_by(Point.creator_id)
+    )
+    points = dict(points_rows.all())
+
+    # Distinct active weeks (Monday-based) from both marks and points.
+    mark_weeks = select(
+        Mark.user_id.label("user_id"), func.date(Mark.created_at, "-6 days", "weekday 1").label("week")
+    ).where(Mark.user_id.in_(existing))
+    point_weeks = select(
+        Point.creator_id.label("user_id"), func.date(Point.created_at, "-6 days", "weekday 1").label("week")
+    ).where(Point.creator_id.in_(existing))
+    weeks_q = union(mark_weeks, point_weeks).subquery()
+    weeks_rows = await db.execute(
+        select(weeks_q.c.user_id, weeks_q.c.week).order_by(weeks_q.c.user_id, weeks_q.c.week)
+    )
+    weeks_by_user: dict[int, list[date]] = defaultdict(list)
+    for uid, week in weeks_rows.all():
+        weeks_by_user[uid].append(date.fromisoformat(week))
+
+    # Daily mark streak repair: one DISTINCT query over UTC minutes instead of loading marks.
+    # Each minute is mapped with the offset in force at that moment (zone offsets are whole
+    # minutes), so marks on either side of a DST switch land on their own local day.
+    mark_minute = func.strftime("%Y-%m-%d %H:%M", Mark.created_at)
+    minutes_rows = await db.execute(
+        select(Mark.user_id, mark_minute).where(Mark.user_id.in_(existing)).distinct()
+    )
+    day_sets: dict[int, set[date]] = defaultdict(set)
+    for uid, minute in minutes_rows.all():
+        day_sets[uid].add(activity_day(datetime.fromisoformat(minute)))
+    days_by_user = {uid: sorted(days) for uid, days in day_sets.items()}
+
+    now = datetime.utcnow()
+    rows = []
+    for uid in sorted(existing):
+        marks_count, photos_count = marks.get(uid, (0, 0))
+        weeks = weeks_by_user.get(uid, [])
+        current, best = _week_streaks(weeks)
+        days = days_by_user.get(uid, [])
+        day_current, day_best = _day_streaks(days)
+        rows.append(
+            {
+                "user_id": uid,
+                "marks_count": marks_count,
+                "points_count": points.get(uid, 0),
+                "photos_count": photos_count,
+                "last_active_date": days[-1] if days else None,
+                "current_streak": day_current,
+                "best_streak": day_best,
+                "last_active_week": weeks[-1] if weeks else None,
+                "current_week_streak": current,
+                "best_week_streak": best,
+                "updated_at": now,
+            }
+        )
+
+    stmt = sqlite_insert(UserStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={name: stmt.excluded[name] for name in rows[0] if name != "user_id"},
+    )
+    await db.execute(stmt)
+
+
+async def bump_user_stats(
+    db: AsyncSession,
+    user_id: int | None,
+    *,
+    marks: int = 0,
+    points: int = 0,
+    photos: int = 0,
+    active_at: datetime | None = None,
+) -> None:
+    """Apply counter deltas to a user's stats row in place.
+
+    The update is a single atomic statement; when `active_at` is given the weekly streak is
+    advanced as well, and for new marks the daily streak too. Users without a row yet get
+    one built from the raw tables instead, so the caller must flush the triggering insert
+    before calling this.
+    """
+
+    if user_id is None:
+        return
+
+    values = {
+        "marks_count": UserStats.marks_count + marks,
+        "points_count": UserStats.points_count + points,
+        "photos_count": UserStats.photos_count + photos,
+        "updated_at": datetime.utcnow(),
+    }
+    if active_at is not None:
+        week = _week_start(active_at)
+        new_streak = case(
+            (UserStats.last_active_week == week, UserStats.current_week_streak),
+            (UserStats.last_active_week == week - timedelta(days=7), UserStats.current_week_streak + 1),
+            else_=literal_column("1"),
+        )
+        values["current_week_streak"] = new_streak
+        values["best_week_streak"] = func.max(UserStats.best_week_streak, new_streak)
+        values["last_active_week"] = func.max(func.coalesce(UserStats.last_active_week, week), week)
+
+    if active_at is not None and marks > 0:
+        day = activity_day(active_at)
+        new_day_streak = case(
+            (UserStats.last_active_date == day, UserStats.current_streak),
+            (UserStats.last_active_date == day - timedelta(days=1), UserStats.current_streak + 1),
+            else_=literal_column("1"),
+        )
+        values["current_streak"] = new_day_streak
+        values["best_streak"] = func.max(UserStats.best_streak, new_day_streak)
+        values["last_active_date"] = func.max(func.coalesce(UserStats.last_active_date, day), day)
+
+    result = await db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await refresh_user_stats(db, [user_id])
+
+
+async def get_user_stats(db: AsyncSession, user_id: int) -> UserStats | None:
+    """Return the stats row for a user, building it on first access (the caller commits)."""
+
+    query = select(UserStats).where(UserStats.user_id == user_id).execution_options(populate_existing=True)
+    stats = (await db.execute(query)).scalar_one_or_none()
+    if stats is None:
+        await refresh_user_stats(db, [user_id])
+        await db.flush()
+        stats = (await db.execute(query)).scalar_one_or_none()
+    return stats
+
+
+async def rebuild_user_stats(db: AsyncSession, chunk_size: int = 500) -> int:
+    """Rebuild the whole `user_stats` table in chunks of users. Returns the number of users processed."""
+
+    processed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            (await db.execute(select(User.id).where(User.id > last_id).order_by(User.id).limit(chunk_size)))
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+        await refresh_user_stats(db, ids)
+        await db.commit()
+        processed += len(ids)
+        last_id = ids[-1]
+    return processed
+
+
+async def ensure_user_stats(db: AsyncSession) -> None:
+    """Populate `user_stats` once for databases created before the table existed."""
+
+    has_stats = await db.scalar(select(UserStats.user_id).limit(1))
+    has_users = await db.scalar(select(User.id).limit(1))
+    if has_stats is None and has_users is not None:
+        await rebuild_user_stats(db)
@@ -5,6 +5,7 @@ from fastapi import HTTPException, status
 
 from app.models import SubIndustry
 from app.schemas import SubIndustryCreate
+from app.services.analytics_service import invalidate_analytics
 from app.services.industry_service import get_industry
 
 
@@ -44,3 +45,4 @@ async def delete_sub_industry(db: AsyncSession, sub_id: int) -> None:
     sub = await get_sub_industry(db, sub_id)
     await db.delete(sub)
     await db.commit()
+    invalidate_analytics()
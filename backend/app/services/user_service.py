@@ -1,11 +1,16 @@
-from sqlalchemy import or_, select
+from sqlalchemy import delete, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi import HTTPException, status
 
-from app.models import User
+from app.models import ActivityEvent, User
 from app.schemas import UserCreate, UserUpdate
+from app.services.analytics_service import invalidate_analytics
+from app.services.geo_service import remove_user_from_geo_cells
+from app.services.leaderboard_service import remove_user_from_leaderboards
+from app.services.rollup_service import bump_rollup, refresh_rollup_days, rollup_days_for_user
 from app.services.security import hash_password
+from app.services.sketch_service import refresh_score_sketch_days
 
 
 async def create_user(db: AsyncSession, payload: UserCreate) -> User:
@@ -27,7 +32,10 @@ async def create_user(db: AsyncSession, payload: UserCreate) -> User:
         avatar_url=payload.avatar_url,
     )
     db.add(user)
+    await db.flush()
+    await bump_rollup(db, user.created_at, new_users=1)
     await db.commit()
+    invalidate_analytics("users")
     await db.refresh(user)
     return user
 
@@ -84,6 +92,7 @@ async def update_user(db: AsyncSession, user_id: int, payload: UserUpdate) -> Us
         user.avatar_url = payload.avatar_url
 
     await db.commit()
+    invalidate_analytics("users")
     await db.refresh(user)
     return user
 
@@ -92,5 +101,13 @@ async def delete_user(db: AsyncSession, user_id: int) -> None:
     """Delete a user by id."""
 
     user = await get_user(db, user_id)
+    await remove_user_from_leaderboards(db, user_id)
+    await db.execute(delete(ActivityEvent).where(ActivityEvent.user_id == user_id))
+    rollup_days = await rollup_days_for_user(db, user_id)
+    await remove_user_from_geo_cells(db, user_id)
     await db.delete(user)
+    await db.flush()
+    await refresh_rollup_days(db, rollup_days)
+    await refresh_score_sketch_days(db, rollup_days)
     await db.commit()
+    invalidate_analytics()
@@ -1,30 +1,36 @@
+import logging
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.api.v1.routes import api_router
 from app.core.config import settings
-from app.core.db_core import SessionLocal, init_db
-from app.services.achievement_service import initialize_default_achievements
+from app.core.metrics import MetricsMiddleware
+from app.core.pubsub import get_broker
+from app.core.query_stats import QueryStatsMiddleware
+from app.services.bootstrap_service import bootstrap
+from app.services.metrics_service import render_metrics, start_metrics_writer, stop_metrics_writer
+
+logging.basicConfig(level=settings.log_level)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
-    # Startup
-    await init_db()
-
-    # Initialize default achievements
-    async with SessionLocal() as db:
-        await initialize_default_achievements(db)
+    # Startup: create tables and seed data unless this build already did
+    app.state.startup_timings = await bootstrap()
+    await get_broker().start()
+    start_metrics_writer()
 
     yield
 
-    # Shutdown (if needed)
-    pass
+    # Shutdown
+    await stop_metrics_writer()
+    await get_broker().stop()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
@@ -44,7 +50,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Analytics-Bucket", "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-N-Plus-One"],
 )
+app.add_middleware(QueryStatsMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -52,6 +62,14 @@ async def read_root():
     return {"message": "Welcome to the Health Map API", "version": "v1"}
 
 
+@app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics of all workers."""
+    if not settings.metrics_enabled:
+        return PlainTextResponse("Metrics are disabled.", status_code=404)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 def run() -> None:
     """Entry point for running via `python main.py`."""
 
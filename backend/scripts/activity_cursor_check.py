@@ -0,0 +1,89 @@
+"""
+Check that activity keyset pagination visits every event once and then stops.
+
+Points are written with the legacy second-precision timestamps (no fraction) and with
+microseconds, many in the same second, then the log is rebuilt and paged through:
+
+    python scripts/activity_cursor_check.py --events 12 --limit 5
+
+Runs on an in-memory SQLite database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Must be set before app modules are imported.
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.db_core import Base  # noqa: E402
+from app.models import Industry, Point, SubIndustry, User  # noqa: E402
+from app.services.activity_service import get_user_activity, rebuild_activity_events  # noqa: E402
+
+SECOND = "2025-12-06 22:01:33"
+
+
+async def check(events: int, limit: int) -> int:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with sessions() as db:
+        user = User(username="u", email="u@example.com", hashed_password="x")
+        industry = Industry(name="i")
+        sub_industry = SubIndustry(name="s", industry=industry)
+        db.add_all([user, industry, sub_industry])
+        await db.flush()
+        db.add_all(
+            Point(name=f"p{i}", latitude=0, longitude=0, industry_id=industry.id, sub_industry_id=sub_industry.id, creator_id=user.id)
+            for i in range(events)
+        )
+        await db.commit()
+        # Every third point keeps a fraction, as the ORM writes it; the others look like legacy rows.
+        await db.execute(
+            text(
+                "UPDATE points SET created_at = CASE WHEN id % 3 = 0 THEN :second || printf('.%06d', id) ELSE :second END"
+            ),
+            {"second": SECOND},
+        )
+        await db.commit()
+
+        await rebuild_activity_events(db)
+        expected, _ = await get_user_activity(db, user.id, limit=events + 1)
+        seen, cursor, pages = [], None, 0
+        while pages <= events:
+            page, cursor = await get_user_activity(db, user.id, limit=limit, cursor=cursor)
+            seen.extend(page)
+            pages += 1
+            if cursor is None:
+                break
+    await engine.dispose()
+
+    errors = []
+    if cursor is not None:
+        errors.append(f"still paging after {pages} pages")
+    if [a.point_id for a in seen] != [a.point_id for a in expected]:
+        errors.append(f"paged {[a.point_id for a in seen]}, expected {[a.point_id for a in expected]}")
+    for error in errors:
+        print(error)
+    print(f"{len(expected)} events, {pages} pages of {limit}, {len(errors)} errors")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Page through a user's activity with same-second events.")
+    parser.add_argument("--events", type=int, default=12, help="Events in the same second (default: 12)")
+    parser.add_argument("--limit", type=int, default=5, help="Page size (default: 5)")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(check(args.events, args.limit)))
@@ -43,6 +43,12 @@ MIGRATIONS: dict[str, list[tuple[str, str, str | None]]] = {
     "marks": [
         ("updated_at", "DATETIME", "datetime('now')"),
     ],
+    # Daily streak columns; run scripts/rebuild_user_stats.py afterwards to fill them.
+    "user_stats": [
+        ("last_active_date", "DATE", None),
+        ("current_streak", "INTEGER NOT NULL DEFAULT 0", None),
+        ("best_streak", "INTEGER NOT NULL DEFAULT 0", None),
+    ],
 }
 
 
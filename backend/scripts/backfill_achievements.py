@@ -0,0 +1,53 @@
+"""
+Recompute achievement progress/completion and user XP/level for all users.
+
+Run after adding Achievement rows or changing XP_FOR_* rewards; safe to re-run:
+
+    python scripts/backfill_achievements.py --chunk-size 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.db_core import SessionLocal, init_db  # noqa: E402
+from app.services.backfill_service import recompute_achievements_and_xp  # noqa: E402
+
+
+def _report(processed: int, elapsed: float) -> None:
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"  {processed} users processed ({rate:.0f} users/s)")
+
+
+async def run(chunk_size: int, recompute_xp: bool) -> None:
+    await init_db()
+    async with SessionLocal() as db:
+        result = await recompute_achievements_and_xp(
+            db, chunk_size=chunk_size, recompute_xp=recompute_xp, report=_report
+        )
+    print(f"Done: {result['users']} users in {result['seconds']}s ({result['users_per_second']} users/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill achievements, XP and levels.")
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=1000,
+        help="Number of users recomputed per transaction (default: 1000)",
+    )
+    parser.add_argument(
+        "--skip-xp",
+        dest="recompute_xp",
+        action="store_false",
+        help="Only recompute achievement progress, leave XP and levels untouched",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.chunk_size, args.recompute_xp))
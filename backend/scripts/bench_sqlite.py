@@ -0,0 +1,105 @@
+"""
+Compare SQLite read/write throughput with default settings and the configured tuning profile.
+
+Each profile gets a fresh temporary database; concurrent writers insert single rows in their
+own transactions while readers run small aggregate queries, for a fixed duration:
+
+    python scripts/bench_sqlite.py --writers 4 --readers 4 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.core.db_core import apply_sqlite_pragmas, sqlite_pragmas  # noqa: E402
+
+SEED_ROWS = 20000
+
+
+async def bench_profile(name: str, pragmas: dict, writers: int, readers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db", pool_size=writers + readers)
+        apply_sqlite_pragmas(engine, pragmas)
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE bench (id INTEGER PRIMARY KEY, bucket INTEGER, value REAL)"))
+            await conn.execute(
+                text("INSERT INTO bench (bucket, value) VALUES (:bucket, :value)"),
+                [{"bucket": i % 100, "value": random.random()} for i in range(SEED_ROWS)],
+            )
+
+        deadline = time.perf_counter() + seconds
+        counts = {"writes": 0, "reads": 0, "errors": 0}
+        write_latencies: list[float] = []
+
+        async def writer() -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    async with engine.begin() as conn:
+                        await conn.execute(
+                            text("INSERT INTO bench (bucket, value) VALUES (:bucket, :value)"),
+                            {"bucket": random.randrange(100), "value": random.random()},
+                        )
+                    counts["writes"] += 1
+                    write_latencies.append(time.perf_counter() - started)
+                except OperationalError:  # "database is locked"
+                    counts["errors"] += 1
+
+        async def reader() -> None:
+            while time.perf_counter() < deadline:
+                try:
+                    async with engine.connect() as conn:
+                        await conn.execute(
+                            text("SELECT count(*), avg(value) FROM bench WHERE bucket = :bucket"),
+                            {"bucket": random.randrange(100)},
+                        )
+                    counts["reads"] += 1
+                except OperationalError:
+                    counts["errors"] += 1
+
+        await asyncio.gather(*(writer() for _ in range(writers)), *(reader() for _ in range(readers)))
+        await engine.dispose()
+
+    write_latencies.sort()
+    p95 = write_latencies[int(len(write_latencies) * 0.95)] * 1000 if write_latencies else float("nan")
+    return {
+        "profile": name,
+        "writes_per_s": counts["writes"] / seconds,
+        "reads_per_s": counts["reads"] / seconds,
+        "errors": counts["errors"],
+        "write_p95_ms": p95,
+    }
+
+
+async def run(writers: int, readers: int, seconds: float) -> None:
+    profiles = [("default", {}), ("tuned", sqlite_pragmas())]
+    print("Tuned profile:", ", ".join(f"{k}={v}" for k, v in profiles[1][1].items()))
+    print(f"{'profile':<10}{'writes/s':>12}{'reads/s':>12}{'errors':>8}{'write p95 ms':>14}")
+    for name, pragmas in profiles:
+        result = await bench_profile(name, pragmas, writers, readers, seconds)
+        print(
+            f"{result['profile']:<10}{result['writes_per_s']:>12.0f}{result['reads_per_s']:>12.0f}"
+            f"{result['errors']:>8}{result['write_p95_ms']:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SQLite with default vs tuned pragmas.")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent writer tasks (default: 4)")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader tasks (default: 4)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration per profile (default: 5)")
+    args = parser.parse_args()
+    asyncio.run(run(args.writers, args.readers, args.seconds))
@@ -0,0 +1,50 @@
+"""
+Fail when the database's indexes drift from the ones declared on the models.
+
+Also fails when the database is not at the latest migration. Run it in CI or before
+deploying, against the target database:
+
+    python scripts/check_index_drift.py
+    python scripts/check_index_drift.py --upgrade   # migrate first, then check
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import models  # noqa: E402, F401  # register all tables on Base.metadata
+from app.core.db_core import engine, init_db  # noqa: E402
+from app.core.migrations import current_revision, head_revision, index_drift  # noqa: E402
+
+
+async def check(upgrade: bool) -> int:
+    if upgrade:
+        await init_db()
+    async with engine.connect() as conn:
+        current = await conn.run_sync(current_revision)
+        problems = await conn.run_sync(index_drift)
+    await engine.dispose()
+
+    head = head_revision()
+    if current != head:
+        problems.insert(0, f"database is at revision {current}, head is {head}")
+    if problems:
+        print(f"Index drift ({len(problems)}):")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print(f"No index drift (revision {current}).")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare model indexes with the database.")
+    parser.add_argument("--upgrade", action="store_true", help="Run migrations before checking")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check(args.upgrade)))
@@ -0,0 +1,43 @@
+"""
+Rebuild the `daily_active_sketches` (HyperLogLog DAU/WAU/MAU) table from point and mark authors.
+
+Run after restoring a backup or changing the sketch precision:
+
+    python scripts/rebuild_active_sketches.py --batch-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.db_core import SessionLocal, init_db  # noqa: E402
+from app.services.sketch_service import rebuild_active_sketches  # noqa: E402
+
+
+async def run(batch_size: int) -> None:
+    await init_db()
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        written = await rebuild_active_sketches(db, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written} daily sketches in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily_active_sketches table.")
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=500,
+        help="Number of rows inserted per statement (default: 500)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size))
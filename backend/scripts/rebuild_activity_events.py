@@ -0,0 +1,37 @@
+"""
+Rebuild the append-only `activity_events` log from points, marks and completed achievements.
+
+Run once on databases that predate the log (startup also does this when the table is empty):
+
+    python scripts/rebuild_activity_events.py
+
+Rebuilt events use today's XP constants; events recorded live keep the XP actually awarded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.db_core import SessionLocal, init_db  # noqa: E402
+from app.services.activity_service import rebuild_activity_events  # noqa: E402
+
+
+async def run() -> None:
+    await init_db()
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        written = await rebuild_activity_events(db)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written} activity events in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Rebuild the activity_events table.").parse_args()
+    asyncio.run(run())
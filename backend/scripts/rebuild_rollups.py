@@ -0,0 +1,43 @@
+"""
+Rebuild the `daily_rollups` and `period_rollups` analytics tables from raw users/points/marks.
+
+Run after restoring a backup or whenever the counters are suspected to drift:
+
+    python scripts/rebuild_rollups.py --batch-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.db_core import SessionLocal, init_db  # noqa: E402
+from app.services.rollup_service import rebuild_rollups  # noqa: E402
+
+
+async def run(batch_size: int) -> None:
+    await init_db()
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        written = await rebuild_rollups(db, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written} rollup rows in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily and period rollup tables.")
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=5000,
+        help="Number of rows inserted per statement (default: 5000)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size))
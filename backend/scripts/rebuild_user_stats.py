@@ -0,0 +1,43 @@
+"""
+Rebuild the denormalized `user_stats` table from the raw marks/points tables.
+
+Run after restoring a backup or whenever the counters are suspected to drift:
+
+    python scripts/rebuild_user_stats.py --chunk-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.db_core import SessionLocal, init_db  # noqa: E402
+from app.services.stats_service import rebuild_user_stats  # noqa: E402
+
+
+async def run(chunk_size: int) -> None:
+    await init_db()
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        processed = await rebuild_user_stats(db, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"Rebuilt stats for {processed} users in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the user_stats table.")
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=500,
+        help="Number of users recomputed per transaction (default: 500)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.chunk_size))
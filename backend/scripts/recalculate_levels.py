@@ -0,0 +1,42 @@
+"""
+Recompute every user's level from their XP using the configured level curve.
+
+Run after changing LEVEL_CURVE / LEVEL_* settings:
+
+    LEVEL_CURVE=polynomial python scripts/recalculate_levels.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.db_core import SessionLocal  # noqa: E402
+from app.services.gamification_service import recalculate_all_levels  # noqa: E402
+
+
+async def run(chunk_size: int) -> None:
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        changed = await recalculate_all_levels(db, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"Updated level of {changed} users in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute user levels from XP.")
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=5000,
+        help="Number of users loaded and updated per batch (default: 5000)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.chunk_size))
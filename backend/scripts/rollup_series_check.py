@@ -0,0 +1,84 @@
+"""
+Check the bucketed rollup series for explicit date ranges.
+
+Marks are bumped at known moments, then the series of every bucket width is read for a
+few `start_date`/`end_date` ranges and its total compared with the marks in range
+(whole weeks and months for those buckets):
+
+    python scripts/rollup_series_check.py
+
+Runs on an in-memory SQLite database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Must be set before app modules are imported.
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.db_core import Base  # noqa: E402
+from app.schemas.analytics_schemas import AnalyticsBucket  # noqa: E402
+from app.services.analytics_service import MetricContext, _rollup_series  # noqa: E402
+from app.services.rollup_service import bump_rollup, period_start  # noqa: E402
+
+FIRST = datetime(2025, 11, 20, 0, 30)
+MOMENTS = [FIRST + timedelta(hours=7 * i) for i in range(60)]  # about 17 days, every hour of the day
+RANGES = [
+    (date(2025, 12, 1), date(2025, 12, 3)),
+    (date(2025, 11, 25), date(2025, 11, 25)),
+    (date(2025, 11, 1), date(2025, 12, 31)),
+]
+
+
+def _expected(bucket: AnalyticsBucket, start: date, end: date) -> int:
+    low, high = datetime.combine(start, time.min), datetime.combine(end, time.max)
+    if bucket in (AnalyticsBucket.WEEK, AnalyticsBucket.MONTH):
+        # The first and last buckets are counted whole.
+        low = period_start(bucket.value, start)
+        return sum(1 for at in MOMENTS if low <= at and period_start(bucket.value, at) <= high)
+    return sum(1 for at in MOMENTS if low <= at <= high)
+
+
+async def check() -> int:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    errors = []
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with sessions() as db:
+        for at in MOMENTS:
+            await bump_rollup(db, at, marks=1)
+        await db.commit()
+        for start, end in RANGES:
+            for bucket in (AnalyticsBucket.HOUR, AnalyticsBucket.DAY, AnalyticsBucket.WEEK, AnalyticsBucket.MONTH):
+                try:
+                    series = await _rollup_series(MetricContext(db, start, end, bucket=bucket), "marks")
+                except Exception as exc:  # noqa: BLE001 - report every failing bucket
+                    errors.append(f"{bucket.value} {start}..{end}: {exc!r}")
+                    continue
+                total, expected = sum(row["count"] for row in series), _expected(bucket, start, end)
+                if total != expected:
+                    errors.append(f"{bucket.value} {start}..{end}: {total} marks, expected {expected}")
+    await engine.dispose()
+
+    for error in errors:
+        print(error)
+    print(f"{len(RANGES)} ranges x 4 buckets, {len(errors)} errors")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Compare bucketed rollup series with the marks in range.").parse_args()
+    raise SystemExit(asyncio.run(check()))
@@ -0,0 +1,75 @@
+"""
+Check the week numbering used for analytics engagement streaks.
+
+Every day in the range must get the same week as the Monday-based buckets of
+`stats_service` (`date(day, '-6 days', 'weekday 1')`), and consecutive weeks must be
+numbered consecutively, also across Monday/Tuesday and New Year boundaries:
+
+    python scripts/week_number_check.py --start 2024-01-01 --days 1200
+
+Runs on an in-memory SQLite database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Must be set before app modules are imported.
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+
+from sqlalchemy import Column, DateTime, MetaData, Table, func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.services.analytics_service import _week_number  # noqa: E402
+
+days_table = Table("days", MetaData(), Column("at", DateTime, primary_key=True))
+
+
+async def check(start: date, days: int) -> int:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(days_table.metadata.create_all)
+        # Early and late in the day, so both edges of each day are covered.
+        moments = [
+            datetime.combine(start + timedelta(days=i), datetime.min.time()) + timedelta(hours=hour)
+            for i in range(days)
+            for hour in (0, 23.99)
+        ]
+        await conn.execute(insert(days_table), [{"at": at} for at in moments])
+        rows = (
+            await conn.execute(
+                select(days_table.c.at, _week_number(days_table.c.at), func.date(days_table.c.at, "-6 days", "weekday 1"))
+                .order_by(days_table.c.at)
+            )
+        ).all()
+    await engine.dispose()
+
+    errors = []
+    monday_of_week: dict[int, str] = {}
+    for at, week, monday in rows:
+        if monday_of_week.setdefault(week, monday) != monday:
+            errors.append(f"{at}: week {week} covers both {monday_of_week[week]} and {monday}")
+    weeks = sorted(monday_of_week)
+    if weeks != list(range(weeks[0], weeks[-1] + 1)) or len(set(monday_of_week.values())) != len(weeks):
+        errors.append("week numbers are not consecutive or not one per Monday")
+
+    for error in errors[:20]:
+        print(error)
+    print(f"{len(rows)} moments, {len(weeks)} weeks, {len(errors)} errors")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare analytics week numbers with Monday-based weeks.")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1), help="First day (default: 2024-01-01)")
+    parser.add_argument("--days", type=int, default=1200, help="Number of days (default: 1200)")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(check(args.start, args.days)))
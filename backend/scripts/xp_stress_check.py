@@ -0,0 +1,103 @@
+"""
+Concurrency stress check for XP awarding.
+
+Spawns several processes (standing in for uvicorn workers), each running many
+concurrent sessions that call `add_xp` for the same user, then verifies that
+no increment was lost and the stored level matches the final XP:
+
+    python scripts/xp_stress_check.py --workers 4 --tasks 8 --increments 25
+
+Uses a throwaway SQLite database unless --db is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+XP_AMOUNT = 7
+
+
+async def _prepare() -> int:
+    from app.core.db_core import SessionLocal, init_db
+    from app.models import User
+
+    await init_db()
+    async with SessionLocal() as db:
+        user = User(username=f"xp-stress-{os.getpid()}", email=f"xp-stress-{os.getpid()}@example.com", hashed_password="-")
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+async def _hammer(user_id: int, tasks: int, increments: int) -> None:
+    from app.core.db_core import SessionLocal
+    from app.services.gamification_service import add_xp
+
+    async def one_task() -> None:
+        for _ in range(increments):
+            async with SessionLocal() as db:
+                await add_xp(db, user_id, XP_AMOUNT)
+
+    await asyncio.gather(*(one_task() for _ in range(tasks)))
+
+
+async def _read(user_id: int) -> tuple[int, int]:
+    from app.core.db_core import SessionLocal
+    from app.models import User
+
+    async with SessionLocal() as db:
+        user = await db.get(User, user_id)
+        return user.xp, user.level
+
+
+def _worker(user_id: int, tasks: int, increments: int) -> None:
+    asyncio.run(_hammer(user_id, tasks, increments))
+
+
+def main(workers: int, tasks: int, increments: int, db_path: Path | None) -> int:
+    if db_path is None:
+        db_path = Path(tempfile.mkdtemp()) / "xp_stress.db"
+    # Must be set before app modules are imported (here and in spawned workers).
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+
+    user_id = asyncio.run(_prepare())
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker, args=(user_id, tasks, increments)) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    if any(proc.exitcode != 0 for proc in procs):
+        print("A worker failed, see traceback above")
+        return 2
+
+    from app.services.gamification_service import calculate_level_from_xp
+
+    xp, level = asyncio.run(_read(user_id))
+    expected = workers * tasks * increments * XP_AMOUNT
+    print(f"Expected XP {expected}, stored XP {xp}, level {level} (expected {calculate_level_from_xp(expected)})")
+    if xp != expected or level != calculate_level_from_xp(expected):
+        print("FAILED: XP or level lost under concurrency")
+        return 1
+    print("OK: no XP lost")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress add_xp from several processes at once.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of processes (default: 4)")
+    parser.add_argument("--tasks", type=int, default=8, help="Concurrent sessions per process (default: 8)")
+    parser.add_argument("--increments", type=int, default=25, help="add_xp calls per session (default: 25)")
+    parser.add_argument("--db", dest="db_path", type=Path, default=None, help="SQLite file to use (default: temp file)")
+    args = parser.parse_args()
+    raise SystemExit(main(args.workers, args.tasks, args.increments, args.db_path))